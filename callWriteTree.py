@@ -1,40 +1,107 @@
-# Helper script to call writeTree script 
-# 5 times in a row
-
-from subprocess import Popen
+import os
 import argparse
 
-parser = argparse.ArgumentParser()
-parser.add_argument('-f', '--txtFileCounter', help='''Determines which txt file to be run over.
-                                                 file=0: File will run over the first .txt file in the backgroundFiles dir
-                                                 file=1: File will run over the second .txt file in the backgroundFiles dir
-                                                 and so on.''', type = int)
+from lib.batch import writerTasks, shardTasks, getExecutor, executors, runTasks, loadStatus, printStatus, DONE
+from lib.dataset import manifestPath, totalEvents, openEventTree
+from lib.metrics import summarizeMetrics, printMetricsSummary
+from lib.eventRanges import duplicateEvents
+
+#####################################
+# Runs writeTree.py over the background samples as batch jobs (see lib/batch.py), e.g. all the HT bins of Z(nunu)+jets:
+#
+#   python callWriteTree.py -s 'ZJetsToNuNu_HT-*'
+#
+# Each job runs over five MiniAOD files of a sample, and adds its chunk to the manifest of the sample (see lib/dataset.py).
+# With --eventsPerShard N, each job runs over N events instead, the large files being split between jobs (see lib/eventRanges.py),
+# and the merged tree of each sample is checked for events written twice.
+# The logs are written in logFiles/<sample>/, and the state of the jobs in logFiles/writeTree_status.json.
+# --status shows the state of the jobs, together with the summary of their progress metrics (see lib/metrics.py):
+# events read and saved, rejections per cut, stragglers and slow sites.
+#####################################
+
+statusPath = os.path.join('logFiles', 'writeTree_status.json')
+
+def getArgs():
+
+	parser = argparse.ArgumentParser()
+	parser.add_argument('-y', '--year', help = 'The data taking year of the MiniAOD files (2017 or 2018)', type = int, default = 2017)
+	parser.add_argument('-s', '--samples', help = 'Pattern of the background samples to be run over, e.g. ZJetsToNuNu_HT-*. By default, all of them', default = '*')
+	parser.add_argument('-f', '--txtFileCounter', help = '''Only run over the given txt file in the backgroundFiles dir.
+													file=0: Will run over the first .txt file in the backgroundFiles dir
+													file=1: Will run over the second .txt file in the backgroundFiles dir
+													and so on.''', type = int)
+	parser.add_argument('-c', '--rootFileCounter', help = '''Index of the first job of each sample.
+													counter=0: Jobs will run over files 1-5, 6-10, ...
+													counter=1: Jobs will run over files 6-10, 11-15, ...
+													and so on.''', type = int, default = 0)
+	parser.add_argument('-n', '--numJobs', help = 'Number of jobs per sample. By default, as many as needed to run over all the files', type = int)
+	parser.add_argument('--eventsPerShard', help = 'Split the samples into jobs of this number of events, splitting the large files, instead of groups of five files', type = int)
+	parser.add_argument('-e', '--executor', help = 'Where the jobs run (fake: local scheduler for testing)', choices = sorted(executors), default = 'local')
+	parser.add_argument('-j', '--maxRunning', help = 'Maximum number of jobs running at the same time', type = int)
+	parser.add_argument('-r', '--retries', help = 'Number of times a failed job is resubmitted', type = int, default = 2)
+	parser.add_argument('--pollInterval', help = 'Time between two checks of the running jobs, in seconds', type = float, default = 30.)
+	parser.add_argument('--dryRun', help = 'Only print the commands of the jobs', action = 'store_true')
+	parser.add_argument('--status', help = 'Show the state and the progress metrics of the jobs of the last run and exit', action = 'store_true')
+	args = parser.parse_args()
+
+	return args
+
+def main():
+
+	args = getArgs()
+
+	if args.status:
+
+		if os.path.exists(statusPath):
+
+			printStatus(loadStatus(statusPath))
+
+		printMetricsSummary(summarizeMetrics())
+
+		return
+
+	if args.eventsPerShard:
+
+		tasks = shardTasks(args.year, args.samples, args.eventsPerShard)
+
+	else:
+
+		tasks = writerTasks(args.year, args.samples, args.txtFileCounter, args.rootFileCounter, args.numJobs)
+
+	if args.dryRun:
+
+		for task in tasks:
+
+			print(' '.join(task.command))
+
+		print('INFO: {} jobs'.format(len(tasks)))
+
+		return
+
+	executor = getExecutor(args.executor, args.maxRunning)
+
+	records = runTasks(tasks, executor, maxRetries=args.retries, pollInterval=args.pollInterval, statusPath=statusPath)
 
-parser.add_argument('-c', '--rootFileCounter', help = '''Determines the index of the first ROOT file to be run over. 
-                                                     counter=0: File will run over files 1-5, 6-10, ... up to 21-25 in 5 steps 
-                                                     counter=1: File will run over files 6-10, 11-15, ... up to 26-30 in 5 steps 
-                                                     and so on.''', type = int)
+	#The chunks are merged by the manifests of the samples
 
-args = parser.parse_args()
+	samples = sorted(set(task.sample for task in tasks if records[task.name]['status'] == DONE))
 
-txtFile_counter = args.txtFileCounter
-rootFile_counter= args.rootFileCounter
+	for sample in samples:
 
-for numIter in range(5):
+		manifest = manifestPath(sample)
 
-	file_idx = rootFile_counter*5 + 1
-	
-	logFile_path = 'logFiles/log{}/log{}_{}-{}.log'.format(txtFile_counter, txtFile_counter, file_idx, file_idx+4)
+		print('INFO: {}: {} events looped over, {} saved'.format(manifest, totalEvents(manifest), totalEvents(manifest, 'numSavedEvents')))
 
-	logFile = file(logFile_path, 'w')
+		#The shards of a plan never overlap, check that the chunks of the sample hold every event once
 
-	command_as_aList = ['python', '-u', 'writeTree_2017MiniAOD.py', '-b', '-c', str(rootFile_counter), '-f', str(txtFile_counter)]
+		if args.eventsPerShard:
 
-	print(' '.join(command_as_aList))
+			duplicates = duplicateEvents(openEventTree(manifest))
 
-	command = Popen(command_as_aList, stdout=logFile)
-	
-	rootFile_counter += 1
+			if duplicates:
 
+				print('ERROR: {} events are written more than once in {}, e.g. (run, lumi, event) = {}'.format(len(duplicates), manifest, duplicates[0]))
 
+if __name__ == '__main__':
 
+	main()
@@ -0,0 +1,35 @@
+import ROOT
+import os
+import glob
+import argparse
+
+from lib.compaction import compactFiles
+
+#####################################
+# Compacts the given ROOT files, keeping only the latest cycle of each object (see lib/compaction.py).
+# By default, compacts all the output files of readTree.py in output/<trigger>/.
+#####################################
+
+def getArgs():
+
+	parser = argparse.ArgumentParser()
+	parser.add_argument('files', help = 'ROOT files to be compacted. By default, output/*/*.root', nargs = '*')
+	args = parser.parse_args()
+
+	return args
+
+def main():
+
+	ROOT.gROOT.SetBatch(True)
+
+	args = getArgs()
+
+	filePaths = args.files or sorted(glob.glob(os.path.join('output', '*', '*.root')))
+
+	reclaimed = compactFiles(filePaths)
+
+	print('INFO: {} files compacted, {} bytes reclaimed in total'.format(len(filePaths), reclaimed))
+
+if __name__ == '__main__':
+
+	main()
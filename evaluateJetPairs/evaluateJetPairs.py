@@ -1,8 +1,10 @@
 import ROOT
 import numpy as np
+import multiprocessing
 from lib.defineHistos import define2DHistos, defineHistosForRatioPlot
 from lib.helperFunctions import *
 from lib.veto import *
+from lib.accumulators import GrowableArray, mergeAccumulators
 
 # load FWLite C++ libraries
 ROOT.gSystem.Load("libFWCoreFWLite.so");
@@ -111,7 +113,11 @@ def fill2DHistos(histo_dict):
 		print2DHisto(hist)
 
 
-def count():
+#Remote MiniAOD file read by default
+
+defaultFile = 'root://cmsxrootd.fnal.gov///store/mc/RunIIFall17MiniAODv2/VBF_HToInvisible_M125_13TeV_TuneCP5_powheg_pythia8/MINIAODSIM/PU2017_12Apr2018_94X_mc2017_realistic_v14-v1/00000/14347E60-56F2-E811-81F4-24BE05C6C7E1.root'
+
+def count(fileName=defaultFile):
 
 	'''
 	Counts the number of events where one of two scenarios occur:
@@ -121,27 +127,29 @@ def count():
 	--- Two central jets
 	--- Two forward jets
 	--- Mixed (one central, one forward jet)
+	The mjj and pt values are kept in typed arrays (see lib/accumulators.py),
+	the results of several files can be merged with mergeAccumulators (see countFiles).
 	'''
 	
 	jets, jetLabel = Handle('std::vector<pat::Jet>'), 'slimmedJets'
 
-	events = Events('root://cmsxrootd.fnal.gov///store/mc/RunIIFall17MiniAODv2/VBF_HToInvisible_M125_13TeV_TuneCP5_powheg_pythia8/MINIAODSIM/PU2017_12Apr2018_94X_mc2017_realistic_v14-v1/00000/14347E60-56F2-E811-81F4-24BE05C6C7E1.root')
+	events = Events(fileName)
 
 	mother_dict = {}
 	
 	counter_twoLeadingJets = {} #Counts the number of events where mjj is max for the two leading jets
 	counter_otherCombos = {} #Counts the number of events where mjj is max for other combinations
 
-	mjjValues_leadingPair = [] #Stores max mjj for the case where max mjj comes from leading two pairs
-	mjjValues_otherMaxPair = [] #Stores max mjj for the case where max mjj comes from other combos
+	mjjValues_leadingPair = GrowableArray() #Stores max mjj for the case where max mjj comes from leading two pairs
+	mjjValues_otherMaxPair = GrowableArray() #Stores max mjj for the case where max mjj comes from other combos
 
-	ptValues1_leadingPair = [] #Stores jet_pt[0] for the case where max mjj comes from leading two pairs 
-	ptValues2_leadingPair = [] #Stores jet_pt[1] for the case where max mjj comes from leading two pairs 
+	ptValues1_leadingPair = GrowableArray() #Stores jet_pt[0] for the case where max mjj comes from leading two pairs 
+	ptValues2_leadingPair = GrowableArray() #Stores jet_pt[1] for the case where max mjj comes from leading two pairs 
 
-	leadingJetPtValues_otherMaxPair = [] #Stores jet_pt[0] for the case where max mjj comes from other combos
-	trailingJetPtValues_otherMaxPair = [] #Stores jet_pt[1] for the case where max mjj comes from other combos
-	ptValues1_otherMaxPair = [] #Stores jet_pt of jet with larger pt in the case where this pair have the max mjj 
-	ptValues2_otherMaxPair = [] #Stores jet_pt of jet with smaller pt in the case where this pair have the max mjj 
+	leadingJetPtValues_otherMaxPair = GrowableArray() #Stores jet_pt[0] for the case where max mjj comes from other combos
+	trailingJetPtValues_otherMaxPair = GrowableArray() #Stores jet_pt[1] for the case where max mjj comes from other combos
+	ptValues1_otherMaxPair = GrowableArray() #Stores jet_pt of jet with larger pt in the case where this pair have the max mjj 
+	ptValues2_otherMaxPair = GrowableArray() #Stores jet_pt of jet with smaller pt in the case where this pair have the max mjj 
 
 	cases = ['twoCentralJets', 'twoForwardJets', 'mixed']		
 
@@ -240,6 +248,25 @@ def count():
 	
 
 	return mother_dict 
+
+def countFiles(fileNames, numWorkers=None):
+
+	'''
+	Runs count over the given files in a pool of worker processes, and returns the merged results.
+	'''
+
+	if not fileNames:
+
+		raise ValueError('No input files given to count over')
+
+	pool = multiprocessing.Pool(numWorkers or multiprocessing.cpu_count())
+
+	results = pool.map(count, fileNames)
+
+	pool.close()
+	pool.join()
+
+	return mergeAccumulators(results)
 		
 def main():
 
@@ -0,0 +1,92 @@
+import copy
+import numpy as np
+from array import array
+
+#####################################
+# Streaming accumulators for the event loops
+# Per-event values are kept in typed arrays (4 bytes per float) instead of lists of Python floats.
+# The accumulators can be pickled and merged, so the results of several worker processes
+# (e.g. one per MiniAOD file) are combined with merge().
+#####################################
+
+class GrowableArray(object):
+
+	'''
+	A typed array growing with append(), stored contiguously (see the array module).
+
+	ARGUMENTS:
+	---typecode: Type of the values, 'f' (float, default), 'd' (double) or 'i' (int).
+	'''
+
+	def __init__(self, typecode='f'):
+
+		self.values = array(typecode)
+
+	def append(self, value):
+
+		self.values.append(value)
+
+	def extend(self, values):
+
+		self.values.extend(values)
+
+	def merge(self, other):
+
+		'''
+		Appends the values of another GrowableArray.
+		'''
+
+		self.values.extend(other.values)
+
+		return self
+
+	def __len__(self):
+
+		return len(self.values)
+
+	def __iter__(self):
+
+		return iter(self.values)
+
+	def __getitem__(self, idx):
+
+		return self.values[idx]
+
+	def toNumpy(self):
+
+		'''
+		Returns a copy of the values as a numpy array.
+		'''
+
+		return np.frombuffer(self.values, dtype=self.values.typecode).copy() if len(self.values) else np.zeros(0)
+
+def mergeAccumulators(results):
+
+	'''
+	Merges a list of dictionaries of accumulators (and plain counters, or nested dictionaries of them),
+	e.g. the results of count() for several files. Returns the merged dictionary, the given results are not modified.
+	'''
+
+	if not results:
+
+		raise ValueError('No results to merge')
+
+	merged = copy.deepcopy(results[0])
+
+	for result in results[1:]:
+
+		for key, value in result.items():
+
+			if isinstance(value, dict):
+
+				merged[key] = mergeAccumulators([merged[key], value])
+
+			elif hasattr(value, 'merge'):
+
+				merged[key].merge(value)
+
+			else:
+
+				merged[key] += value
+
+	return merged
@@ -2,6 +2,8 @@ import ROOT
 import os
 from math import pi
 
+from lib.plotting import submitPlot
+
 def minJetMETPhi(jets_, mets_):
 
 	'''
@@ -128,14 +130,10 @@ def sortJets(jets_list, combo):
 def printHisto(hist):
 
 	'''
-	Given 1D histogram, crates a canvas and plots the histogram.
-	It then saves the file as a png.
+	Given 1D histogram, saves it as a png.
+	The png file is rendered in the background, see lib/plotting.py.
 	'''
 
-	canv = ROOT.TCanvas('canv')
-
-	hist.Draw()
-
 	histName_splitted = hist.GetName().split('_')
 
 	plotType = histName_splitted[0]	
@@ -155,23 +153,15 @@ def printHisto(hist):
 		fileName = plotType + '_' + geometry + '.png'
 		filePath = os.path.join(plotDir, fileName)	
 
-	canv.Print(filePath)
+	submitPlot(filePath, [(hist, '')])
 
 def print2DHisto(hist, logZaxis=True):
 
 	'''
-	Given the histogram, creates a canvas and plots the histogram as a 2D colormap. 
-	It then saves the file as a png.
+	Given the histogram, saves it as a png file with a 2D colormap.
+	The png file is rendered in the background, see lib/plotting.py.
 	'''
 
-	canv = ROOT.TCanvas('canv')
-	
-	hist.Draw('COLZ')
-	
-	if logZaxis:
-		
-		canv.SetLogz(1)
-
 	histName_splitted = hist.GetName().split('_')
 	histo_variable = histName_splitted[0]
 
@@ -187,7 +177,7 @@ def print2DHisto(hist, logZaxis=True):
 
 	file_path = os.path.join(histoDir, fileName)
 
-	canv.Print(file_path)
+	submitPlot(file_path, [(hist, 'COLZ')], logz=logZaxis)
 
 def getJetGeometry(jet1, jet2):
 
@@ -0,0 +1,42 @@
+import os
+import sys
+
+#####################################
+# Batch plotting for the scripts of evaluateJetPairs
+# The renderer is the one of the repository, lib/plotting.py, re-exported here.
+# This directory has its own lib package, shadowing the lib package of the repository,
+# so the module is loaded from its path (as vbfPlotting) instead of being imported as lib.plotting.
+#####################################
+
+_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'lib', 'plotting.py')
+
+def _load(name, path):
+
+	if name in sys.modules: return sys.modules[name]
+
+	try:
+
+		import importlib.util
+
+	except ImportError: #Python 2
+
+		import imp
+
+		return imp.load_source(name, path)
+
+	spec = importlib.util.spec_from_file_location(name, path)
+
+	module = importlib.util.module_from_spec(spec)
+
+	#Registered before running the module, so that its functions can be pickled to the worker processes
+
+	sys.modules[name] = module
+
+	spec.loader.exec_module(module)
+
+	return module
+
+_plotting = _load('vbfPlotting', _path)
+
+submitPlot = _plotting.submitPlot
+flushPlots = _plotting.flushPlots
@@ -0,0 +1,160 @@
+import numpy as np
+
+from lib.columns import loadScalars, loadJagged
+from lib.cuts import Cut
+
+#####################################
+# Angular variables of the jets and MET
+# All the functions work on the last axis of the jet arrays, so the same code is used
+# -- in writeTree.py, on the jet buffers of one event (1D arrays, MET phi a scalar)
+# -- offline, on the (events x jets) arrays of eventTree, padded with NaN (see lib/columns.py)
+# The jets are the tight jets stored in eventTree, ordered in pt.
+# delta phi cuts can then be recomputed with a different number of jets or pt threshold without going back to MiniAOD.
+#####################################
+
+def deltaPhi(phi1, phi2):
+
+	'''
+	Returns |phi1 - phi2|, wrapped into [0, pi].
+	'''
+
+	return np.abs(np.remainder(np.asarray(phi1, dtype=np.float64) - phi2 + np.pi, 2*np.pi) - np.pi)
+
+def deltaR(eta1, phi1, eta2, phi2):
+
+	'''
+	Returns the distance in (eta, phi) between two objects.
+	'''
+
+	return np.hypot(np.asarray(eta1, dtype=np.float64) - eta2, deltaPhi(phi1, phi2))
+
+def leadingJetMask(jetPt, numJets=4, ptCut=30.):
+
+	'''
+	Returns the mask of the jets among the numJets leading ones, with pt >= ptCut.
+	Padding entries (NaN) are never selected.
+	'''
+
+	jetPt = np.asarray(jetPt, dtype=np.float64)
+
+	index = np.arange(jetPt.shape[-1])
+
+	with np.errstate(invalid='ignore'):
+
+		return (index < numJets) & (jetPt >= ptCut)
+
+def minDeltaPhiJetMET(jetPt, jetPhi, metPhi, numJets=4, ptCut=30.):
+
+	'''
+	Returns the minimum delta phi between MET and the numJets leading jets with pt >= ptCut.
+	Returns -1 if there is no such jet, so the event fails any delta phi cut.
+
+	ARGUMENTS:
+	---jetPt, jetPhi: Jet arrays, 1D for one event or (events x jets).
+	---metPhi: MET phi, a scalar for one event or an array of events.
+	---numJets: Number of leading jets considered.
+	---ptCut: Jets below this pt are not considered.
+	'''
+
+	mask = leadingJetMask(jetPt, numJets, ptCut)
+
+	dphi = np.where(mask, deltaPhi(jetPhi, np.asarray(metPhi, dtype=np.float64)[..., None]), np.inf)
+
+	minimum = dphi.min(axis=-1) if dphi.shape[-1] else np.full(dphi.shape[:-1], np.inf)
+
+	return np.where(np.isinf(minimum), -1., minimum)
+
+def leadingTwoJets(jetEta, jetPhi=None):
+
+	'''
+	Returns the eta (and phi) of the two leading jets, NaN for missing jets.
+	'''
+
+	values = [np.asarray(jetEta, dtype=np.float64)] + ([np.asarray(jetPhi, dtype=np.float64)] if jetPhi is not None else [])
+
+	leading = []
+
+	for array in values:
+
+		if array.shape[-1] < 2:
+
+			padding = np.full(array.shape[:-1] + (2 - array.shape[-1],), np.nan)
+
+			array = np.concatenate([array, padding], axis=-1)
+
+		leading.append((array[..., 0], array[..., 1]))
+
+	return leading
+
+def absEtaDiff(jetEta):
+
+	'''
+	Returns |delta eta| of the two leading jets.
+	'''
+
+	(eta1, eta2), = leadingTwoJets(jetEta)
+
+	return np.abs(eta1 - eta2)
+
+def etaProduct(jetEta):
+
+	'''
+	Returns the product of the eta of the two leading jets, negative if they are in opposite hemispheres.
+	'''
+
+	(eta1, eta2), = leadingTwoJets(jetEta)
+
+	return eta1 * eta2
+
+def deltaRLeadingTwoJets(jetEta, jetPhi):
+
+	'''
+	Returns delta R of the two leading jets.
+	'''
+
+	(eta1, eta2), (phi1, phi2) = leadingTwoJets(jetEta, jetPhi)
+
+	return deltaR(eta1, phi1, eta2, phi2)
+
+def angularVariables(jetPt, jetEta, jetPhi, metPhi, numJets=4, ptCut=30.):
+
+	'''
+	Returns a dictionary of all the angular variables, named as the branches of eventTree where they exist.
+	'''
+
+	return {
+		'minPhi_jetMET' : minDeltaPhiJetMET(jetPt, jetPhi, metPhi, numJets, ptCut),
+		'absEtaDiff_leadingTwoJets' : absEtaDiff(jetEta),
+		'etaProduct_leadingTwoJets' : etaProduct(jetEta),
+		'deltaR_leadingTwoJets' : deltaRLeadingTwoJets(jetEta, jetPhi),
+	}
+
+def loadAngularVariables(tree, selection='', numJets=4, ptCut=30.):
+
+	'''
+	Computes the angular variables from the jet and MET columns of eventTree,
+	for the events passing the selection.
+	'''
+
+	metPhi = loadScalars(tree, ['met_phi'], selection)['met_phi']
+
+	counts, jets = loadJagged(tree, 'nJet', ['jet_pt', 'jet_eta', 'jet_phi'], selection)
+
+	return angularVariables(jets['jet_pt'], jets['jet_eta'], jets['jet_phi'], metPhi, numJets, ptCut)
+
+def minPhiJetMETExpression(numJets=4, ptCut=30.):
+
+	'''
+	Returns the TTreeFormula expression of minDeltaPhiJetMET, 0 if there is no jet passing.
+	'''
+
+	return 'MinIf$(abs(TVector2::Phi_mpi_pi(jet_phi - met_phi)), Iteration$ < {0} && jet_pt >= {1})'.format(numJets, ptCut)
+
+def minPhiJetMETAbove(threshold, numJets=4, ptCut=30.):
+
+	'''
+	Returns the delta phi(jet, MET) cut recomputed from the jets of eventTree (see lib/cuts.py),
+	e.g. minPhiJetMETAbove(0.5, numJets=2) instead of minPhiJetMET.
+	'''
+
+	return Cut('{} > {}'.format(minPhiJetMETExpression(numJets, ptCut), threshold), 'minPhiJetMET{}_{}jets_pt{}'.format(threshold, numJets, ptCut))
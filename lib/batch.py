@@ -0,0 +1,571 @@
+import os
+import sys
+import json
+import time
+import fnmatch
+import subprocess
+import multiprocessing
+
+from lib.eraConfig import getEraConfig
+from lib.eventRanges import readFileList, planShards, planPath, savePlan
+
+#####################################
+# Batch jobs
+# A Task is one command producing some outputs, e.g. one writeTree.py job over five MiniAOD files,
+# or one analysis job saving its partial results (see lib/results.py).
+# Tasks are submitted to an executor, which runs them locally (LocalExecutor) or on a cluster.
+# A cluster scheduler (e.g. condor) is supported by implementing the Executor interface: submit(), status() and cancel().
+# FakeScheduler implements it locally, with queueing and failures on demand, to test a workflow before sending it to a cluster.
+# runTasks() keeps at most maxRunning tasks running, retries the failed ones and keeps a status file,
+# and mapReduce() merges the outputs of the tasks once they are all done.
+#####################################
+
+#States of a task
+
+PENDING, RUNNING, DONE, FAILED = 'pending', 'running', 'done', 'failed'
+
+class Task(object):
+
+	'''
+	A command to be run as a batch job.
+
+	ARGUMENTS:
+	---name: Unique name of the task, used for its log files.
+	---command: Command as a list of arguments.
+	---outputs: Paths of the files produced by the task. The task fails if any of them is missing at the end.
+	---logPath: Path of the log file of the task (stdout and stderr). Retries append the attempt number.
+	'''
+
+	def __init__(self, name, command, outputs=(), logPath=None):
+
+		self.name = name
+		self.command = list(command)
+		self.outputs = list(outputs)
+		self.logPath = logPath or os.path.join('logFiles', name + '.log')
+
+	def attemptLog(self, attempt):
+
+		if attempt == 0: return self.logPath
+
+		base, ext = os.path.splitext(self.logPath)
+
+		return '{}_retry{}{}'.format(base, attempt, ext)
+
+	def missingOutputs(self):
+
+		return [path for path in self.outputs if not os.path.exists(path)]
+
+class Executor(object):
+
+	'''
+	Interface of the executors. A cluster scheduler implements the three methods below
+	(e.g. with condor_submit, condor_q and condor_rm), job ids being any string.
+	'''
+
+	#Default number of tasks running at the same time
+
+	maxRunning = 1
+
+	def submit(self, task, logPath):
+
+		'''
+		Submits the task, with stdout and stderr written into logPath. Returns the job id.
+		'''
+
+		raise NotImplementedError
+
+	def status(self, jobId):
+
+		'''
+		Returns the state of the job: RUNNING (also while queued), DONE or FAILED.
+		'''
+
+		raise NotImplementedError
+
+	def cancel(self, jobId):
+
+		raise NotImplementedError
+
+def _makeDirectory(path):
+
+	directory = os.path.dirname(path)
+
+	if directory and not os.path.isdir(directory):
+
+		os.makedirs(directory)
+
+class LocalExecutor(Executor):
+
+	'''
+	Runs the tasks as processes on this machine, by default as many at the same time as there are cores.
+	'''
+
+	def __init__(self, maxRunning=None):
+
+		self.maxRunning = maxRunning or multiprocessing.cpu_count()
+
+		self.processes = {}
+		self.logFiles = {}
+
+		self.numJobs = 0
+
+	def start(self, jobId, task, logPath):
+
+		_makeDirectory(logPath)
+
+		self.logFiles[jobId] = open(logPath, 'w')
+
+		self.processes[jobId] = subprocess.Popen(task.command, stdout=self.logFiles[jobId], stderr=subprocess.STDOUT)
+
+	def submit(self, task, logPath):
+
+		self.numJobs += 1
+
+		jobId = 'local.{}'.format(self.numJobs)
+
+		self.start(jobId, task, logPath)
+
+		return jobId
+
+	def status(self, jobId):
+
+		returnCode = self.processes[jobId].poll()
+
+		if returnCode is None: return RUNNING
+
+		self.logFiles[jobId].close()
+
+		return DONE if returnCode == 0 else FAILED
+
+	def cancel(self, jobId):
+
+		if self.processes[jobId].poll() is None:
+
+			self.processes[jobId].kill()
+
+		self.logFiles[jobId].close()
+
+class FakeScheduler(LocalExecutor):
+
+	'''
+	A local stand-in for a cluster scheduler: jobs wait in the queue for queueTime seconds before they start,
+	and the first attempts of some tasks fail without running, to test the retries of a workflow.
+	Every change of state is recorded in history, as (job id, task name, state).
+
+	ARGUMENTS:
+	---maxRunning: Number of slots of the scheduler.
+	---queueTime: Time spent in the queue by every job, in seconds.
+	---failures: Dictionary of the number of failing attempts per task name (or pattern, e.g. 'ZJets*').
+	'''
+
+	def __init__(self, maxRunning=None, queueTime=0., failures=None):
+
+		LocalExecutor.__init__(self, maxRunning)
+
+		self.queueTime = queueTime
+		self.failures = dict(failures or {})
+
+		self.queued = {}
+		self.failed = set()
+		self.finished = set()
+		self.names = {}
+		self.history = []
+
+	def _failures(self, task):
+
+		for pattern in self.failures:
+
+			if fnmatch.fnmatch(task.name, pattern): return pattern
+
+		return None
+
+	def submit(self, task, logPath):
+
+		self.numJobs += 1
+
+		jobId = 'fake.{}'.format(self.numJobs)
+
+		pattern = self._failures(task)
+
+		if pattern and self.failures[pattern] > 0:
+
+			self.failures[pattern] -= 1
+
+			self.failed.add(jobId)
+
+			_makeDirectory(logPath)
+
+			with open(logPath, 'w') as logFile:
+
+				logFile.write('Failure injected by FakeScheduler\n')
+
+		else:
+
+			self.queued[jobId] = (task, logPath, time.time())
+
+		self.names[jobId] = task.name
+
+		self.history.append((jobId, task.name, 'submitted'))
+
+		return jobId
+
+	def status(self, jobId):
+
+		if jobId in self.queued:
+
+			task, logPath, submitted = self.queued[jobId]
+
+			if time.time() - submitted < self.queueTime: return RUNNING
+
+			del self.queued[jobId]
+
+			self.start(jobId, task, logPath)
+
+			self.history.append((jobId, task.name, 'started'))
+
+			return RUNNING
+
+		state = FAILED if jobId in self.failed else LocalExecutor.status(self, jobId)
+
+		if state != RUNNING and jobId not in self.finished:
+
+			self.finished.add(jobId)
+
+			self.history.append((jobId, self.names[jobId], state))
+
+		return state
+
+	def cancel(self, jobId):
+
+		if self.queued.pop(jobId, None) or jobId in self.failed: return
+
+		LocalExecutor.cancel(self, jobId)
+
+executors = {
+	'local' : LocalExecutor,
+	'fake' : FakeScheduler,
+}
+
+def getExecutor(name='local', maxRunning=None):
+
+	if name not in executors:
+
+		raise ValueError('Unknown executor {}, should be one of the following: {}'.format(name, ', '.join(sorted(executors))))
+
+	return executors[name](maxRunning)
+
+#####################################
+# Running the tasks
+#####################################
+
+def saveStatus(records, path):
+
+	'''
+	Saves the state of all the tasks into a JSON file, to be shown with printStatus(loadStatus(path)).
+	'''
+
+	_makeDirectory(path)
+
+	tmpPath = path + '.tmp'
+
+	with open(tmpPath, 'w') as f:
+
+		json.dump(records, f, indent=2, sort_keys=True)
+
+	os.rename(tmpPath, path)
+
+def loadStatus(path):
+
+	with open(path, 'r') as f:
+
+		return json.load(f)
+
+def printStatus(records):
+
+	'''
+	Prints the number of tasks per state, and the failed tasks with their last log file.
+	'''
+
+	counts = dict((state, 0) for state in (PENDING, RUNNING, DONE, FAILED))
+
+	for record in records.values():
+
+		counts[record['status']] += 1
+
+	print('INFO: {} tasks: {}'.format(len(records), ', '.join('{} {}'.format(counts[state], state) for state in (PENDING, RUNNING, DONE, FAILED))))
+
+	for name in sorted(records):
+
+		if records[name]['status'] == FAILED:
+
+			print('  FAILED {:<40} after {} attempts, see {}'.format(name, records[name]['attempts'], records[name]['logs'][-1]))
+
+def runTasks(tasks, executor, maxRunning=None, maxRetries=2, pollInterval=10., statusPath=None):
+
+	'''
+	Runs the tasks with the given executor, and waits until all of them are done or failed.
+	Returns a dictionary of the state of each task: status, number of attempts, job ids and log files.
+
+	ARGUMENTS:
+	---tasks: List of Task.
+	---executor: Executor, see getExecutor.
+	---maxRunning: Maximum number of tasks submitted at the same time. By default, the one of the executor.
+	---maxRetries: Number of times a failed task is submitted again.
+	---pollInterval: Time between two checks of the running tasks, in seconds.
+	---statusPath: If given, the states of the tasks are saved in this JSON file whenever they change.
+	'''
+
+	maxRunning = maxRunning or executor.maxRunning
+
+	names = [task.name for task in tasks]
+
+	if len(set(names)) != len(names):
+
+		raise ValueError('Task names are not unique')
+
+	records = dict((task.name, {'status' : PENDING, 'attempts' : 0, 'jobIds' : [], 'logs' : []}) for task in tasks)
+
+	pending = list(tasks)
+	running = {}
+
+	last = [None]
+
+	def update():
+
+		#Only shown when a task changed state
+
+		current = json.dumps(records, sort_keys=True)
+
+		if current == last[0]: return
+
+		last[0] = current
+
+		if statusPath: saveStatus(records, statusPath)
+
+		printStatus(records)
+
+	try:
+
+		while pending or running:
+
+			#Submit the pending tasks, up to maxRunning tasks at the same time
+
+			while pending and len(running) < maxRunning:
+
+				task = pending.pop(0)
+				record = records[task.name]
+
+				logPath = task.attemptLog(record['attempts'])
+
+				jobId = executor.submit(task, logPath)
+
+				record['status'] = RUNNING
+				record['attempts'] += 1
+				record['jobIds'].append(jobId)
+				record['logs'].append(logPath)
+
+				running[task.name] = (task, jobId)
+
+			update()
+
+			time.sleep(pollInterval)
+
+			for name, (task, jobId) in list(running.items()):
+
+				state = executor.status(jobId)
+
+				if state == RUNNING: continue
+
+				del running[name]
+
+				if state == DONE and task.missingOutputs():
+
+					print('ERROR: {} finished without its outputs: {}'.format(name, ', '.join(task.missingOutputs())))
+
+					state = FAILED
+
+				if state == FAILED and records[name]['attempts'] <= maxRetries:
+
+					print('WARNING: {} failed (attempt {}), see {}. Retrying'.format(name, records[name]['attempts'], records[name]['logs'][-1]))
+
+					records[name]['status'] = PENDING
+
+					pending.append(task)
+
+				else:
+
+					records[name]['status'] = state
+
+	except KeyboardInterrupt:
+
+		#Do not leave the jobs behind
+
+		for task, jobId in running.values():
+
+			executor.cancel(jobId)
+
+		raise
+
+	update()
+
+	return records
+
+def mapReduce(tasks, executor, merge=None, **options):
+
+	'''
+	Runs the tasks (see runTasks), then calls merge with the list of the outputs of all the tasks
+	and returns its result. Nothing is merged if any of the tasks failed: returns None.
+	'''
+
+	records = runTasks(tasks, executor, **options)
+
+	failed = sorted(name for name, record in records.items() if record['status'] != DONE)
+
+	if failed:
+
+		print('ERROR: {} tasks failed, the outputs are not merged: {}'.format(len(failed), ', '.join(failed)))
+
+		return None
+
+	if merge is None: return records
+
+	return merge([path for task in tasks for path in task.outputs])
+
+#####################################
+# Tasks of the workflows
+#####################################
+
+def backgroundSample(txtFile):
+
+	'''
+	Returns the name of the sample of a file list in the background directory,
+	e.g. ZJetsToNuNu_HT-100To200 for files_events_ZJetsToNuNu_HT-100To200_13TeV-madgraph.txt,
+	as in writeTree.py.
+	'''
+
+	return '_'.join(txtFile.split('_')[2:-1])
+
+#Number of MiniAOD files read by a writeTree.py job for each -c counter, fixed in writeTree.py
+
+filesPerTask = 5
+
+def writerTasks(year=2017, samples='*', fileIdx=None, first=0, numTasks=None, logDir='logFiles'):
+
+	'''
+	Returns the writeTree.py tasks over the background samples matching the given pattern,
+	each running over filesPerTask MiniAOD files of the list of the sample (see the -c and -f options of writeTree.py),
+	e.g. writerTasks(2017, 'ZJetsToNuNu_HT-*') for all the HT bins of Z(nunu)+jets.
+
+	ARGUMENTS:
+	---year: Data taking year, see lib/eraConfig.py.
+	---samples: Pattern of the sample names (see backgroundSample).
+	---fileIdx: If given, only the sample of this file list (-f of writeTree.py).
+	---first: Index (-c) of the first task of each sample.
+	---numTasks: Number of tasks per sample. By default, as many as needed to run over all the files of the sample.
+	'''
+
+	backgroundDir = getEraConfig(year)['backgroundDir']
+
+	if not backgroundDir:
+
+		raise ValueError('Background files are not configured for year {}!'.format(year))
+
+	tasks = []
+
+	#The file lists are indexed as in writeTree.py
+
+	for idx, txtFile in enumerate(sorted(os.listdir(backgroundDir))):
+
+		sample = backgroundSample(txtFile)
+
+		if not fnmatch.fnmatch(sample, samples) or fileIdx not in (None, idx): continue
+
+		with open(os.path.join(backgroundDir, txtFile), 'r') as f:
+
+			numFiles = len([line for line in f if line.strip()])
+
+		last = (numFiles + filesPerTask - 1) // filesPerTask if numTasks is None else first + numTasks
+
+		for counter in range(first, last):
+
+			fileRange = 'files{}-{}'.format(counter*filesPerTask, counter*filesPerTask + filesPerTask-1)
+
+			name = '{}_{}'.format(sample, fileRange)
+
+			task = Task(name,
+						[sys.executable, '-u', 'writeTree.py', '-y', str(year), '-b', '-c', str(counter), '-f', str(idx)],
+						outputs = [os.path.join('inputs', name + '.root')],
+						logPath = os.path.join(logDir, sample, name + '.log'))
+
+			task.sample = sample
+
+			tasks.append(task)
+
+	return tasks
+
+def shardTasks(year=2017, samples='*', eventsPerShard=20000, logDir='logFiles'):
+
+	'''
+	Returns the writeTree.py tasks over the background samples matching the given pattern, split into shards
+	of eventsPerShard events instead of groups of files, so that all the tasks read about the same number of events.
+	The plan of the shards of each sample is saved in inputs/<sample>_plan.json (see lib/eventRanges.py).
+	'''
+
+	backgroundDir = getEraConfig(year)['backgroundDir']
+
+	if not backgroundDir:
+
+		raise ValueError('Background files are not configured for year {}!'.format(year))
+
+	tasks = []
+
+	for txtFile in sorted(os.listdir(backgroundDir)):
+
+		sample = backgroundSample(txtFile)
+
+		if not fnmatch.fnmatch(sample, samples): continue
+
+		inputList = os.path.join(backgroundDir, txtFile)
+
+		shards = planShards(readFileList(inputList), eventsPerShard)
+
+		path = planPath(sample)
+
+		savePlan(path, sample, inputList, eventsPerShard, shards)
+
+		for idx in range(len(shards)):
+
+			name = '{}_shard{}'.format(sample, idx)
+
+			task = Task(name,
+						[sys.executable, '-u', 'writeTree.py', '-y', str(year), '--plan', path, '--shard', str(idx)],
+						outputs = [os.path.join('inputs', name + '.root')],
+						logPath = os.path.join(logDir, sample, name + '.log'))
+
+			task.sample = sample
+
+			tasks.append(task)
+
+	return tasks
+
+def analysisTasks(script, inputFiles, partialDir, options=(), logDir='logFiles'):
+
+	'''
+	Returns one task per input file running an analysis script which saves its partial results with -o
+	(e.g. studyJetPairs.py), the partial results being saved in partialDir.
+	'''
+
+	tasks = []
+
+	for inputFile in inputFiles:
+
+		name = '{}_{}'.format(os.path.splitext(os.path.basename(script))[0], os.path.basename(inputFile).replace('.root', '').replace('.json', ''))
+
+		partial = os.path.join(partialDir, name + '.npz')
+
+		tasks.append(Task(name,
+						  [sys.executable, '-u', script, inputFile, '-o', partial] + list(options),
+						  outputs = [partial],
+						  logPath = os.path.join(logDir, name + '.log')))
+
+	return tasks
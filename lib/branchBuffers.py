@@ -0,0 +1,93 @@
+import numpy as np
+
+class BranchBuffers(object):
+
+	'''
+	Owns the buffers of all the branches of a tree, given a branch schema (see lib/vbf_tree.py).
+
+	Scalar branches, including the size branches of the array branches, are views into contiguous blocks,
+	one for floats, one for ints and one for 64 bit ints. reset() restores every scalar to its default value with a single block copy per type.
+	Calling it at the start of each event guarantees that a value which is not set for an event
+	does not leak in from the previous event. Array branches need no reset, since only the first
+	<size branch> entries of them are written to the tree.
+
+	Buffers are accessed by branch name, e.g. branches['met'][0] = 120.
+	'''
+
+	typecodes = {'F' : np.float32, 'I' : np.int32, 'L' : np.int64}
+
+	def __init__(self, schema, maxLength=1000):
+
+		self.schema = schema
+
+		self.buffers = {}
+
+		#Lay out the scalar blocks
+
+		defaults = {'F' : [], 'I' : [], 'L' : []}
+		slots = {}
+
+		for name, leafType, sizeBranch, default in schema:
+
+			if sizeBranch: continue
+
+			slots[name] = (leafType, len(defaults[leafType]))
+			defaults[leafType].append(default)
+
+		self.floatDefaults = np.array(defaults['F'], dtype=np.float32)
+		self.intDefaults = np.array(defaults['I'], dtype=np.int32)
+		self.longDefaults = np.array(defaults['L'], dtype=np.int64)
+
+		self.floatBlock = self.floatDefaults.copy()
+		self.intBlock = self.intDefaults.copy()
+		self.longBlock = self.longDefaults.copy()
+
+		blocks = {'F' : self.floatBlock, 'I' : self.intBlock, 'L' : self.longBlock}
+
+		for name, leafType, sizeBranch, default in schema:
+
+			if sizeBranch:
+
+				self.buffers[name] = np.zeros(maxLength, dtype=self.typecodes[leafType])
+
+			else:
+
+				blockType, idx = slots[name]
+
+				self.buffers[name] = blocks[blockType][idx:idx+1]
+
+	def __getitem__(self, name):
+
+		return self.buffers[name]
+
+	def __contains__(self, name):
+
+		return name in self.buffers
+
+	def reset(self):
+
+		'''
+		Restores all the scalar branches to their default values.
+		'''
+
+		self.floatBlock[:] = self.floatDefaults
+		self.intBlock[:] = self.intDefaults
+		self.longBlock[:] = self.longDefaults
+
+	def declare(self, tree):
+
+		'''
+		Creates the branches of the given tree, pointing to the buffers owned by this object.
+		'''
+
+		for name, leafType, sizeBranch, default in self.schema:
+
+			if sizeBranch:
+
+				leafList = '{0}[{1}]/{2}'.format(name, sizeBranch, leafType)
+
+			else:
+
+				leafList = '{0}/{1}'.format(name, leafType)
+
+			tree.Branch(name, self.buffers[name], leafList)
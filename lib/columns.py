@@ -0,0 +1,136 @@
+import numpy as np
+
+#####################################
+# Columnar access to eventTree
+# TTree::Draw with the goff option evaluates up to four expressions per pass in C++,
+# the results are then copied into numpy arrays.
+# Array branches (e.g. L1_jet_pt[L1_nJet]) are returned as (events x maxLength) arrays,
+# padded with NaN after the last object of each event.
+#####################################
+
+def _toArray(buffer, n):
+
+	'''
+	Copies the first n values of a double* returned by TTree::GetV1..GetV4 into a numpy array.
+	'''
+
+	if n == 0: return np.zeros(0)
+
+	if hasattr(buffer, 'SetSize'): #Older PyROOT buffers
+
+		buffer.SetSize(n)
+
+	else:
+
+		buffer.reshape((n,))
+
+	return np.array(np.frombuffer(buffer, dtype=np.float64, count=n))
+
+def drawColumns(tree, expressions, selection='', numRows=None):
+
+	'''
+	Evaluates up to four expressions over the tree in a single pass.
+	Returns the list of numpy arrays, one per expression.
+
+	ARGUMENTS:
+	---tree: The tree (or chain) to read from.
+	---expressions: List of at most four TTreeFormula expressions.
+	---selection: Selection to be applied, as in TTree::Draw.
+	---numRows: Upper limit on the number of rows, to size the internal buffers of the tree.
+				If not given, the number of entries in the tree is used, which is enough for scalar expressions.
+	'''
+
+	if len(expressions) > 4:
+
+		raise ValueError('At most four expressions can be evaluated in one pass, got {}'.format(len(expressions)))
+
+	if numRows is None:
+
+		numRows = tree.GetEntries()
+
+	tree.SetEstimate(numRows + 1)
+
+	n = tree.Draw(':'.join(expressions), selection, 'goff')
+
+	if n < 0:
+
+		raise ValueError('Could not evaluate {} with selection "{}"'.format(expressions, selection))
+
+	if n > numRows: #More rows than expected (e.g. expressions on whole arrays), evaluate again with larger buffers
+
+		return drawColumns(tree, expressions, selection, n)
+
+	getters = [tree.GetV1, tree.GetV2, tree.GetV3, tree.GetV4]
+
+	return [_toArray(getters[i](), n) for i in range(len(expressions))]
+
+def loadScalars(tree, names, selection=''):
+
+	'''
+	Returns a dictionary of numpy arrays, one entry per event passing the selection,
+	for the given scalar branches or expressions.
+	'''
+
+	columns = {}
+
+	for i in range(0, len(names), 4):
+
+		group = names[i:i+4]
+
+		for name, values in zip(group, drawColumns(tree, group, selection)):
+
+			columns[name] = values
+
+	return columns
+
+def loadJagged(tree, sizeBranch, names, selection='', maxLength=None):
+
+	'''
+	Loads the given array branches sharing the same size branch.
+	Returns the number of objects per event and a dictionary of (events x maxLength) arrays,
+	padded with NaN.
+
+	ARGUMENTS:
+	---tree: The tree (or chain) to read from.
+	---sizeBranch: The branch holding the number of objects, e.g. L1_nJet.
+	---names: The array branches to read, e.g. ['L1_jet_pt', 'L1_jet_eta'].
+	---selection: Event level selection to be applied.
+	---maxLength: Number of objects to keep per event. If not given, the largest number of objects in an event is used.
+	'''
+
+	counts = drawColumns(tree, [sizeBranch], selection)[0].astype(np.int64)
+
+	numEvents = len(counts)
+
+	if maxLength is None:
+
+		maxLength = int(counts.max()) if numEvents else 0
+
+	total = int(counts.sum())
+
+	#Position of each object in the flat arrays: (event index, index within the event)
+
+	eventIdx = np.repeat(np.arange(numEvents), counts)
+	starts = np.cumsum(counts) - counts
+	objectIdx = np.arange(total) - np.repeat(starts, counts)
+
+	keep = objectIdx < maxLength
+
+	columns = {}
+
+	for i in range(0, len(names), 4):
+
+		group = names[i:i+4]
+
+		for name, values in zip(group, drawColumns(tree, group, selection, numRows=total)):
+
+			if len(values) != total:
+
+				raise ValueError('{} has {} values, expected {} from {}'.format(name, len(values), total, sizeBranch))
+
+			padded = np.full((numEvents, maxLength), np.nan)
+			padded[eventIdx[keep], objectIdx[keep]] = values[keep]
+
+			columns[name] = padded
+
+	return np.minimum(counts, maxLength), columns
@@ -0,0 +1,147 @@
+import ROOT
+import os
+
+#####################################
+# Compaction of ROOT files
+# Every Write() of an object with an existing name adds a new cycle (name;1, name;2, ...) to the file,
+# and deleting or overwriting a key leaves a gap in the file, which is never given back.
+# compactFile rewrites a file keeping only the latest cycle of each key, with the objects stored contiguously,
+# and reports the space reclaimed.
+#####################################
+
+def latestKeys(directory):
+
+	'''
+	Returns a dictionary mapping the name of each key in the directory to its key with the highest cycle.
+	'''
+
+	latest = {}
+
+	for key in directory.GetListOfKeys():
+
+		name = key.GetName()
+
+		if name not in latest or key.GetCycle() > latest[name].GetCycle():
+
+			latest[name] = key
+
+	return latest
+
+def countCycles(directory):
+
+	'''
+	Returns the number of keys and the number of old cycles (not the latest one) in the given directory,
+	including all of its subdirectories.
+	'''
+
+	numKeys, numDeadCycles = 0, 0
+
+	latest = latestKeys(directory)
+
+	for key in directory.GetListOfKeys():
+
+		numKeys += 1
+
+		if latest[key.GetName()].GetCycle() != key.GetCycle():
+
+			numDeadCycles += 1
+
+	for key in latest.values():
+
+		if ROOT.TClass.GetClass(key.GetClassName()).InheritsFrom('TDirectory'):
+
+			subKeys, subDeadCycles = countCycles(key.ReadObj())
+
+			numKeys += subKeys
+			numDeadCycles += subDeadCycles
+
+	return numKeys, numDeadCycles
+
+def copyLatestCycles(source, target):
+
+	'''
+	Copies the latest cycle of every object in the source directory into the target directory,
+	keeping the folder structure.
+	'''
+
+	for name, key in sorted(latestKeys(source).items()):
+
+		objClass = ROOT.TClass.GetClass(key.GetClassName())
+
+		if objClass.InheritsFrom('TDirectory'):
+
+			subTarget = target.mkdir(name, key.GetTitle())
+
+			copyLatestCycles(key.ReadObj(), subTarget)
+
+		elif objClass.InheritsFrom('TTree'):
+
+			tree = key.ReadObj()
+
+			target.cd()
+
+			clone = tree.CloneTree(-1, 'fast')
+			clone.Write(name)
+
+		else:
+
+			obj = key.ReadObj()
+
+			target.WriteTObject(obj, name)
+
+			if hasattr(obj, 'SetDirectory'):
+
+				obj.SetDirectory(0)
+
+def compactFile(filePath):
+
+	'''
+	Rewrites the given ROOT file, keeping only the latest cycle of each key.
+	The file is replaced only if the rewritten file is smaller.
+	Returns the number of bytes reclaimed.
+	'''
+
+	sizeBefore = os.path.getsize(filePath)
+
+	tmpPath = filePath + '.compact'
+
+	source = ROOT.TFile.Open(filePath, 'READ')
+
+	if not source or source.IsZombie():
+
+		raise IOError('Could not open {}'.format(filePath))
+
+	numKeys, numDeadCycles = countCycles(source)
+
+	target = ROOT.TFile.Open(tmpPath, 'RECREATE')
+
+	copyLatestCycles(source, target)
+
+	target.Close()
+	source.Close()
+
+	sizeAfter = os.path.getsize(tmpPath)
+
+	if sizeAfter < sizeBefore:
+
+		os.rename(tmpPath, filePath)
+
+		reclaimed = sizeBefore - sizeAfter
+
+	else:
+
+		os.remove(tmpPath)
+
+		reclaimed = 0
+
+	print('INFO: {}: {} keys, {} old cycles removed, {} bytes reclaimed ({} -> {} bytes)'.format(filePath, numKeys, numDeadCycles, reclaimed, sizeBefore, sizeBefore - reclaimed))
+
+	return reclaimed
+
+def compactFiles(filePaths):
+
+	'''
+	Compacts all the given ROOT files, returns the total number of bytes reclaimed.
+	'''
+
+	return sum(compactFile(filePath) for filePath in filePaths)
@@ -0,0 +1,27 @@
+import ROOT
+
+#####################################
+# C++ helpers compiled with the interpreter
+# The modules with C++ helpers (e.g. lib/l1Unpacker.py, lib/entryLists.py) declare their code with declareOnce,
+# so it is compiled when first needed, and only once per process.
+#####################################
+
+_declared = set()
+
+def declareOnce(code, what):
+
+	'''
+	Compiles the given C++ code, only once per process.
+
+	ARGUMENTS:
+	---code: The C++ code to be declared to the interpreter.
+	---what: Description of the code for the error message, e.g. 'L1 unpacker'.
+	'''
+
+	if code in _declared: return
+
+	if not ROOT.gInterpreter.Declare(code):
+
+		raise RuntimeError('Could not compile the {}'.format(what))
+
+	_declared.add(code)
@@ -0,0 +1,446 @@
+import os
+import json
+import atexit
+import numpy as np
+from functools import reduce
+
+from lib.columns import drawColumns
+
+#####################################
+# Selection algebra
+# Cuts are built from named pieces and combined with & (AND), | (OR) and ~ (NOT):
+#
+#   cut = vbfTopology & eventFilters & mjjAbove(1000) & triggerFired(trigger)
+#
+# str(cut) gives the selection string for TTree::Draw. Combined cuts keep their pieces,
+# so CutEvaluator evaluates each distinct piece only once per tree, as a numpy mask over all the entries,
+# and builds the masks of the combined cuts from them. Pieces shared by many cuts (e.g. the VBF topology)
+# are then computed once per dataset, instead of being parsed and evaluated again by every Draw.
+# Only cuts with one value per entry (e.g. mjj > 1000, jet_pt[0] > 80) are combined entry by entry:
+# TTreeFormula applies &&, || and ! row by row to the expressions on arrays, so a combination of such cuts
+# is evaluated as a whole expression, giving the same entries as TTree::Draw.
+# The surviving entry numbers of each cut are saved beside the input file (<input>_selections.npz),
+# and reused by later jobs as long as the input files have not changed.
+#####################################
+
+class Cut(object):
+
+	'''
+	A selection, either a single TTreeFormula expression or a combination of other cuts.
+
+	ARGUMENTS:
+	---expression: The TTreeFormula expression, for a single cut.
+	---name: Name of the cut, used in printouts. By default, the expression.
+	---operator: '&&', '||' or '!' for combined cuts, None for a single cut.
+	---children: The combined cuts.
+	'''
+
+	def __init__(self, expression=None, name=None, operator=None, children=()):
+
+		self.operator = operator
+		self.children = tuple(children)
+
+		if operator is None:
+
+			self.expression = expression
+
+		elif operator == '!':
+
+			self.expression = '!(' + str(self.children[0]) + ')'
+
+		elif operator == '&&':
+
+			self.expression = ' && '.join(str(child) for child in self.children)
+
+		else:
+
+			self.expression = '(' + ' || '.join(str(child) for child in self.children) + ')'
+
+		self.name = name or self.expression
+
+	def __str__(self):
+
+		return self.expression
+
+	def __repr__(self):
+
+		return 'Cut({!r})'.format(self.name)
+
+	def __eq__(self, other):
+
+		return isinstance(other, Cut) and self.expression == other.expression
+
+	def __ne__(self, other):
+
+		return not self == other
+
+	def __hash__(self):
+
+		return hash(self.expression)
+
+	def __and__(self, other):
+
+		return allOf(self, other)
+
+	def __or__(self, other):
+
+		return anyOf(self, other)
+
+	def __invert__(self):
+
+		return Cut(operator='!', children=[self])
+
+	def named(self, name):
+
+		'''
+		Returns the same cut with the given name.
+		'''
+
+		return Cut(self.expression if self.operator is None else None, name, self.operator, self.children)
+
+def _flatten(operator, cuts):
+
+	children = []
+
+	for cut in cuts:
+
+		if not isinstance(cut, Cut):
+
+			cut = Cut(cut)
+
+		if cut.operator == operator:
+
+			children.extend(cut.children)
+
+		elif cut not in children:
+
+			children.append(cut)
+
+	return children
+
+def allOf(*cuts, **kwargs):
+
+	'''
+	AND of the given cuts (Cut objects or expressions), e.g. allOf(cut1, cut2, name='myCut').
+	'''
+
+	children = _flatten('&&', cuts)
+
+	if len(children) == 1: return children[0].named(kwargs['name']) if kwargs.get('name') else children[0]
+
+	return Cut(name=kwargs.get('name'), operator='&&', children=children)
+
+def anyOf(*cuts, **kwargs):
+
+	'''
+	OR of the given cuts (Cut objects or expressions), e.g. anyOf(trigger1, trigger2, name='anyTrigger').
+	'''
+
+	children = _flatten('||', cuts)
+
+	if len(children) == 1: return children[0].named(kwargs['name']) if kwargs.get('name') else children[0]
+
+	return Cut(name=kwargs.get('name'), operator='||', children=children)
+
+class CutTemplate(object):
+
+	'''
+	A cut with parameterized thresholds, e.g.
+
+	mjjAbove = CutTemplate('mjj > {}', 'mjjCut{}')
+	mjjAbove(1000) -> Cut('mjj > 1000') named 'mjjCut1000'
+	'''
+
+	def __init__(self, template, nameTemplate=None):
+
+		self.template = template
+		self.nameTemplate = nameTemplate
+
+	def __call__(self, *args, **kwargs):
+
+		name = self.nameTemplate.format(*args, **kwargs) if self.nameTemplate else None
+
+		return Cut(self.template.format(*args, **kwargs), name)
+
+#####################################
+# Named cuts used in the studies
+#####################################
+
+vetoes = allOf('containsPhoton == 0', 'containsLepton == 0', 'contains_bJet == 0', name='vetoes')
+
+minPhiJetMET = Cut('minPhi_jetMET > 0.5', 'minPhiJetMET')
+
+oppositeHemispheres = Cut('jet_eta[0]*jet_eta[1]<0', 'oppositeHemispheres')
+
+etaSeparation = Cut('absEtaDiff_leadingTwoJets > 2.5', 'etaSeparation')
+
+vbfTopology = allOf(vetoes, minPhiJetMET, oppositeHemispheres, etaSeparation, name='vbfTopology')
+
+eventFilters = allOf('Flag_BadPFMuonFilter == 1', 'Flag_goodVertices == 1', 'Flag_globalSuperTightHalo2016Filter == 1',
+					 'Flag_HBHENoiseFilter == 1', 'Flag_HBHENoiseIsoFilter == 1', 'Flag_EcalDeadCellTriggerPrimitiveFilter == 1', name='eventFilters')
+
+mjjAbove = CutTemplate('mjj > {}', 'mjjCut{}')
+leadingJetPtAbove = CutTemplate('jet_pt[0] > {}', 'leadingJetPtCut{}')
+trailingJetPtAbove = CutTemplate('jet_pt[1] > {}', 'trailingJetPtCut{}')
+metAbove = CutTemplate('met > {}', 'metCut{}')
+
+triggerFired = CutTemplate('{} == 1', '{}')
+triggerFailed = CutTemplate('{} == 0', 'not_{}')
+
+#Eta categories of the two leading jets
+
+twoCentralJets = Cut('(abs(jet_eta[0]) <= 2.5 && abs(jet_eta[1]) <= 2.5)', 'twoCentralJets')
+twoForwardJets = Cut('(abs(jet_eta[0]) > 2.5 && abs(jet_eta[1]) > 2.5)', 'twoForwardJets')
+oneCentralJetOneForwardJet = Cut('((abs(jet_eta[0]) <= 2.5 && abs(jet_eta[1]) > 2.5) || (abs(jet_eta[0]) > 2.5 && abs(jet_eta[1]) <= 2.5))', 'oneCentralJetOneForwardJet')
+
+etaCategories = [twoCentralJets, twoForwardJets, oneCentralJetOneForwardJet]
+
+#####################################
+# Evaluation over a tree
+#####################################
+
+def treeFiles(tree):
+
+	'''
+	Returns the files read by the given tree or chain.
+	'''
+
+	if tree.InheritsFrom('TChain'):
+
+		return [element.GetTitle() for element in tree.GetListOfFiles()]
+
+	return [tree.GetCurrentFile().GetName()]
+
+def selectionCachePath(files):
+
+	'''
+	Returns the path of the selection cache of the given input files, beside the first one.
+	'''
+
+	return os.path.splitext(files[0])[0] + '_selections.npz'
+
+def inputFingerprint(files):
+
+	'''
+	Returns a string identifying the given files by their path, size and modification time.
+	Returns None if any of the files is not local, in which case no cache is used.
+	'''
+
+	info = []
+
+	for path in files:
+
+		if not os.path.isfile(path): return None
+
+		stat = os.stat(path)
+
+		info.append([os.path.abspath(path), stat.st_size, int(stat.st_mtime)])
+
+	return json.dumps(info)
+
+class CutEvaluator(object):
+
+	'''
+	Evaluates cuts over all the entries of a tree as numpy boolean masks.
+	Every single cut is evaluated once (one TTree::Draw pass) and memoized,
+	combined cuts are built from the masks of their pieces.
+	An entry passes a single cut if the expression is true for any of its rows
+	(e.g. for expressions on whole arrays), entries with no rows (e.g. jet_pt[1] with one jet) fail it.
+	Combined cuts are only built from the masks of their pieces if all the pieces have exactly one row per entry,
+	otherwise they are evaluated as a single expression, as TTree::Draw does.
+
+	ARGUMENTS:
+	---tree: The tree (or chain) to read from.
+	---cachePath: The file to load the surviving entries of the cuts from, and save them into. No cache if None.
+	---fingerprint: Identifies the input files, the cache is ignored if it was saved for different files.
+	'''
+
+	def __init__(self, tree, cachePath=None, fingerprint=None):
+
+		self.tree = tree
+		self.numEntries = tree.GetEntries()
+
+		self.cachePath = cachePath if fingerprint is not None else None
+		self.fingerprint = fingerprint
+
+		self.masks = {}
+		self.scalar = {}
+		self.modified = False
+
+		if self.cachePath and os.path.exists(self.cachePath):
+
+			self.load()
+
+	def load(self):
+
+		'''
+		Loads the surviving entries of the cuts saved in the cache file, if it was saved for the same input files.
+		'''
+
+		cache = np.load(self.cachePath)
+
+		if str(cache['fingerprint']) != self.fingerprint: return
+
+		for i, expression in enumerate(json.loads(str(cache['expressions']))):
+
+			mask = np.zeros(self.numEntries, dtype=bool)
+			mask[cache['entries_{}'.format(i)]] = True
+
+			self.masks[expression] = mask
+
+		#Caches saved before the number of rows per entry was recorded: the single cuts are evaluated again when combined
+
+		if 'scalar' in cache.files:
+
+			self.scalar.update(json.loads(str(cache['scalar'])))
+
+		print('INFO: Selections of {} cuts loaded from {}'.format(len(self.masks), self.cachePath))
+
+	def save(self):
+
+		'''
+		Saves the surviving entries of all the cuts evaluated so far into the cache file.
+		'''
+
+		if not (self.cachePath and self.modified): return
+
+		expressions = sorted(self.masks)
+
+		arrays = dict(('entries_{}'.format(i), np.flatnonzero(self.masks[expression])) for i, expression in enumerate(expressions))
+
+		tmpPath = self.cachePath[:-len('.npz')] + '.tmp.npz'
+
+		np.savez_compressed(tmpPath, fingerprint=np.array(self.fingerprint), expressions=np.array(json.dumps(expressions)), scalar=np.array(json.dumps(self.scalar)), **arrays)
+
+		os.rename(tmpPath, self.cachePath)
+
+		self.modified = False
+
+	def _evaluate(self, expression):
+
+		entry, value = drawColumns(self.tree, ['Entry$', expression], numRows=self.numEntries)
+
+		entry = entry.astype(np.int64)
+
+		mask = np.zeros(self.numEntries, dtype=bool)
+
+		np.logical_or.at(mask, entry, value != 0)
+
+		self.scalar[expression] = bool((np.bincount(entry, minlength=self.numEntries) == 1).all())
+
+		return mask
+
+	def isScalar(self, cut):
+
+		'''
+		Returns True if the cut has exactly one row per entry, i.e. all its single cuts do.
+		The single cuts are evaluated if needed.
+		'''
+
+		if cut.operator is not None:
+
+			return all(self.isScalar(child) for child in cut.children)
+
+		key = str(cut)
+
+		if key not in self.scalar:
+
+			self.masks[key] = self._evaluate(key)
+			self.modified = True
+
+		return self.scalar[key]
+
+	def mask(self, cut):
+
+		'''
+		Returns the boolean mask of the entries passing the cut (Cut object or expression).
+		'''
+
+		if not isinstance(cut, Cut):
+
+			cut = Cut(cut)
+
+		key = str(cut)
+
+		if key not in self.masks:
+
+			#A combination of cuts on arrays is evaluated row by row, as by TTreeFormula
+
+			if cut.operator is not None and not self.isScalar(cut):
+
+				self.masks[key] = self._evaluate(key)
+
+			elif cut.operator == '&&':
+
+				self.masks[key] = reduce(np.logical_and, [self.mask(child) for child in cut.children])
+
+			elif cut.operator == '||':
+
+				self.masks[key] = reduce(np.logical_or, [self.mask(child) for child in cut.children])
+
+			elif cut.operator == '!':
+
+				self.masks[key] = ~self.mask(cut.children[0])
+
+			else:
+
+				self.masks[key] = self._evaluate(key)
+
+			self.modified = True
+
+		return self.masks[key]
+
+	def entries(self, cut):
+
+		'''
+		Returns the entry numbers passing the cut.
+		'''
+
+		return np.flatnonzero(self.mask(cut))
+
+	def count(self, cut, weights=None):
+
+		'''
+		Returns the number of entries passing the cut, or the sum of their weights if weights are given.
+		'''
+
+		mask = self.mask(cut)
+
+		if weights is None:
+
+			return int(mask.sum())
+
+		return weights[mask].sum()
+
+_evaluators = {}
+
+def getEvaluator(tree):
+
+	'''
+	Returns the evaluator of the given tree, so the masks are shared by all the functions reading it.
+	The selections are cached beside the input file, see selectionCachePath.
+	'''
+
+	key = id(tree)
+
+	if key not in _evaluators:
+
+		if not _evaluators:
+
+			atexit.register(saveSelectionCaches)
+
+		files = treeFiles(tree)
+
+		_evaluators[key] = (tree, CutEvaluator(tree, selectionCachePath(files), inputFingerprint(files)))
+
+	return _evaluators[key][1]
+
+def saveSelectionCaches():
+
+	'''
+	Saves the selections evaluated so far for all the trees.
+	'''
+
+	for tree, evaluator in _evaluators.values():
+
+		evaluator.save()
@@ -0,0 +1,156 @@
+import os
+import json
+import time
+import socket
+import fcntl
+
+import ROOT
+
+#####################################
+# Incremental datasets
+# Each background job of writeTree.py produces one chunk (a ROOT file with an eventTree)
+# of a sample. The chunks of a sample are listed in a manifest, inputs/<sample>_manifest.json,
+# together with their event counts and provenance.
+# Readers open the manifest as a single TChain, so no merge step is needed,
+# and a new chunk is added by appending it to the manifest without touching the existing chunks.
+#####################################
+
+manifestSuffix = '_manifest.json'
+
+def manifestPath(sample, directory='inputs'):
+
+	'''
+	Returns the path of the manifest for the given sample.
+	'''
+
+	return os.path.join(directory, sample + manifestSuffix)
+
+def isManifest(path):
+
+	return path.endswith(manifestSuffix)
+
+def datasetName(path):
+
+	'''
+	Returns the given path without the .root extension or the manifest suffix.
+	'''
+
+	if isManifest(path):
+
+		return path[:-len(manifestSuffix)]
+
+	return path.replace('.root', '')
+
+def readManifest(path):
+
+	'''
+	Reads the manifest in the given path.
+	Returns an empty manifest if the file does not exist yet.
+	'''
+
+	if not os.path.exists(path):
+
+		return {'sample' : os.path.basename(datasetName(path)), 'treeName' : 'eventTree', 'chunks' : []}
+
+	with open(path, 'r') as f:
+
+		return json.load(f)
+
+def addChunk(path, chunk):
+
+	'''
+	Adds the given chunk to the manifest in the given path, creating the manifest if needed.
+	If a chunk with the same file name is already listed (e.g. the job is rerun), it is replaced.
+	Jobs of the same sample may finish at the same time, so the manifest is locked while it is updated
+	and the new version is moved in place in one step.
+
+	ARGUMENTS:
+	---path: Path of the manifest, see manifestPath.
+	---chunk: Dictionary describing the chunk. Must contain the key 'file', the chunk file name relative to the manifest directory.
+	'''
+
+	with open(path + '.lock', 'w') as lock:
+
+		fcntl.flock(lock, fcntl.LOCK_EX)
+
+		manifest = readManifest(path)
+
+		manifest['chunks'] = [c for c in manifest['chunks'] if c['file'] != chunk['file']]
+		manifest['chunks'].append(chunk)
+		manifest['chunks'].sort(key=lambda c: c['file'])
+
+		tmpPath = path + '.tmp'
+
+		with open(tmpPath, 'w') as f:
+
+			json.dump(manifest, f, indent=2, sort_keys=True)
+
+		os.rename(tmpPath, path)
+
+		fcntl.flock(lock, fcntl.LOCK_UN)
+
+	return manifest
+
+def makeChunk(fileName, **info):
+
+	'''
+	Returns a chunk record for the given chunk file, with the given information
+	(event counts, input files etc.) and the provenance of the job producing it.
+	'''
+
+	chunk = {
+		'file'    : os.path.basename(fileName),
+		'created' : time.strftime('%Y-%m-%d %H:%M:%S'),
+		'host'    : socket.gethostname(),
+	}
+
+	chunk.update(info)
+
+	return chunk
+
+def chunkFiles(path):
+
+	'''
+	Returns the paths of the chunk files listed in the manifest in the given path.
+	'''
+
+	directory = os.path.dirname(path)
+
+	return [os.path.join(directory, chunk['file']) for chunk in readManifest(path)['chunks']]
+
+def totalEvents(path, key='numEvents'):
+
+	'''
+	Returns the sum of the given event count over all the chunks in the manifest.
+	'''
+
+	return sum(chunk.get(key, 0) for chunk in readManifest(path)['chunks'])
+
+def listManifests(directory='inputs', prefix=''):
+
+	'''
+	Returns the sorted list of manifests in the given directory, whose names start with prefix.
+	'''
+
+	return sorted(os.path.join(directory, fileName) for fileName in os.listdir(directory) if fileName.startswith(prefix) and isManifest(fileName))
+
+def openEventTree(inputFile, treeName='eventTree'):
+
+	'''
+	Returns a TChain of the event trees in the given input.
+	The input can either be a single ROOT file or a manifest, in which case all the chunks listed are chained.
+	'''
+
+	chain = ROOT.TChain(treeName)
+
+	if isManifest(inputFile):
+
+		for chunkFile in chunkFiles(inputFile):
+
+			chain.Add(chunkFile)
+
+	else:
+
+		chain.Add(inputFile)
+
+	return chain
@@ -0,0 +1,317 @@
+import ROOT
+import os
+import numpy as np
+
+from lib.columns import loadScalars, loadJagged
+from lib.kinematics import pairIndices, pairMasses
+from lib.angularVariables import absEtaDiff, etaProduct, deltaRLeadingTwoJets, minDeltaPhiJetMET
+from lib.cuts import treeFiles, inputFingerprint
+from lib.cppHelpers import declareOnce
+
+#####################################
+# Dijet variables recomputed from the jets stored in eventTree
+# mjj, absEtaDiff_leadingTwoJets and minPhi_jetMET are stored by writeTree.py for the two leading tight jets.
+# Here, the pair of jets is chosen per event by a pairing strategy, and the variables of the pair
+# are computed from the jet_pt/eta/phi/energy arrays, for all the events at once.
+# The results are attached to the tree as a friend tree named after the strategy, so every function
+# drawing from the tree can use them as columns, e.g.
+#
+#   alias = addDerivedVariables(tree, 'maxMjj')
+#   tree.Draw('maxMjj.mjj>>hist', 'maxMjj.absEtaDiff > 2.5', '')
+#
+# The friend trees are saved beside the input (<input>_<alias>.root), and reused as long as the input files are not changed.
+#####################################
+
+#Value of the variables in events without a pair, as in eventTree
+
+missingValue = -999.
+
+def leadingPair(pt, eta, phi, energy, ptCut=0.):
+
+	'''
+	The two leading jets, as in eventTree.
+	'''
+
+	with np.errstate(invalid='ignore'):
+
+		accepted = (pt[:, 0] > ptCut) & (pt[:, 1] > ptCut) if pt.shape[1] >= 2 else np.zeros(len(pt), dtype=bool)
+
+	return np.where(accepted, 0, -1), np.where(accepted, 1, -1)
+
+def maxMjjPair(pt, eta, phi, energy, ptCut=0.):
+
+	'''
+	The pair of jets with the largest invariant mass.
+	'''
+
+	i, j = pairIndices(pt.shape[1])
+
+	masses = pairMasses(pt, eta, phi, energy)
+
+	with np.errstate(invalid='ignore'):
+
+		masses = np.where((pt[:, i] > ptCut) & (pt[:, j] > ptCut), masses, -1.)
+
+	if not len(i): return np.full(len(pt), -1), np.full(len(pt), -1)
+
+	best = masses.argmax(axis=1)
+
+	accepted = masses.max(axis=1) >= 0
+
+	return np.where(accepted, i[best], -1), np.where(accepted, j[best], -1)
+
+def forwardMostPair(pt, eta, phi, energy, ptCut=0.):
+
+	'''
+	The most forward and the most backward jets, i.e. the pair with the largest eta separation.
+	'''
+
+	with np.errstate(invalid='ignore'):
+
+		accepted = pt > ptCut
+
+	forward = np.where(accepted, eta, -np.inf).argmax(axis=1)
+	backward = np.where(accepted, eta, np.inf).argmin(axis=1)
+
+	hasPair = accepted.sum(axis=1) >= 2
+
+	#The jets are returned in the order of pt, as in eventTree
+
+	first, second = np.minimum(forward, backward), np.maximum(forward, backward)
+
+	return np.where(hasPair, first, -1), np.where(hasPair, second, -1)
+
+#Pairing strategies: functions of the (events x jets) arrays and the jet pt cut,
+#returning the indices of the two jets per event, -1 if there is no pair
+
+pairingStrategies = {
+	'leading' : leadingPair,
+	'maxMjj' : maxMjjPair,
+	'forwardMost' : forwardMostPair,
+}
+
+def pairValues(arrays, first, second):
+
+	'''
+	Returns, for each of the given (events x jets) arrays, the (events x 2) array of the values of the two jets of the pair.
+	Events without a pair (index -1) get the values of the first jet, to be masked by the caller.
+	'''
+
+	rows = np.arange(len(first))
+
+	return [np.column_stack([values[rows, np.maximum(first, 0)], values[rows, np.maximum(second, 0)]]) if values.shape[1] else np.full((len(first), 2), np.nan)
+			for values in arrays]
+
+def computeDerivedVariables(pt, eta, phi, energy, metPhi, strategy='maxMjj', ptCut=0.):
+
+	'''
+	Returns a dictionary of the variables of the jet pair chosen by the strategy, one value per event:
+	-- jet1, jet2   : Indices of the two jets, -1 if there is no pair
+	-- mjj          : Invariant mass of the pair
+	-- absEtaDiff   : |delta eta| of the pair
+	-- etaProduct   : Product of the eta of the two jets
+	-- deltaR       : delta R of the pair
+	-- minPhi_jetMET: Minimum delta phi between the four leading jets and MET, as in eventTree (see lib/angularVariables.py)
+	The variables of the events without a pair are set to missingValue.
+
+	ARGUMENTS:
+	---pt, eta, phi, energy: (events x jets) arrays, padded with NaN (see lib/columns.py).
+	---metPhi: MET phi per event.
+	---strategy: Name of the pairing strategy, one of pairingStrategies.
+	---ptCut: Only the jets with pt > ptCut are paired.
+	'''
+
+	if strategy not in pairingStrategies:
+
+		raise ValueError('Unknown pairing strategy {}, should be one of the following: {}'.format(strategy, ', '.join(sorted(pairingStrategies))))
+
+	first, second = pairingStrategies[strategy](pt, eta, phi, energy, ptCut)
+
+	hasPair = first >= 0
+
+	#Kinematics of the two jets, as (events x 2) arrays
+
+	pair = pairValues((pt, eta, phi, energy), first, second)
+
+	variables = {
+		'mjj' : pairMasses(*pair)[:, 0],
+		'absEtaDiff' : absEtaDiff(pair[1]),
+		'etaProduct' : etaProduct(pair[1]),
+		'deltaR' : deltaRLeadingTwoJets(pair[1], pair[2]),
+	}
+
+	for name in variables:
+
+		variables[name] = np.where(hasPair, variables[name], missingValue)
+
+	variables['jet1'], variables['jet2'] = first.astype(np.float64), second.astype(np.float64)
+
+	variables['minPhi_jetMET'] = minDeltaPhiJetMET(pt, phi, metPhi)
+
+	return variables
+
+def loadJets(tree):
+
+	'''
+	Returns the jet kinematics of all the entries of the tree as (events x jets) arrays, and MET phi.
+	'''
+
+	counts, jets = loadJagged(tree, 'nJet', ['jet_pt', 'jet_eta', 'jet_phi', 'jet_energy'])
+
+	metPhi = loadScalars(tree, ['met_phi'])['met_phi']
+
+	return jets['jet_pt'], jets['jet_eta'], jets['jet_phi'], jets['jet_energy'], metPhi
+
+#####################################
+# Friend trees
+#####################################
+
+_friendTreeCode = '''
+#include "TTree.h"
+
+namespace vbfStudies {
+
+	// Fills the tree with the given rows, the branches of the tree pointing to the elements of buffer
+	void fillFriendTree(TTree* tree, Double_t* buffer, const Double_t* data, Long64_t numRows, Int_t numColumns) {
+
+		for (Long64_t i = 0; i < numRows; ++i) {
+
+			for (Int_t k = 0; k < numColumns; ++k) buffer[k] = data[i*numColumns + k];
+
+			tree->Fill();
+		}
+	}
+}
+'''
+
+def declareFriendTrees():
+
+	declareOnce(_friendTreeCode, 'friend tree helper')
+
+def strategyAlias(strategy, ptCut=0.):
+
+	'''
+	Returns the name of the friend tree of the given strategy and jet pt cut, e.g. maxMjj or maxMjj_pt30.
+	'''
+
+	if not ptCut: return strategy
+
+	return '{}_pt{}'.format(strategy, '{:g}'.format(ptCut).replace('.', 'p'))
+
+def friendPath(files, alias):
+
+	'''
+	Returns the path of the friend tree of the given input files, beside the first one.
+	'''
+
+	return os.path.splitext(files[0])[0] + '_{}.root'.format(alias)
+
+def fillFriendTree(name, variables, directory=None):
+
+	'''
+	Returns a new tree filled with the given variables, one branch per variable.
+	'''
+
+	declareFriendTrees()
+
+	names = sorted(variables)
+
+	data = np.ascontiguousarray(np.column_stack([variables[name] for name in names]), dtype=np.float64)
+
+	buffer = np.zeros(len(names), dtype=np.float64)
+
+	if directory: directory.cd()
+
+	friend = ROOT.TTree(name, name)
+
+	if not directory: friend.SetDirectory(0)
+
+	for k, branchName in enumerate(names):
+
+		friend.Branch(branchName, buffer[k:k+1], branchName + '/D')
+
+	ROOT.vbfStudies.fillFriendTree(friend, buffer, data, len(data), len(names))
+
+	return friend
+
+def loadFriendTree(path, alias, fingerprint):
+
+	'''
+	Returns the friend tree saved in path and its file, if it was saved for the same input files.
+	Otherwise returns None, None.
+	'''
+
+	if fingerprint is None or not os.path.exists(path): return None, None
+
+	friendFile = ROOT.TFile.Open(path, 'READ')
+
+	saved = friendFile.Get('fingerprint')
+
+	if not saved or saved.GetTitle() != fingerprint:
+
+		friendFile.Close()
+
+		return None, None
+
+	return friendFile.Get(alias), friendFile
+
+_friends = {}
+
+def addDerivedVariables(tree, strategy='maxMjj', ptCut=0.):
+
+	'''
+	Attaches the derived variables of the given pairing strategy to the tree as a friend tree,
+	computing them if they are not saved beside the input yet.
+	Returns the name of the friend, to be used in the expressions, e.g. 'maxMjj.mjj'.
+	'''
+
+	alias = strategyAlias(strategy, ptCut)
+
+	#The tree is kept in _friends, so its id is not reused by another tree; the friend is also checked on the tree itself
+
+	key = (id(tree), alias)
+
+	if key in _friends and _friends[key][0] is tree and tree.GetFriend(alias): return alias
+
+	files = treeFiles(tree)
+
+	fingerprint = inputFingerprint(files)
+
+	path = friendPath(files, alias)
+
+	friend, friendFile = loadFriendTree(path, alias, fingerprint)
+
+	if friend:
+
+		print('INFO: Derived variables ({}) loaded from {}'.format(alias, path))
+
+	else:
+
+		variables = computeDerivedVariables(*loadJets(tree), strategy=strategy, ptCut=ptCut)
+
+		if fingerprint is None: #Not a local input, the friend tree is kept in memory
+
+			friend, friendFile = fillFriendTree(alias, variables), None
+
+		else:
+
+			friendFile = ROOT.TFile.Open(path, 'RECREATE')
+
+			friend = fillFriendTree(alias, variables, friendFile)
+
+			friendFile.WriteTObject(ROOT.TNamed('fingerprint', fingerprint))
+			friendFile.WriteTObject(friend)
+
+			print('INFO: Derived variables ({}) saved in {}'.format(alias, path))
+
+	if friend.GetEntries() != tree.GetEntries():
+
+		raise RuntimeError('The friend tree {} has {} entries, the tree has {}'.format(alias, friend.GetEntries(), tree.GetEntries()))
+
+	tree.AddFriend(friend, alias)
+
+	#Keep the friend tree and its file open as long as the tree is used
+
+	_friends[key] = (tree, friend, friendFile)
+
+	return alias
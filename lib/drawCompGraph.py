@@ -1,7 +1,11 @@
 import ROOT
 import numpy as np
 import os
-from array import array
+
+from lib.outputStore import getOutputStore
+from lib.plotting import submitPlot
+from lib.cuts import Cut, vbfTopology, mjjAbove, leadingJetPtAbove, trailingJetPtAbove
+from lib.triggerComparison import compareTriggers
 
 def drawCompGraph(histo1, histo2, label1, label2, variable, cuts, case=None):
 
@@ -50,14 +54,6 @@ def drawCompGraph(histo1, histo2, label1, label2, variable, cuts, case=None):
 	histo2.SetLineColor(ROOT.kRed)
 	histo2.SetLineWidth(2)
 
-	legend = ROOT.TLegend(0.6, 0.6, 0.85, 0.85)
-	legend.SetBorderSize(0)
-	
-	legend.AddEntry(histo1, label1, 'l')
-	legend.AddEntry(histo2, label2, 'l')
-
-	canv = ROOT.TCanvas('canv', 'canv')
-
 	x_label = variable + ' (GeV)' #x-axis label
 	
 	if histo2.GetMaximum() > histo1.GetMaximum():
@@ -67,8 +63,7 @@ def drawCompGraph(histo1, histo2, label1, label2, variable, cuts, case=None):
 
 		histo2.SetTitle('')
 
-		histo2.Draw()
-		histo1.Draw('same')
+		items = [(histo2, ''), (histo1, 'same')]
 	
 	else:
 	
@@ -77,20 +72,19 @@ def drawCompGraph(histo1, histo2, label1, label2, variable, cuts, case=None):
 
 		histo1.SetTitle('')
 
-		histo1.Draw()
-		histo2.Draw('same')
+		items = [(histo1, ''), (histo2, 'same')]
 
-	legend.Draw('same')
+	legend = {'position' : (0.6, 0.6, 0.85, 0.85), 'entries' : [(histo1, label1, 'l'), (histo2, label2, 'l')]}
 	
 	if variable == 'mjj':
 
 		filename = label1 + '_' + label2 + '_' + str(leadingJetPtCut) + '_' + str(trailingJetPtCut) + '.png'
 	
-	elif variable == 'MET':
+	else:
 
 		filename = label1 + '_' + label2 + '_' + str(mjjCut) + '_' + str(leadingJetPtCut) + '_' + str(trailingJetPtCut) + '.png'
 
-	#Take or create the relevant directory to save png files
+	#Take the relevant directory to save png files
 
 	if case:
 	
@@ -99,101 +93,100 @@ def drawCompGraph(histo1, histo2, label1, label2, variable, cuts, case=None):
 	else:
 
 		dirName = 'pngImages/triggerCompPlots/' + variable + '_plots/allInclusive'
-	
-	if not os.path.isdir(dirName):
-
-		os.makedirs(dirName)
 
 	filePath = os.path.join(dirName, filename)
 
-	canv.Print(filePath)
+	#The png file is rendered in the background, see lib/plotting.py
+
+	submitPlot(filePath, items, legend=legend)
 
 	print('{} comparison plot saved'.format(variable))
 	print('Filename: {}\n'.format(filePath))
 
 ############################################
 
-def drawCompGraph_mjj(dataFile, trigger1, trigger2, label1, label2, cuts, seperateRegions=False):
+#Variables of the comparison plots: the expression in eventTree and the bin edges
+
+comparisonBinning = {'mjj' : ('mjj', np.arange(500., 5000., 100.)), 'MET' : ('met', np.arange(50., 500., 25.))}
+
+#Regions of the two leading jets, used if seperateRegions is True
+
+etaRegions = {
+	'twoJetsInBarrel' : Cut('abs(jet_eta[0]) < 1.479 && abs(jet_eta[1]) < 1.479', 'twoJetsInBarrel'),
+	'twoJetsInEndcap' : Cut('abs(jet_eta[0]) > 1.479 && abs(jet_eta[1]) > 1.479', 'twoJetsInEndcap'),
+	'oneJetInBarrel_oneJetInEndcap' : Cut('((abs(jet_eta[0]) > 1.479 && abs(jet_eta[1]) < 1.479) || (abs(jet_eta[0]) < 1.479 && abs(jet_eta[1]) > 1.479))', 'oneJetInBarrel_oneJetInEndcap')
+}
+
+def drawCompGraphs(dataFile, triggers, labels, cuts, variables=('mjj', 'MET'), seperateRegions=False):
 
 	'''
-	Draws the VBF cuts + trigger acceptance graph for two triggers, as a function of invariant mass of two jets, mjj.
-	Takes the data from the input eventTree.
-	Cuts on mjj, leadingJetPt, trailingJetPt and met must be specified in the cuts list.
-	If seperateRegions option is specified as True, comparison graphs for three different cases are to be plotted:
-	--- Two Forward Jets
-	--- Two Central Jets
-	--- Mixed (one central, one forward jet)
-	'''
+	Draws the VBF cuts + trigger acceptance comparison graphs for every pair of the given triggers and every given variable.
+	The tree is read once for all the triggers and variables, see lib/triggerComparison.py.
+	Returns the TriggerComparison, which also holds the overlap categories of each pair of triggers.
 
-	print('Working on mjj comparison plot')
-	print('Trigger1 : {}'.format(label1))
-	print('Trigger2 : {}'.format(label2))
+	ARGUMENTS:
+	---dataFile: The input ROOT file containing eventTree, or a manifest listing several such files (see lib/dataset.py).
+	---triggers: List of triggers to be compared.
+	---labels: Labels of the triggers, to be shown in the legends and the png file names.
+	---cuts: A list or tuple containing mjj, leading jet pt and trailing jet pt cuts.
+			 The mjj cut is applied to all the variables except mjj.
+	---variables: The variables on the x-axis, 'mjj' and/or 'MET'.
+	---seperateRegions: If True, the graphs are drawn for the three eta regions of the two leading jets seperately.
+	'''
 
 	ROOT.gStyle.SetOptStat(0)
-	#ROOT.TH1.AddDirectory(False)
 
-	mjj_array = np.arange(500., 5000., 100.)  
+	mjjCut, leadingJetPtCut, trailingJetPtCut = cuts[0], cuts[1], cuts[2]
 
-	fin = ROOT.TFile(dataFile)
+	tree = getOutputStore().eventTree(dataFile)
 
-	#Get the relevant cuts
-	leadingJetPtCut, trailingJetPtCut = cuts[1], cuts[2]
+	baseCuts = vbfTopology & leadingJetPtAbove(leadingJetPtCut) & trailingJetPtAbove(trailingJetPtCut)
 
-	if seperateRegions:
+	variableSpecs = {}
 
-	#############################
-	#THIS BLOCK IS TO BE UPDATED FOR THE NEW DATA FILES
-	#DON'T USE IT RIGHT NOW
-	#############################
+	for variable in variables:
 
-		hist1_twoJetsInBarrel = ROOT.TH1F('hist1_twoJetsInBarrel', trigger1, len(mjj_array) - 1, array('f', mjj_array))
-		hist2_twoJetsInBarrel = ROOT.TH1F('hist2_twoJetsInBarrel', trigger2, len(mjj_array) - 1, array('f', mjj_array))
-		hist1_twoJetsInEndcap = ROOT.TH1F('hist1_twoJetsInEndcap', trigger1, len(mjj_array) - 1, array('f', mjj_array))
-		hist2_twoJetsInEndcap = ROOT.TH1F('hist2_twoJetsInEndcap', trigger2, len(mjj_array) - 1, array('f', mjj_array))
-		hist1_oneJetInBarrel_oneJetInEndcap = ROOT.TH1F('hist1_oneJetInBarrel_oneJetInEndcap', trigger1, len(mjj_array) - 1, array('f', mjj_array))
-		hist2_oneJetInBarrel_oneJetInEndcap = ROOT.TH1F('hist2_oneJetInBarrel_oneJetInEndcap', trigger2, len(mjj_array) - 1, array('f', mjj_array))
+		expression, edges = comparisonBinning[variable]
 
-		cuts1 = 'containsPhoton == 0 && containsLepton == 0 && contains_bJet == 0 && minPhi_jetMET > 0.5 && jet_eta[0]*jet_eta[1]<0 && absEtaDiff_leadingTwoJets > 2.5 && mjj > ' + str(mjjCut) + ' && jet_pt[0] > ' + str(leadingJetPtCut) + ' && jet_pt[1] > ' + str(trailingJetPtCut) + ' && ' + trigger1 + ' == 1' 
+		variableSpecs[variable] = (expression, edges, None if variable == 'mjj' else mjjAbove(mjjCut))
 
-		cuts2 = 'containsPhoton == 0 && containsLepton == 0 && contains_bJet == 0 && minPhi_jetMET > 0.5 && jet_eta[0]*jet_eta[1]<0 && absEtaDiff_leadingTwoJets > 2.5 && mjj > ' + str(mjjCut) + ' && jet_pt[0] > ' + str(leadingJetPtCut) + ' && jet_pt[1] > ' + str(trailingJetPtCut) + ' && ' + trigger2 + ' == 1' 
+	comparison = compareTriggers(tree, triggers, variableSpecs, baseCuts, labels, etaRegions if seperateRegions else None)
 
-		fin.cd()
+	cases = sorted(etaRegions) if seperateRegions else [None]
 
-		#####################
-		#ETA RANGES SHOULD BE CHECKED!
-		#####################
+	for trigger1, trigger2 in comparison.pairs():
 
-		fin.eventTree.Draw('mjj>>hist1_twoJetsInBarrel', cuts1 + ' && abs(jet_eta[0]) < 1.479 && abs(jet_eta[1]) < 1.479', '') 
-		fin.eventTree.Draw('mjj>>hist2_twoJetsInBarrel', cuts2 + ' && abs(jet_eta[0]) < 1.479 && abs(jet_eta[1]) < 1.479', '')
-		
-		fin.eventTree.Draw('mjj>>hist1_twoJetsInEndcap', cuts1 + ' && abs(jet_eta[0]) > 1.479 && abs(jet_eta[1]) > 1.479', '')
-		fin.eventTree.Draw('mjj>>hist2_twoJetsInEndcap', cuts2 + ' && abs(jet_eta[0]) > 1.479 && abs(jet_eta[1]) > 1.479', '')
+		label1, label2 = comparison.labels[trigger1], comparison.labels[trigger2]
 
-		fin.eventTree.Draw('mjj>>hist1_oneJetInBarrel_oneJetInEndcap', cuts1 + ' && (abs(jet_eta[0]) > 1.479 && abs(jet_eta[1]) < 1.479) || (abs(jet_eta[0]) < 1.479 && abs(jet_eta[1]) > 1.479)', '')
-		fin.eventTree.Draw('mjj>>hist2_oneJetInBarrel_oneJetInEndcap', cuts2 + ' && (abs(jet_eta[0]) > 1.479 && abs(jet_eta[1]) < 1.479) || (abs(jet_eta[0]) < 1.479 && abs(jet_eta[1]) > 1.479)', '')
-		
-		#Construct histograms for all cases 
-		
-		drawCompGraph(hist1_twoJetsInBarrel, hist2_twoJetsInBarrel, label1, label2, 'mjj', 'twoJetsInBarrel', cuts)
+		for variable in variables:
 
-		drawCompGraph(hist1_twoJetsInEndcap, hist2_twoJetsInEndcap, label1, label2, 'mjj', 'twoJetsInEndcap', cuts)
+			for case in cases:
 
-		drawCompGraph(hist1_oneJetInBarrel_oneJetInEndcap, hist2_oneJetInBarrel_oneJetInEndcap, label1, label2, 'mjj', 'oneJetInBarrel_oneJetInEndcap', cuts)
-		
-	else:
+				hist1 = comparison.acceptance(trigger1, variable, case)
+				hist2 = comparison.acceptance(trigger2, variable, case)
 
-		hist1 = ROOT.TH1F('hist1', trigger1, len(mjj_array)-1, mjj_array)
-		hist2 = ROOT.TH1F('hist2', trigger2, len(mjj_array)-1, mjj_array)
-		
-		cuts1 = 'minPhi_jetMET > 0.5 && jet_eta[0]*jet_eta[1]<0 && absEtaDiff_leadingTwoJets > 2.5 && jet_pt[0] > ' + str(leadingJetPtCut) + ' && jet_pt[1] > ' + str(trailingJetPtCut) + ' && ' + trigger1 + ' == 1' 
-		cuts2 = 'minPhi_jetMET > 0.5 && jet_eta[0]*jet_eta[1]<0 && absEtaDiff_leadingTwoJets > 2.5 && jet_pt[0] > ' + str(leadingJetPtCut) + ' && jet_pt[1] > ' + str(trailingJetPtCut) + ' && ' + trigger2 + ' == 1' 
+				drawCompGraph(hist1, hist2, label1, label2, variable, cuts, case)
 
-		fin.eventTree.Draw('mjj>>hist1', cuts1, '')
-		fin.eventTree.Draw('mjj>>hist2', cuts2, '')
+	return comparison
+
+def drawCompGraph_mjj(dataFile, trigger1, trigger2, label1, label2, cuts, seperateRegions=False):
+
+	'''
+	Draws the VBF cuts + trigger acceptance graph for two triggers, as a function of invariant mass of two jets, mjj.
+	Takes the data from the input eventTree.
+	Cuts on mjj, leadingJetPt, trailingJetPt and met must be specified in the cuts list.
+	If seperateRegions option is specified as True, comparison graphs for three different cases are to be plotted:
+	--- Two Forward Jets
+	--- Two Central Jets
+	--- Mixed (one central, one forward jet)
+	To compare more triggers or variables at once, use drawCompGraphs.
+	'''
 
-		drawCompGraph(hist1, hist2, label1, label2, 'mjj', cuts)
+	print('Working on mjj comparison plot')
+	print('Trigger1 : {}'.format(label1))
+	print('Trigger2 : {}'.format(label2))
 
-	fin.Close()
+	return drawCompGraphs(dataFile, [trigger1, trigger2], [label1, label2], cuts, ['mjj'], seperateRegions)
 
 ###########################
 
@@ -203,75 +196,11 @@ def drawCompGraph_MET(dataFile, trigger1, trigger2, label1, label2, cuts, sepera
 	Draws the VBF cuts + trigger acceptance graph for two triggers, as a function of MET.
 	Takes the data from the input eventTree.
 	Cuts on mjj, leadingJetPt, trailingJetPt and met must be specified in the cuts list.
+	To compare more triggers or variables at once, use drawCompGraphs.
 	'''
 
 	print('Working on MET comparison plot')
 	print('Trigger1 : {}'.format(label1))
 	print('Trigger2 : {}'.format(label2))
 
-	ROOT.gStyle.SetOptStat(0)
-	#ROOT.TH1.AddDirectory(False)
-
-	met_array = np.arange(50., 500., 25.)  
-
-	fin = ROOT.TFile(dataFile)
-
-	#Get the relevant cuts
-	mjjCut, leadingJetPtCut, trailingJetPtCut = cuts[0], cuts[1], cuts[2]
-
-	if seperateRegions:
-
-	#############################
-	#THIS BLOCK IS TO BE UPDATED FOR THE NEW DATA FILES
-	#DON'T USE IT RIGHT NOW
-	#############################
-		
-		hist1_twoJetsInBarrel = ROOT.TH1F('hist1_twoJetsInBarrel', trigger1, len(met_array) - 1, array('f', met_array))
-		hist2_twoJetsInBarrel = ROOT.TH1F('hist2_twoJetsInBarrel', trigger2, len(met_array) - 1, array('f', met_array))
-		hist1_twoJetsInEndcap = ROOT.TH1F('hist1_twoJetsInEndcap', trigger1, len(met_array) - 1, array('f', met_array))
-		hist2_twoJetsInEndcap = ROOT.TH1F('hist2_twoJetsInEndcap', trigger2, len(met_array) - 1, array('f', met_array))
-		hist1_oneJetInBarrel_oneJetInEndcap = ROOT.TH1F('hist1_oneJetInBarrel_oneJetInEndcap', trigger1, len(met_array) - 1, array('f', met_array))
-		hist2_oneJetInBarrel_oneJetInEndcap = ROOT.TH1F('hist2_oneJetInBarrel_oneJetInEndcap', trigger2, len(met_array) - 1, array('f', met_array))
-
-		cuts1 = 'containsPhoton == 0 && containsLepton == 0 && contains_bJet == 0 && minPhi_jetMET > 0.5 && jet_eta[0]*jet_eta[1]<0 && absEtaDiff_leadingTwoJets > 2.5 && mjj > ' + str(mjjCut) + ' && jet_pt[0] > ' + str(leadingJetPtCut) + ' && jet_pt[1] > ' + str(trailingJetPtCut) + ' && ' + trigger1 + ' == 1' 
-
-		cuts2 = 'containsPhoton == 0 && containsLepton == 0 && contains_bJet == 0 && minPhi_jetMET > 0.5 && jet_eta[0]*jet_eta[1]<0 && absEtaDiff_leadingTwoJets > 2.5 && mjj > ' + str(mjjCut) + ' && jet_pt[0] > ' + str(leadingJetPtCut) + ' && jet_pt[1] > ' + str(trailingJetPtCut) + ' && ' + trigger2 + ' == 1' 
-
-		fin.cd()
-
-		#####################
-		#ETA RANGES SHOULD BE CHECKED!
-		#####################
-
-		fin.eventTree.Draw('met>>hist1_twoJetsInBarrel', cuts1 + ' && abs(jet_eta[0]) < 1.479 && abs(jet_eta[1]) < 1.479', '') 
-		fin.eventTree.Draw('met>>hist2_twoJetsInBarrel', cuts2 + ' && abs(jet_eta[0]) < 1.479 && abs(jet_eta[1]) < 1.479', '')
-		
-		fin.eventTree.Draw('met>>hist1_twoJetsInEndcap', cuts1 + ' && abs(jet_eta[0]) > 1.479 && abs(jet_eta[1]) > 1.479', '')
-		fin.eventTree.Draw('met>>hist2_twoJetsInEndcap', cuts2 + ' && abs(jet_eta[0]) > 1.479 && abs(jet_eta[1]) > 1.479', '')
-
-		fin.eventTree.Draw('met>>hist1_oneJetInBarrel_oneJetInEndcap', cuts1 + ' && ((abs(jet_eta[0]) > 1.479 && abs(jet_eta[1]) < 1.479) || (abs(jet_eta[0]) < 1.479 && abs(jet_eta[1]) > 1.479))', '')
-		fin.eventTree.Draw('met>>hist2_oneJetInBarrel_oneJetInEndcap', cuts2 + ' && ((abs(jet_eta[0]) > 1.479 && abs(jet_eta[1]) < 1.479) || (abs(jet_eta[0]) < 1.479 && abs(jet_eta[1]) > 1.479))', '')
-
-		#Construct histograms for all cases 
-		
-		drawCompGraph(hist1_twoJetsInBarrel, hist2_twoJetsInBarrel, label1, label2, 'MET', 'twoJetsInBarrel', cuts)
-
-		drawCompGraph(hist1_twoJetsInEndcap, hist2_twoJetsInEndcap, label1, label2, 'MET', 'twoJetsInEndcap', cuts)
-
-		drawCompGraph(hist1_oneJetInBarrel_oneJetInEndcap, hist2_oneJetInBarrel_oneJetInEndcap, label1, label2, 'MET', 'oneJetInBarrel_oneJetInEndcap', cuts)
-
-	else:
-
-		hist1 = ROOT.TH1F('hist1',  trigger1,  len(met_array)-1, met_array)
-		hist2 = ROOT.TH1F('hist2',  trigger2,  len(met_array)-1, met_array)
-
-		cuts1 = 'minPhi_jetMET > 0.5 && jet_eta[0]*jet_eta[1]<0 && absEtaDiff_leadingTwoJets > 2.5 && mjj > ' + str(mjjCut) + ' && jet_pt[0] > ' + str(leadingJetPtCut) + ' && jet_pt[1] > ' + str(trailingJetPtCut) + ' && ' + trigger1 + ' == 1' 
-		cuts2 = 'minPhi_jetMET > 0.5 && jet_eta[0]*jet_eta[1]<0 && absEtaDiff_leadingTwoJets > 2.5 && mjj > ' + str(mjjCut) + ' && jet_pt[0] > ' + str(leadingJetPtCut) + ' && jet_pt[1] > ' + str(trailingJetPtCut) + ' && ' + trigger2 + ' == 1' 
-
-		fin.eventTree.Draw('met>>hist1', cuts1, '')
-		fin.eventTree.Draw('met>>hist2', cuts2, '')
-
-		drawCompGraph(hist1, hist2, label1, label2, 'MET', cuts)
-
-	fin.Close()
-
+	return drawCompGraphs(dataFile, [trigger1, trigger2], [label1, label2], cuts, ['MET'], seperateRegions)
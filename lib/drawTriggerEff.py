@@ -3,12 +3,47 @@ import os
 import numpy as np 
 from array import array
 
-def constructTriggerEff(histo_cut, histo_all, trigger, args, pngDir, fileName):
+from lib.outputStore import getOutputStore
+from lib.plotting import submitPlot
+from lib.entryLists import onlyEntries
+from lib.columns import loadScalars
+from lib.results import Results
+from lib.cuts import vbfTopology, eventFilters, mjjAbove, leadingJetPtAbove, trailingJetPtAbove, twoCentralJets, twoForwardJets, oneCentralJetOneForwardJet, getEvaluator, treeFiles, inputFingerprint
+
+#Eta categories of the two leading jets, as (name, cut)
+
+jetEtaCategories = [('twoCentralJets', twoCentralJets), ('twoForwardJets', twoForwardJets), ('oneCentralJetOneForwardJet', oneCentralJetOneForwardJet)]
+
+def getTriggerOutput(trigger, args, recreate=False):
+
+	'''
+	Returns the output file (see lib/outputStore.py) for the histograms and efficiency graphs of the given trigger,
+	output/<trigger>/<trigger>.root, or <trigger>_test.root in test mode.
+	The objects are written when flushOutputs() is called at the end of the job.
+	'''
+
+	outputDir = 'output/' + trigger
+
+	if not os.path.isdir(outputDir):
+	
+		os.makedirs(outputDir)
+
+	if args.test:
+
+		fileName = trigger + '_test.root'
+
+	else:
+
+		fileName = trigger + '.root'
+
+	return getOutputStore().file(os.path.join(outputDir, fileName), recreate=recreate)
+
+def constructTriggerEff(histo_cut, histo_all, trigger, args, pngDir, fileName, output, folderName):
 
 	'''
 	Draws and saves the efficiency graph for a given trigger, given two historgrams.
 	Saves the graph both as a graph in the relevant ROOT file and a png file in the relevant directory (if noWrite option is NOT specified while running the main script).
-	Saves the png file in the given directory pngDir, and filename will be fileName. Creates the pngDir if not already created.
+	Saves the png file in the given directory pngDir, and filename will be fileName. The png file is rendered in the background (see lib/plotting.py).
 	Called in other drawTriggerEff functions.
 	
 	ARGUMENTS:
@@ -18,6 +53,8 @@ def constructTriggerEff(histo_cut, histo_all, trigger, args, pngDir, fileName):
 	---args: This is the arguments parsed in while calling ../readTree.py.
 	---pngDir: The name of the directory to save the histogram as a .png file.
 	---fileName: The name of the .png file to be saved.
+	---output: The output file to save the graph into, see getTriggerOutput.
+	---folderName: The folder in the output file to save the graph into.
 	'''
 
 	#Obtain the variable to be plotted and the case (two jets forward, central etc...)
@@ -44,249 +81,211 @@ def constructTriggerEff(histo_cut, histo_all, trigger, args, pngDir, fileName):
 	
 		if not args.noWrite:
 
-			eff_graph.Write('eff_graph_' + trigger + '_' + variable + '_' + case)
+			output.put(eff_graph, 'eff_graph_' + trigger + '_' + variable + '_' + case, folderName)
+
+		#The png file is rendered in the background, see lib/plotting.py
 
-		canv = ROOT.TCanvas('canv', 'canv')
+		submitPlot(os.path.join(pngDir, fileName), [(eff_graph, 'AP')], yRange=(0, 1))
 	
-		eff_graph.Draw('AP')
-		
-		ROOT.gPad.Update()
-		graph = eff_graph.GetPaintedGraph()
-		graph.SetMinimum(0)
-		graph.SetMaximum(1)
+		print('Efficiency graph for ' + trigger + ' with respect to mjj is constructed!')
+		print('CASE: {}\n'.format(case))
 
-		#text.Draw('same')
-		
-		if not args.noWrite:
 
-			eff_graph.Write('eff_graph_' + trigger + '_' + variable + '_' + case)
+def triggerEffResults(inputFile, tree, trigger, variable, vbfCuts):
 
-		#Create the relevant dir if not already present
+	'''
+	Returns an empty Results (see lib/results.py) for the efficiency of the trigger as a function of the given variable,
+	recording the input file and the settings, so that only the results of the same efficiency are merged.
+	'''
 
-		if not os.path.isdir(pngDir):
+	return Results({inputFile : inputFingerprint(treeFiles(tree))}, {'analysis' : 'triggerEff', 'trigger' : trigger, 'variable' : variable, 'vbfCuts' : str(vbfCuts)})
 
-			os.makedirs(pngDir)
+def fillTriggerEff(results, tree, trigger, variable, expression, edges, vbfCuts, categories=None):
 
-		canv.Print(os.path.join(pngDir, fileName))
-	
-		print('Efficiency graph for ' + trigger + ' with respect to mjj is constructed!')
-		print('CASE: {}\n'.format(case))
+	'''
+	Fills the efficiency of the trigger as a function of the given expression into results (see lib/results.py), per category of events:
+	-- <variable>_hist[_<category>]: histogram of the expression for all the events (no VBF cuts)
+	-- <variable>_eff[_<category>] : efficiency, the denominator being the events passing the VBF cuts and the numerator those also passing the trigger
+	and counts the events passing the VBF cuts ('vbfCuts') and the VBF cuts + trigger ('vbfCutsAndTrigger').
+	The results of several inputs (e.g. one per batch job) are then merged with mergeResults before drawing them.
 
+	ARGUMENTS:
+	---results: The Results to fill, see triggerEffResults.
+	---tree: The tree (or chain) to read from.
+	---trigger: The trigger in consideration.
+	---variable: Name of the variable in the names of the histograms, e.g. mjj.
+	---expression: The TTreeFormula expression of the variable, e.g. jet_pt[0].
+	---edges: Bin edges.
+	---vbfCuts: The VBF selections (Cut object).
+	---categories: List of (name, cut) of the categories of events, e.g. jetEtaCategories. By default, all the events in one category.
+	'''
 
-def drawTriggerEff_MET(inputFile, trigger, args, mjjCut, leadingJetPtCut, trailingJetPtCut):
+	categories = categories or [(None, None)]
 
-	'''
-	Constructs the trigger efficiency graph for a given trigger, as a function of invariant mass of two leading jets, mjj.
-	Applies the default VBF cuts and given leadingJetPt and trailingJetPt cuts.
+	evaluator = getEvaluator(tree)
 
-	ARGUMENTS:	
-	--- inputFile: The ROOT file containing eventTree.
-	--- trigger: The trigger name for which the efficiency curve will be drawn.
-	--- args: This is the arguments parsed in while calling ../readTree.py.
-	--- leadingJetPtCut: The leading jet pt cut to be applied.
-	--- trailingJetPtCut: The trailing jet pt cut to be applied.
-	'''
+	def categoryMasks(entries):
 
-	f = ROOT.TFile.Open(inputFile, 'UPDATE')
+		for name, cut in categories:
 
-	#met_array = array('f', [80., 90., 100., 110., 117., 124., 131., 138., 145., 152., 159., 166., 173., 180., 187., 194., 201., 210., 220.]) 
-	met_array = np.arange(80., 230., 15.) 
+			yield '' if name is None else '_' + name, np.ones(len(entries), dtype=bool) if cut is None else evaluator.mask(cut)[entries]
 
-	outputDir = 'output/' + trigger
+	#All the events
 
-	if not os.path.isdir(outputDir):
-	
-		os.mkdir(outputDir)
+	columns = loadScalars(tree, ['Entry$', expression])
 
-	#Create the output ROOT file to save the histograms and efficiency graphs
-	
-	if args.test:
+	for suffix, selected in categoryMasks(columns['Entry$'].astype(np.int64)):
 
-		fileName = trigger + '_test.root'
-		filePath = os.path.join(outputDir, fileName)
+		if variable + '_hist' + suffix not in results.histograms:
 
-		out = ROOT.TFile.Open(filePath, 'UPDATE')
+			results.addHistogram(variable + '_hist' + suffix, edges)
 
-	else:
+		results.fill(variable + '_hist' + suffix, columns[expression][selected])
 
-		fileName = trigger + '.root'
-		filePath = os.path.join(outputDir, fileName)
+	#Only the entries passing the VBF cuts are read, see lib/entryLists.py
+	#A trigger branch is -1 if the path is not in the HLT menu, which does not pass the trigger (see triggerFired in lib/cuts.py)
 
-		out = ROOT.TFile.Open(filePath, 'UPDATE')
+	with onlyEntries(tree, vbfCuts):
 
-	met_hist_twoCentralJets = ROOT.TH1F('met_hist_twoCentralJets', 'met_hist_twoCentralJets', len(met_array)-1, met_array)
-	met_hist_twoForwardJets = ROOT.TH1F('met_hist_twoForwardJets', 'met_hist_twoForwardJets', len(met_array)-1, met_array)
-	met_hist_oneCentralJetOneForwardJet = ROOT.TH1F('met_hist_oneCentralJetOneForwardJet', 'met_hist_oneCentralJetOneForwardJet', len(met_array)-1, met_array)
-	
-	met_hist_afterVBFCuts_twoCentralJets = ROOT.TH1F('met_hist_afterVBFCuts_twoCentralJets', 'met_hist_afterVBFCuts_twoCentralJets', len(met_array)-1, met_array)	
-	met_hist_afterVBFCuts_twoCentralJets.SetLineColor(ROOT.kRed)
-	met_hist_afterVBFCuts_twoForwardJets = ROOT.TH1F('met_hist_afterVBFCuts_twoForwardJets', 'met_hist_afterVBFCuts_twoForwardJets', len(met_array)-1, met_array)	
-	met_hist_afterVBFCuts_twoForwardJets.SetLineColor(ROOT.kRed)
-	met_hist_afterVBFCuts_oneCentralJetOneForwardJet = ROOT.TH1F('met_hist_afterVBFCuts_oneCentralJetOneForwardJet', 'met_hist_afterVBFCuts_oneCentralJetOneForwardJet', len(met_array)-1, met_array)	
-	met_hist_afterVBFCuts_oneCentralJetOneForwardJet.SetLineColor(ROOT.kRed)
-	
-	met_hist_afterVBFCutsAndTrigger_twoCentralJets = ROOT.TH1F('met_hist_afterVBFCutsAndTrigger_twoCentralJets', 'met_hist_afterVBFCutsAndTrigger_twoCentralJets', len(met_array)-1, met_array)	
-	met_hist_afterVBFCutsAndTrigger_twoCentralJets.SetLineColor(ROOT.kBlack)
-	met_hist_afterVBFCutsAndTrigger_twoForwardJets = ROOT.TH1F('met_hist_afterVBFCutsAndTrigger_twoForwardJets', 'met_hist_afterVBFCutsAndTrigger_twoForwardJets', len(met_array)-1, met_array)	
-	met_hist_afterVBFCutsAndTrigger_twoForwardJets.SetLineColor(ROOT.kBlack)
-	met_hist_afterVBFCutsAndTrigger_oneCentralJetOneForwardJet = ROOT.TH1F('met_hist_afterVBFCutsAndTrigger_oneCentralJetOneForwardJet', 'met_hist_afterVBFCutsAndTrigger_oneCentralJetOneForwardJet', len(met_array)-1, met_array)	
-	met_hist_afterVBFCutsAndTrigger_oneCentralJetOneForwardJet.SetLineColor(ROOT.kBlack)
+		columns = loadScalars(tree, ['Entry$', expression, trigger], str(vbfCuts))
 
-	vbfCuts = 'minPhi_jetMET > 0.5 && jet_eta[0]*jet_eta[1]<0 && absEtaDiff_leadingTwoJets > 2.5 && Flag_BadPFMuonFilter == 1 && Flag_goodVertices == 1 && Flag_globalSuperTightHalo2016Filter == 1 && Flag_HBHENoiseFilter == 1 && Flag_HBHENoiseIsoFilter == 1 && Flag_EcalDeadCellTriggerPrimitiveFilter == 1 && mjj > ' + str(mjjCut) + ' && jet_pt[0] > ' + str(leadingJetPtCut) + ' && jet_pt[1] > ' + str(trailingJetPtCut) 
+	passed = columns[trigger] == 1
 
-	vbfAndTriggerCuts = vbfCuts + ' && ' + trigger + ' == 1'
-	
-	twoCentralJets_cut = '(abs(jet_eta[0]) <= 2.5 && abs(jet_eta[1]) <= 2.5)'
-	twoForwardJets_cut = '(abs(jet_eta[0]) > 2.5 && abs(jet_eta[1]) > 2.5)'
-	oneCentralJetOneForwardJet_cut = '((abs(jet_eta[0]) <= 2.5 && abs(jet_eta[1]) > 2.5) || (abs(jet_eta[0]) > 2.5 && abs(jet_eta[1]) <= 2.5))'
+	for suffix, selected in categoryMasks(columns['Entry$'].astype(np.int64)):
 
-	f.eventTree.Draw('met>>met_hist_twoCentralJets', twoCentralJets_cut, '')
-	f.eventTree.Draw('met>>met_hist_twoForwardJets', twoForwardJets_cut, '')
-	f.eventTree.Draw('met>>met_hist_oneCentralJetOneForwardJet', oneCentralJetOneForwardJet_cut, '')
+		if variable + '_eff' + suffix not in results.efficiencies:
 
-	f.eventTree.Draw('met>>met_hist_afterVBFCuts_twoCentralJets', vbfCuts + ' && ' + twoCentralJets_cut, '')
-	f.eventTree.Draw('met>>met_hist_afterVBFCuts_twoForwardJets', vbfCuts + ' && ' + twoForwardJets_cut, '')
-	f.eventTree.Draw('met>>met_hist_afterVBFCuts_oneCentralJetOneForwardJet', vbfCuts + ' && ' + oneCentralJetOneForwardJet_cut, '')
+			results.addEfficiency(variable + '_eff' + suffix, edges)
 
-	f.eventTree.Draw('met>>met_hist_afterVBFCutsAndTrigger_twoCentralJets', vbfAndTriggerCuts + ' && ' + twoCentralJets_cut, '')
-	f.eventTree.Draw('met>>met_hist_afterVBFCutsAndTrigger_twoForwardJets', vbfAndTriggerCuts + ' && ' + twoForwardJets_cut, '')
-	f.eventTree.Draw('met>>met_hist_afterVBFCutsAndTrigger_oneCentralJetOneForwardJet', vbfAndTriggerCuts + ' && ' + oneCentralJetOneForwardJet_cut, '')
-	
-	print('Events passing VBF cuts: {}'.format(f.eventTree.GetEntries(vbfCuts)))
-	print('Events passing VBF cuts + {}: {}\n'.format(trigger, f.eventTree.GetEntries(vbfAndTriggerCuts)))
-	
-	#Go to the directory (in the ROOT file) for trigger efficiencies 
-	
-	folderName = 'triggerEff_MET_mjjCut' + str(mjjCut) + 'leadingJetPtCut' + str(leadingJetPtCut) + '_trailingJetPtCut' + str(trailingJetPtCut)
-	
-	try: out.GetKey(folderName).IsFolder()
+		results.fillEfficiency(variable + '_eff' + suffix, columns[expression][selected], passed[selected])
 
-	except ReferenceError:
+	results.count('vbfCuts', len(passed))
+	results.count('vbfCutsAndTrigger', int(passed.sum()))
 
-		out.mkdir(folderName, folderName) 
+	return results
 
-	out.cd(folderName)
-	
-	#Name of the directory to save the png files, and the name of the png file
+def triggerEffHistograms(results, variable, category=None):
 
-	pngDir = 'pngImages/triggerEffPlots/METPlots/mjjCut' + str(mjjCut) + '_leadingJetPtCut' + str(leadingJetPtCut) + '_trailingJetPtCut' + str(trailingJetPtCut)
-	file_name = trigger + '_MET_mjjCut' + str(mjjCut) + '_leadingJetPtCut' + str(leadingJetPtCut) + '_trailingJetPtCut' + str(trailingJetPtCut) + '.png'
-	
-	constructTriggerEff(met_hist_afterVBFCutsAndTrigger_twoCentralJets, met_hist_afterVBFCuts_twoCentralJets, trigger, args, pngDir, file_name)
-	constructTriggerEff(met_hist_afterVBFCutsAndTrigger_twoForwardJets, met_hist_afterVBFCuts_twoForwardJets, trigger, args, pngDir, file_name)
-	constructTriggerEff(met_hist_afterVBFCutsAndTrigger_oneCentralJetOneForwardJet, met_hist_afterVBFCuts_oneCentralJetOneForwardJet, trigger, args, pngDir, file_name)
+	'''
+	Returns the histograms of the given variable (and category) filled by fillTriggerEff, as TH1F:
+	all the events, the events passing the VBF cuts (red) and the events passing the VBF cuts + trigger (black),
+	named <variable>_hist, <variable>_hist_afterVBFCuts and <variable>_hist_afterVBFCutsAndTrigger (followed by _<category>).
+	'''
 
-	out.cd()
-	
-	#Browse (create if necessary) the folder for individual histograms
+	suffix = '' if category is None else '_' + category
 
-	histoDirName = 'METHistos_mjjCut' + str(mjjCut) + '_leadingJetPtCut' + str(leadingJetPtCut) + '_trailingJetPtCut' + str(trailingJetPtCut)
-	
-	try: out.GetKey(histoDirName).IsFolder()
+	numerator, denominator = results.efficiencies[variable + '_eff' + suffix]
 
-	except ReferenceError: 
+	histo_all = results.histogram(variable + '_hist' + suffix, variable + '_hist' + suffix)
 
-		out.mkdir(histoDirName, histoDirName) 
-	
-	out.cd(histoDirName)
+	histo_afterVBFCuts = denominator.toROOT(variable + '_hist_afterVBFCuts' + suffix, variable + '_hist_afterVBFCuts' + suffix)
+	histo_afterVBFCuts.SetLineColor(ROOT.kRed)
 
-	if not args.noWrite:
+	histo_afterVBFCutsAndTrigger = numerator.toROOT(variable + '_hist_afterVBFCutsAndTrigger' + suffix, variable + '_hist_afterVBFCutsAndTrigger' + suffix)
+	histo_afterVBFCutsAndTrigger.SetLineColor(ROOT.kBlack)
 
-		met_hist_twoCentralJets.Write('met_hist_twoCentralJets')
-		met_hist_twoForwardJets.Write('met_hist_twoForwardJets')
-		met_hist_oneCentralJetOneForwardJet.Write('met_hist_oneCentralJetOneForwardJet')
-		
-		met_hist_afterVBFCuts_twoCentralJets.Write('met_hist_afterVBFCuts_twoCentralJets')
-		met_hist_afterVBFCuts_twoForwardJets.Write('met_hist_afterVBFCuts_twoForwardJets')
-		met_hist_afterVBFCuts_oneCentralJetOneForwardJet.Write('met_hist_afterVBFCuts_oneCentralJetOneForwardJet')
-		
-		met_hist_afterVBFCutsAndTrigger_twoCentralJets.Write('met_hist_afterVBFCutsAndTrigger_twoCentralJets')
-		met_hist_afterVBFCutsAndTrigger_twoForwardJets.Write('met_hist_afterVBFCutsAndTrigger_twoForwardJets')
-		met_hist_afterVBFCutsAndTrigger_oneCentralJetOneForwardJet.Write('met_hist_afterVBFCutsAndTrigger_oneCentralJetOneForwardJet')
-	
-	met_hist_twoCentralJets.SetDirectory(0)
-	met_hist_twoForwardJets.SetDirectory(0)
-	met_hist_oneCentralJetOneForwardJet.SetDirectory(0)
+	return histo_all, histo_afterVBFCuts, histo_afterVBFCutsAndTrigger
 
-	met_hist_afterVBFCuts_twoCentralJets.SetDirectory(0)
-	met_hist_afterVBFCuts_twoForwardJets.SetDirectory(0)
-	met_hist_afterVBFCuts_oneCentralJetOneForwardJet.SetDirectory(0)
+def printTriggerEffCounts(results, trigger):
 
-	met_hist_afterVBFCutsAndTrigger_twoCentralJets.SetDirectory(0)
-	met_hist_afterVBFCutsAndTrigger_twoForwardJets.SetDirectory(0)
-	met_hist_afterVBFCutsAndTrigger_oneCentralJetOneForwardJet.SetDirectory(0)
-	
-	out.cd()
+	print('Events passing VBF cuts: {}'.format(results.counters['vbfCuts']))
+	print('Events passing VBF cuts + {}: {}\n'.format(trigger, results.counters['vbfCutsAndTrigger']))
 
-	out.Close()
-	f.Close()
+def drawTriggerEff_MET(inputFile, trigger, args, mjjCut, leadingJetPtCut, trailingJetPtCut, results=None):
 
-def drawTriggerEff_trailingJetPt(inputFile, trigger, args, mjjCut, leadingJetPtCut):
+	'''
+	Constructs the trigger efficiency graph for a given trigger, as a function of MET.
+	Applies the default VBF cuts and given mjj, leadingJetPt and trailingJetPt cuts.
+	Returns the Results of the efficiency (see fillTriggerEff).
 
+	ARGUMENTS:	
+	--- inputFile: The ROOT file containing eventTree, or a manifest listing several such files (see lib/dataset.py).
+	--- trigger: The trigger name for which the efficiency curve will be drawn.
+	--- args: This is the arguments parsed in while calling ../readTree.py.
+	--- mjjCut: The mjj cut to be applied.
+	--- leadingJetPtCut: The leading jet pt cut to be applied.
+	--- trailingJetPtCut: The trailing jet pt cut to be applied.
+	--- results: Results filled beforehand, e.g. merged from several inputs. By default, the efficiency is filled from inputFile.
 	'''
-    Constructs the trigger efficiency graph for a given trigger, as a function of trailing jet pt. 
-    Returns the trailing jet pt histogram wih VBF cuts + trigger and efficiency plot.
-	On top of default VBF cuts, applies the given mjj and leadingJetPt cuts.
-    '''
 
-	f = ROOT.TFile.Open(inputFile, 'UPDATE')
-	
-	outputDir = 'output/' + trigger
+	#met_array = array('f', [80., 90., 100., 110., 117., 124., 131., 138., 145., 152., 159., 166., 173., 180., 187., 194., 201., 210., 220.]) 
+	met_array = np.arange(80., 230., 15.) 
 
-	if not os.path.isdir(outputDir):
+	#Output ROOT file to save the histograms and efficiency graphs
+
+	out = getTriggerOutput(trigger, args)
+
+	#Cuts are built with the selection algebra in lib/cuts.py
+
+	vbfCuts = vbfTopology & eventFilters & mjjAbove(mjjCut) & leadingJetPtAbove(leadingJetPtCut) & trailingJetPtAbove(trailingJetPtCut)
+
+	if results is None:
+
+		tree = getOutputStore().eventTree(inputFile)
+
+		results = fillTriggerEff(triggerEffResults(inputFile, tree, trigger, 'met', vbfCuts), tree, trigger, 'met', 'met', met_array, vbfCuts, jetEtaCategories)
+
+	printTriggerEffCounts(results, trigger)
 	
-		os.makedirs(outputDir)
+	#Folder (in the ROOT file) for trigger efficiencies 
+	
+	folderName = 'triggerEff_MET_mjjCut' + str(mjjCut) + 'leadingJetPtCut' + str(leadingJetPtCut) + '_trailingJetPtCut' + str(trailingJetPtCut)
 
-	#Create the output ROOT file to save the histograms and efficiency graphs
+	#Name of the directory to save the png files, and the name of the png file
 
-	if args.test:
+	pngDir = 'pngImages/triggerEffPlots/METPlots/mjjCut' + str(mjjCut) + '_leadingJetPtCut' + str(leadingJetPtCut) + '_trailingJetPtCut' + str(trailingJetPtCut)
+	file_name = trigger + '_MET_mjjCut' + str(mjjCut) + '_leadingJetPtCut' + str(leadingJetPtCut) + '_trailingJetPtCut' + str(trailingJetPtCut) + '.png'
 
-		fileName = trigger + '_test.root'
-		filePath = os.path.join(outputDir, fileName)
+	#Folder (in the ROOT file) for individual histograms
+
+	histoDirName = 'METHistos_mjjCut' + str(mjjCut) + '_leadingJetPtCut' + str(leadingJetPtCut) + '_trailingJetPtCut' + str(trailingJetPtCut)
 
-		out = ROOT.TFile.Open(filePath, 'UPDATE')
+	for category, cut in jetEtaCategories:
 
-	else:
+		met_hist, met_hist_afterVBFCuts, met_hist_afterVBFCutsAndTrigger = triggerEffHistograms(results, 'met', category)
 
-		fileName = trigger + '.root'
-		filePath = os.path.join(outputDir, fileName)
+		constructTriggerEff(met_hist_afterVBFCutsAndTrigger, met_hist_afterVBFCuts, trigger, args, pngDir, file_name, out, folderName)
 
-		out = ROOT.TFile.Open(filePath, 'UPDATE')
+		if not args.noWrite:
 
-	trailingJetPt_array = array('f', [20., 23., 26., 29., 32., 35., 39., 43., 47., 52., 56., 60., 65., 70., 75., 80.])
+			out.put(met_hist, met_hist.GetName(), histoDirName)
+			out.put(met_hist_afterVBFCuts, met_hist_afterVBFCuts.GetName(), histoDirName)
+			out.put(met_hist_afterVBFCutsAndTrigger, met_hist_afterVBFCutsAndTrigger.GetName(), histoDirName)
 
-	trailingJetPt_hist = ROOT.TH1F('trailingJetPt_hist', 'trailingJetPt_hist', len(trailingJetPt_array)-1, trailingJetPt_array)
+	return results
 
-	trailingJetPt_hist_afterVBFCuts = ROOT.TH1F('trailingJetPt_hist_afterVBFCuts', 'trailingJetPt_hist_afterVBFCuts', len(trailingJetPt_array)-1, trailingJetPt_array)	
-	trailingJetPt_hist_afterVBFCuts.SetLineColor(ROOT.kRed)
-	
-	trailingJetPt_hist_afterVBFCutsAndTrigger = ROOT.TH1F('trailingJetPt_hist_afterVBFCutsAndTrigger', 'trailingJetPt_hist_afterVBFCutsAndTrigger', len(trailingJetPt_array)-1, trailingJetPt_array)
-	trailingJetPt_hist_afterVBFCutsAndTrigger.SetLineColor(ROOT.kBlack)
+def drawTriggerEff_trailingJetPt(inputFile, trigger, args, mjjCut, leadingJetPtCut, results=None):
+
+	'''
+	Constructs the trigger efficiency graph for a given trigger, as a function of trailing jet pt. 
+	Returns the trailing jet pt histogram wih VBF cuts + trigger and efficiency plot.
+	On top of default VBF cuts, applies the given mjj and leadingJetPt cuts.
+	If results are given (e.g. merged from several inputs, see fillTriggerEff), the efficiency is drawn from them instead of inputFile.
+	'''
+
+	#Output ROOT file to save the histograms and efficiency graphs
+
+	out = getTriggerOutput(trigger, args)
+
+	trailingJetPt_array = array('f', [20., 23., 26., 29., 32., 35., 39., 43., 47., 52., 56., 60., 65., 70., 75., 80.])
 
 	#Arrange the cuts
 
-	vbfCuts = 'containsPhoton == 0 && containsLepton == 0 && contains_bJet == 0 && minPhi_jetMET > 0.5 && jet_eta[0]*jet_eta[1]<0 && absEtaDiff_leadingTwoJets > 2.5 && mjj > ' + str(mjjCut) + ' && jet_pt[0] > ' + str(leadingJetPtCut)
+	vbfCuts = vbfTopology & mjjAbove(mjjCut) & leadingJetPtAbove(leadingJetPtCut)
 
-	vbfAndTriggerCuts = vbfCuts + ' && ' + trigger + ' == 1'
+	if results is None:
 
-	f.eventTree.Draw('jet_pt[1]>>trailingJetPt_hist')
-	f.eventTree.Draw('jet_pt[1]>>trailingJetPt_hist_afterVBFCuts', vbfCuts, '')
-	f.eventTree.Draw('jet_pt[1]>>trailingJetPt_hist_afterVBFCutsAndTrigger', vbfAndTriggerCuts, '')
-	
-	####
-	print('Events passing VBF cuts: {}'.format(f.eventTree.GetEntries(vbfCuts)))
-	print('Events passing VBF cuts + {}: {}\n'.format(trigger, f.eventTree.GetEntries(vbfAndTriggerCuts)))
-	####	
-	
-	#Go to the directory for trigger efficiencies 
-	
-	try: out.GetKey('triggerEff_trailingJetPt').IsFolder()
+		tree = getOutputStore().eventTree(inputFile)
 
-	except ReferenceError: 
+		results = fillTriggerEff(triggerEffResults(inputFile, tree, trigger, 'trailingJetPt', vbfCuts), tree, trigger, 'trailingJetPt', 'jet_pt[1]', trailingJetPt_array, vbfCuts)
 
-		out.mkdir('triggerEff_trailingJetPt', 'triggerEff_trailingJetPt') 
+	trailingJetPt_hist, trailingJetPt_hist_afterVBFCuts, trailingJetPt_hist_afterVBFCutsAndTrigger = triggerEffHistograms(results, 'trailingJetPt')
 
-	out.cd('triggerEff_trailingJetPt')
+	####
+	printTriggerEffCounts(results, trigger)
+	####	
+
+	eff_graph_trailingJetPt = None
 	
 	if ROOT.TEfficiency.CheckConsistency(trailingJetPt_hist_afterVBFCutsAndTrigger, trailingJetPt_hist_afterVBFCuts):
 
@@ -296,102 +295,50 @@ def drawTriggerEff_trailingJetPt(inputFile, trigger, args, mjjCut, leadingJetPtC
 
 		if not args.noWrite:
 
-			eff_graph_trailingJetPt.Write('eff_graph_' + trigger + '_trailingJetPt')
-
-		canv = ROOT.TCanvas('canv', 'canv')
-	
-		eff_graph_trailingJetPt.Draw('AP')
+			out.put(eff_graph_trailingJetPt, 'eff_graph_' + trigger + '_trailingJetPt', 'triggerEff_trailingJetPt')
 
 		pngDir = 'pngImages/triggerEffPlots/trailingJetPtPlots/mjjCut' + str(mjjCut) + '_leadingJetPtCut' + str(leadingJetPtCut)
 		fileName = trigger + '_trailingJetPt_mjjCut' + str(mjjCut) + '_leadingJetPtCut' + str(leadingJetPtCut) + '.png'
 		
-		if not os.path.isdir(pngDir):
-
-			os.makedirs(pngDir)
-
-		canv.Print(os.path.join(pngDir, fileName))
+		submitPlot(os.path.join(pngDir, fileName), [(eff_graph_trailingJetPt, 'AP')])
 	
 		print('Efficiency graph for ' + trigger + ' with respect to trailing jet pt is constructed!\n')
-	
-	out.cd()
-	
-	try: out.GetKey('trailingJetPtHistos').IsFolder()
-
-	except ReferenceError: 
-
-		out.mkdir('trailingJetPtHistos', 'trailingJetPtHistos') 
-	
-	out.cd('trailingJetPtHistos')
 
 	if not args.noWrite:
 	
-		trailingJetPt_hist.Write('trailingJetPt_hist')
-		trailingJetPt_hist_afterVBFCuts.Write('trailingJetPt_hist_afterVBFCuts')
-		trailingJetPt_hist_afterVBFCutsAndTrigger.Write('trailingJetPt_hist_afterVBFCutsAndTrigger_' + trigger)
-	
-	trailingJetPt_hist.SetDirectory(0)
-	trailingJetPt_hist_afterVBFCuts.SetDirectory(0)
-	trailingJetPt_hist_afterVBFCutsAndTrigger.SetDirectory(0)
-
-	out.cd()
-	
-	out.Close()	
-	f.Close()
+		out.put(trailingJetPt_hist, 'trailingJetPt_hist', 'trailingJetPtHistos')
+		out.put(trailingJetPt_hist_afterVBFCuts, 'trailingJetPt_hist_afterVBFCuts', 'trailingJetPtHistos')
+		out.put(trailingJetPt_hist_afterVBFCutsAndTrigger, 'trailingJetPt_hist_afterVBFCutsAndTrigger_' + trigger, 'trailingJetPtHistos')
 
 	return trailingJetPt_hist_afterVBFCutsAndTrigger, eff_graph_trailingJetPt
 
 
-def drawTriggerEff_leadingJetPt(inputFile, trigger, args, mjjCut):
+def drawTriggerEff_leadingJetPt(inputFile, trigger, args, mjjCut, results=None):
 
 	'''
-    Constructs the trigger efficiency graph for a given trigger, as a function of leading jet pt. 
-    Returns the leading jet pt histogram wih VBF cuts + trigger and efficiency plot.
-    Applies given mjjCut on top of default VBF selections.
+	Constructs the trigger efficiency graph for a given trigger, as a function of leading jet pt. 
+	Returns the leading jet pt histogram wih VBF cuts + trigger and efficiency plot.
+	Applies given mjjCut on top of default VBF selections.
+	If results are given (e.g. merged from several inputs, see fillTriggerEff), the efficiency is drawn from them instead of inputFile.
 	'''
 
-	f = ROOT.TFile.Open(inputFile, 'UPDATE')
-	
-	outputDir = 'output/' + trigger
+	#Output ROOT file to save the histograms and efficiency graphs
 
-	if not os.path.isdir(outputDir):
-	
-		os.makedirs(outputDir)
-
-	#Create the output ROOT file to save the histograms and efficiency graphs
-
-	if args.test:
-
-		fileName = trigger + '_test.root'
-		filePath = os.path.join(outputDir, fileName)
-
-		out = ROOT.TFile.Open(filePath, 'UPDATE')
-
-	else:
-
-		fileName = trigger + '.root'
-		filePath = os.path.join(outputDir, fileName)
-
-		out = ROOT.TFile.Open(filePath, 'UPDATE')
+	out = getTriggerOutput(trigger, args)
 
 	leadingJetPt_array = array('f', [80., 85., 90., 95.,  100., 105.,  110., 115., 120., 130., 140., 150., 160., 175., 190., 210., 230., 250., 280., 310., 350.]) 
 
-	leadingJetPt_hist = ROOT.TH1F('leadingJetPt_hist', 'leadingJetPt_hist', len(leadingJetPt_array)-1, leadingJetPt_array)
+	#Cuts are default VBF cuts and mjj cut provided
 
-	leadingJetPt_hist_afterVBFCuts = ROOT.TH1F('leadingJetPt_hist_afterVBFCuts', 'leadingJetPt_hist_afterVBFCuts', len(leadingJetPt_array)-1, leadingJetPt_array)	
-	leadingJetPt_hist_afterVBFCuts.SetLineColor(ROOT.kRed)
-	
-	leadingJetPt_hist_afterVBFCutsAndTrigger = ROOT.TH1F('leadingJetPt_hist_afterVBFCutsAndTrigger', 'leadingJetPt_hist_afterVBFCutsAndTrigger', len(leadingJetPt_array)-1, leadingJetPt_array)
-	leadingJetPt_hist_afterVBFCutsAndTrigger.SetLineColor(ROOT.kBlack)
+	vbfCuts = vbfTopology & mjjAbove(mjjCut)
 
-	#Cuts are default VBF cuts and mjj cut provided
+	if results is None:
 
-	vbfCuts = 'containsPhoton == 0 && containsLepton == 0 && contains_bJet == 0 && minPhi_jetMET > 0.5 && jet_eta[0]*jet_eta[1]<0 && absEtaDiff_leadingTwoJets > 2.5 && mjj > ' + str(mjjCut) 
+		tree = getOutputStore().eventTree(inputFile)
 
-	vbfAndTriggerCuts = vbfCuts + ' && ' + trigger + ' == 1'
+		results = fillTriggerEff(triggerEffResults(inputFile, tree, trigger, 'leadingJetPt', vbfCuts), tree, trigger, 'leadingJetPt', 'jet_pt[0]', leadingJetPt_array, vbfCuts)
 
-	f.eventTree.Draw('jet_pt[0]>>leadingJetPt_hist')
-	f.eventTree.Draw('jet_pt[0]>>leadingJetPt_hist_afterVBFCuts', vbfCuts, '')
-	f.eventTree.Draw('jet_pt[0]>>leadingJetPt_hist_afterVBFCutsAndTrigger', vbfAndTriggerCuts, '')
+	leadingJetPt_hist, leadingJetPt_hist_afterVBFCuts, leadingJetPt_hist_afterVBFCutsAndTrigger = triggerEffHistograms(results, 'leadingJetPt')
 
 	#Including overflow bin for each histogram
 
@@ -400,20 +347,11 @@ def drawTriggerEff_leadingJetPt(inputFile, trigger, args, mjjCut):
 	#leadingJetPt_hist_afterVBFCutsAndTrigger.GetXaxis().SetRange(1, leadingJetPt_hist.GetNbinsX()+1)
 	
 	####
-	print('Events passing VBF cuts: {}'.format(f.eventTree.GetEntries(vbfCuts)))
-	print('Events passing VBF cuts + {}: {}\n'.format(trigger, f.eventTree.GetEntries(vbfAndTriggerCuts)))
+	printTriggerEffCounts(results, trigger)
 	####	
 
-	#Go to the directory for trigger efficiencies 
-	
-	try: out.GetKey('triggerEff_leadingJetPt').IsFolder()
+	eff_graph_leadingJetPt = None
 
-	except ReferenceError: 
-
-		out.mkdir('triggerEff_leadingJetPt', 'triggerEff_leadingJetPt') 
-
-	out.cd('triggerEff_leadingJetPt')
-	
 	if ROOT.TEfficiency.CheckConsistency(leadingJetPt_hist_afterVBFCutsAndTrigger, leadingJetPt_hist_afterVBFCuts):
 
 		eff_graph_leadingJetPt = ROOT.TEfficiency(leadingJetPt_hist_afterVBFCutsAndTrigger, leadingJetPt_hist_afterVBFCuts)
@@ -422,199 +360,83 @@ def drawTriggerEff_leadingJetPt(inputFile, trigger, args, mjjCut):
 
 		if not args.noWrite:
 
-			eff_graph_leadingJetPt.Write('eff_graph_' + trigger + '_leadingJetPt')
+			out.put(eff_graph_leadingJetPt, 'eff_graph_' + trigger + '_leadingJetPt', 'triggerEff_leadingJetPt')
 
-		canv = ROOT.TCanvas('canv', 'canv')
-	
-		eff_graph_leadingJetPt.Draw('AP')
-		
 		pngDir = 'pngImages/triggerEffPlots/leadingJetPtPlots/mjjCut' + str(mjjCut)
 		fileName = trigger + '_leadingJetPt_mjjCut' + str(mjjCut)  + '.png'
 
-		if not os.path.isdir(pngDir):
-
-			os.makedirs(pngDir)
-
-		canv.Print(os.path.join(pngDir, fileName))
+		submitPlot(os.path.join(pngDir, fileName), [(eff_graph_leadingJetPt, 'AP')])
 	
 		print('Efficiency graph for ' + trigger + ' with respect to leading jet pt is constructed!\n')
-	
-	out.cd()
-	
-	try: out.GetKey('leadingJetPtHistos').IsFolder()
-
-	except ReferenceError: 
-
-		out.mkdir('leadingJetPtHistos', 'leadingJetPtHistos') 
-	
-	out.cd('leadingJetPtHistos')
 
 	if not args.noWrite:
 	
-		leadingJetPt_hist.Write('leadingJetPt_hist')
-		leadingJetPt_hist_afterVBFCuts.Write('leadingJetPt_hist_afterVBFCuts')
-		leadingJetPt_hist_afterVBFCutsAndTrigger.Write('leadingJetPt_hist_afterVBFCutsAndTrigger_' + trigger)
-	
-	leadingJetPt_hist.SetDirectory(0)
-	leadingJetPt_hist_afterVBFCuts.SetDirectory(0)
-	leadingJetPt_hist_afterVBFCutsAndTrigger.SetDirectory(0)
-
-	out.cd()
-	
-	out.Close()	
-	f.Close()
+		out.put(leadingJetPt_hist, 'leadingJetPt_hist', 'leadingJetPtHistos')
+		out.put(leadingJetPt_hist_afterVBFCuts, 'leadingJetPt_hist_afterVBFCuts', 'leadingJetPtHistos')
+		out.put(leadingJetPt_hist_afterVBFCutsAndTrigger, 'leadingJetPt_hist_afterVBFCutsAndTrigger_' + trigger, 'leadingJetPtHistos')
 
 	return leadingJetPt_hist_afterVBFCutsAndTrigger, eff_graph_leadingJetPt
 
-def drawTriggerEff_mjj(inputFile, trigger, args, leadingJetPtCut, trailingJetPtCut):
+def drawTriggerEff_mjj(inputFile, trigger, args, leadingJetPtCut, trailingJetPtCut, results=None):
 
 	'''
 	Constructs the trigger efficiency graph for a given trigger, as a function of invariant mass of two leading jets, mjj.
 	Applies the default VBF cuts and given leadingJetPt and trailingJetPt cuts.
+	Returns the Results of the efficiency (see fillTriggerEff).
 
 	ARGUMENTS:	
-	--- inputFile: The ROOT file containing eventTree.
+	--- inputFile: The ROOT file containing eventTree, or a manifest listing several such files (see lib/dataset.py).
 	--- trigger: The trigger name for which the efficiency curve will be drawn.
 	--- args: This is the arguments parsed in while calling ../readTree.py.
 	--- leadingJetPtCut: The leading jet pt cut to be applied.
 	--- trailingJetPtCut: The trailing jet pt cut to be applied.
+	--- results: Results filled beforehand, e.g. merged from several inputs. By default, the efficiency is filled from inputFile.
 	'''
 
-	f = ROOT.TFile.Open(inputFile, 'UPDATE')
-	
-	outputDir = 'output/' + trigger
-
-	if not os.path.isdir(outputDir):
-	
-		os.makedirs(outputDir)
+	#Output ROOT file to save the histograms and efficiency graphs
 
-	#Create the output ROOT file to save the histograms and efficiency graphs
-
-	if args.test:
-
-		fileName = trigger + '_test.root'
-		filePath = os.path.join(outputDir, fileName)
-
-		out = ROOT.TFile(filePath, 'RECREATE')
-
-	else:
-
-		fileName = trigger + '.root'
-		filePath = os.path.join(outputDir, fileName)
-
-		out = ROOT.TFile(filePath, 'RECREATE')
+	out = getTriggerOutput(trigger, args, recreate=True)
 
 	mjj_array = np.arange(300., 3000., 300.)
 	#mjj_array = array('f', [500., 520., 540., 570., 600., 640., 680., 730., 790., 880., 1000.]) 
 
-	mjj_hist_twoCentralJets = ROOT.TH1F('mjj_hist_twoCentralJets', 'mjj_hist_twoCentralJets', len(mjj_array)-1, mjj_array)
-	mjj_hist_twoForwardJets = ROOT.TH1F('mjj_hist_twoForwardJets', 'mjj_hist_twoForwardJets', len(mjj_array)-1, mjj_array)
-	mjj_hist_oneCentralJetOneForwardJet = ROOT.TH1F('mjj_hist_oneCentralJetOneForwardJet', 'mjj_hist_oneCentralJetOneForwardJet', len(mjj_array)-1, mjj_array)
+	#Cuts are built with the selection algebra in lib/cuts.py
 
-	mjj_hist_afterVBFCuts_twoCentralJets = ROOT.TH1F('mjj_hist_afterVBFCuts_twoCentralJets', 'mjj_hist_afterVBFCuts_twoCentralJets', len(mjj_array)-1, mjj_array)	
-	mjj_hist_afterVBFCuts_twoCentralJets.SetLineColor(ROOT.kRed)
-	mjj_hist_afterVBFCuts_twoForwardJets = ROOT.TH1F('mjj_hist_afterVBFCuts_twoForwardJets', 'mjj_hist_afterVBFCuts_twoForwardJets', len(mjj_array)-1, mjj_array)	
-	mjj_hist_afterVBFCuts_twoForwardJets.SetLineColor(ROOT.kRed)
-	mjj_hist_afterVBFCuts_oneCentralJetOneForwardJet = ROOT.TH1F('mjj_hist_afterVBFCuts_oneCentralJetOneForwardJet', 'mjj_hist_afterVBFCuts_oneCentralJetOneForwardJet', len(mjj_array)-1, mjj_array)	
-	mjj_hist_afterVBFCuts_oneCentralJetOneForwardJet.SetLineColor(ROOT.kRed)
-	
-	mjj_hist_afterVBFCutsAndTrigger_twoCentralJets = ROOT.TH1F('mjj_hist_afterVBFCutsAndTrigger_twoCentralJets', 'mjj_hist_afterVBFCutsAndTrigger_twoCentralJets', len(mjj_array)-1, mjj_array)
-	mjj_hist_afterVBFCutsAndTrigger_twoCentralJets.SetLineColor(ROOT.kBlack)
-	mjj_hist_afterVBFCutsAndTrigger_twoForwardJets = ROOT.TH1F('mjj_hist_afterVBFCutsAndTrigger_twoForwardJets', 'mjj_hist_afterVBFCutsAndTrigger_twoForwardJets', len(mjj_array)-1, mjj_array)
-	mjj_hist_afterVBFCutsAndTrigger_twoForwardJets.SetLineColor(ROOT.kBlack)
-	mjj_hist_afterVBFCutsAndTrigger_oneCentralJetOneForwardJet = ROOT.TH1F('mjj_hist_afterVBFCutsAndTrigger_oneCentralJetOneForwardJet', 'mjj_hist_afterVBFCutsAndTrigger_oneCentralJetOneForwardJet', len(mjj_array)-1, mjj_array)
-	mjj_hist_afterVBFCutsAndTrigger_oneCentralJetOneForwardJet.SetLineColor(ROOT.kBlack)
+	vbfCuts = vbfTopology & eventFilters & leadingJetPtAbove(leadingJetPtCut) & trailingJetPtAbove(trailingJetPtCut)
 
-	vbfCuts = 'minPhi_jetMET > 0.5 && jet_eta[0]*jet_eta[1]<0 && absEtaDiff_leadingTwoJets > 2.5 && Flag_BadPFMuonFilter == 1 && Flag_goodVertices == 1 && Flag_globalSuperTightHalo2016Filter == 1 && Flag_HBHENoiseFilter == 1 && Flag_HBHENoiseIsoFilter == 1 && Flag_EcalDeadCellTriggerPrimitiveFilter == 1 && jet_pt[0] > ' + str(leadingJetPtCut) + ' && jet_pt[1] > ' + str(trailingJetPtCut)
+	if results is None:
 
-	vbfAndTriggerCuts = vbfCuts + ' && ' + trigger + ' == 1'
+		tree = getOutputStore().eventTree(inputFile)
 
-	twoCentralJets_cut = '(abs(jet_eta[0]) <= 2.5 && abs(jet_eta[1]) <= 2.5)'
-	twoForwardJets_cut = '(abs(jet_eta[0]) > 2.5 && abs(jet_eta[1]) > 2.5)'
-	oneCentralJetOneForwardJet_cut = '((abs(jet_eta[0]) <= 2.5 && abs(jet_eta[1]) > 2.5) || (abs(jet_eta[0]) > 2.5 && abs(jet_eta[1]) <= 2.5))'
-
-	f.eventTree.Draw('mjj>>mjj_hist_twoCentralJets', twoCentralJets_cut, '')
-	f.eventTree.Draw('mjj>>mjj_hist_twoForwardJets', twoForwardJets_cut, '')
-	f.eventTree.Draw('mjj>>mjj_hist_oneCentralJetOneForwardJet', oneCentralJetOneForwardJet_cut, '')
-	
-	f.eventTree.Draw('mjj>>mjj_hist_afterVBFCuts_twoCentralJets', vbfCuts + ' && ' + twoCentralJets_cut, '')
-	f.eventTree.Draw('mjj>>mjj_hist_afterVBFCuts_twoForwardJets', vbfCuts + ' && ' + twoForwardJets_cut, '')
-	f.eventTree.Draw('mjj>>mjj_hist_afterVBFCuts_oneCentralJetOneForwardJet', vbfCuts + ' && ' + oneCentralJetOneForwardJet_cut, '')
-	
-	f.eventTree.Draw('mjj>>mjj_hist_afterVBFCutsAndTrigger_twoCentralJets', vbfAndTriggerCuts + ' && ' + twoCentralJets_cut, '')
-	f.eventTree.Draw('mjj>>mjj_hist_afterVBFCutsAndTrigger_twoForwardJets', vbfAndTriggerCuts + ' && ' + twoForwardJets_cut, '')
-	f.eventTree.Draw('mjj>>mjj_hist_afterVBFCutsAndTrigger_oneCentralJetOneForwardJet', vbfAndTriggerCuts + ' && ' + oneCentralJetOneForwardJet_cut, '')
+		results = fillTriggerEff(triggerEffResults(inputFile, tree, trigger, 'mjj', vbfCuts), tree, trigger, 'mjj', 'mjj', mjj_array, vbfCuts, jetEtaCategories)
 
 	####
-	print('Events passing VBF cuts: {}'.format(f.eventTree.GetEntries(vbfCuts)))
-	print('Events passing VBF cuts + {}: {}\n'.format(trigger, f.eventTree.GetEntries(vbfAndTriggerCuts)))
+	printTriggerEffCounts(results, trigger)
 	####	
 
-	#Go to the directory (in the ROOT file) for trigger efficiencies 
+	#Folder (in the ROOT file) for trigger efficiencies 
 
 	folderName = 'triggerEff_mjj_leadingJetPtCut' + str(leadingJetPtCut) + '_trailingJetPtCut' + str(trailingJetPtCut)
-	
-	try: out.GetKey(folderName).IsFolder()
-
-	except ReferenceError: 
-
-		out.mkdir(folderName, folderName) 
-
-	out.cd(folderName)
 
 	#Name of the directory to save the png files, and the name of the png file
 	
 	pngDir = 'pngImages/triggerEffPlots/mjjPlots/leadingJetPtCut' + str(leadingJetPtCut) + '_trailingJetPtCut' + str(trailingJetPtCut)
 	file_name = trigger + '_mjj_leadingJetPt' + str(leadingJetPtCut) + '_trailingJetPt' + str(trailingJetPtCut) + '.png'
 	
-	constructTriggerEff(mjj_hist_afterVBFCutsAndTrigger_twoCentralJets, mjj_hist_afterVBFCuts_twoCentralJets, trigger, args, pngDir, file_name)
-	constructTriggerEff(mjj_hist_afterVBFCutsAndTrigger_twoForwardJets, mjj_hist_afterVBFCuts_twoForwardJets, trigger, args, pngDir, file_name)
-	constructTriggerEff(mjj_hist_afterVBFCutsAndTrigger_oneCentralJetOneForwardJet, mjj_hist_afterVBFCuts_oneCentralJetOneForwardJet, trigger, args, pngDir, file_name)
-	
-	out.cd()
-	
-	#Browse (create if necessary) the folder for individual histograms
+	#Folder (in the ROOT file) for individual histograms
 
 	histoDirName = 'mjjHistos_leadingJetPtCut' + str(leadingJetPtCut) + '_trailingJetPtCut' + str(trailingJetPtCut)
 
-	try: out.GetKey(histoDirName).IsFolder()
+	for category, cut in jetEtaCategories:
 
-	except ReferenceError: 
+		mjj_hist, mjj_hist_afterVBFCuts, mjj_hist_afterVBFCutsAndTrigger = triggerEffHistograms(results, 'mjj', category)
 
-		out.mkdir(histoDirName, histoDirName) 
-	
-	out.cd(histoDirName)
-
-	if not args.noWrite:
-	
-		mjj_hist_twoCentralJets.Write('mjj_hist_twoCentralJets')
-		mjj_hist_twoForwardJets.Write('mjj_hist_twoForwardJets')
-		mjj_hist_oneCentralJetOneForwardJet.Write('mjj_hist_oneCentralJetOneForwardJet')
-		
-		mjj_hist_afterVBFCuts_twoCentralJets.Write('mjj_hist_afterVBFCuts_twoCentralJets')
-		mjj_hist_afterVBFCuts_twoForwardJets.Write('mjj_hist_afterVBFCuts_twoForwardJets')
-		mjj_hist_afterVBFCuts_oneCentralJetOneForwardJet.Write('mjj_hist_afterVBFCuts_oneCentralJetOneForwardJet')
-		
-		mjj_hist_afterVBFCutsAndTrigger_twoCentralJets.Write('mjj_hist_afterVBFCutsAndTrigger_twoCentralJets_' + trigger)
-		mjj_hist_afterVBFCutsAndTrigger_twoForwardJets.Write('mjj_hist_afterVBFCutsAndTrigger_twoForwardJets_' + trigger)
-		mjj_hist_afterVBFCutsAndTrigger_oneCentralJetOneForwardJet.Write('mjj_hist_afterVBFCutsAndTrigger_oneCentralJetOneForwardJet_' + trigger)
-	
-	mjj_hist_twoCentralJets.SetDirectory(0)
-	mjj_hist_twoForwardJets.SetDirectory(0)
-	mjj_hist_oneCentralJetOneForwardJet.SetDirectory(0)
-	
-	mjj_hist_afterVBFCuts_twoCentralJets.SetDirectory(0)
-	mjj_hist_afterVBFCuts_twoForwardJets.SetDirectory(0)
-	mjj_hist_afterVBFCuts_oneCentralJetOneForwardJet.SetDirectory(0)
-	
-	mjj_hist_afterVBFCutsAndTrigger_twoCentralJets.SetDirectory(0)
-	mjj_hist_afterVBFCutsAndTrigger_twoForwardJets.SetDirectory(0)
-	mjj_hist_afterVBFCutsAndTrigger_oneCentralJetOneForwardJet.SetDirectory(0)
-
-	out.cd()
-	
-	out.Close()	
-	f.Close()
+		constructTriggerEff(mjj_hist_afterVBFCutsAndTrigger, mjj_hist_afterVBFCuts, trigger, args, pngDir, file_name, out, folderName)
 
+		if not args.noWrite:
 
+			out.put(mjj_hist, mjj_hist.GetName(), histoDirName)
+			out.put(mjj_hist_afterVBFCuts, mjj_hist_afterVBFCuts.GetName(), histoDirName)
+			out.put(mjj_hist_afterVBFCutsAndTrigger, mjj_hist_afterVBFCutsAndTrigger.GetName() + '_' + trigger, histoDirName)
 
+	return results
@@ -0,0 +1,78 @@
+import ROOT
+import numpy as np
+from contextlib import contextmanager
+
+from lib.cuts import getEvaluator
+from lib.cppHelpers import declareOnce
+
+#####################################
+# Reading only the entries passing a selection
+# The surviving entries of a cut (see lib/cuts.py) are put in a TEntryList, which is set on the tree
+# while filling the histograms. TTree::Draw then reads only these entries instead of the whole tree.
+# Since most of the events fail the VBF cuts, the histograms after the VBF cuts are filled much faster.
+#
+#   with onlyEntries(tree, vbfCuts):
+#       tree.Draw('met>>hist', str(vbfCuts & triggerFired(trigger)), '')
+#####################################
+
+_entryListCode = '''
+#include "TEntryList.h"
+#include "TTree.h"
+
+namespace vbfStudies {
+
+	// Enters the given entry numbers of the tree (global entry numbers for a chain) into the entry list
+	void fillEntryList(TEntryList* entryList, TTree* tree, const Long64_t* entries, Long64_t n) {
+
+		for (Long64_t i = 0; i < n; ++i) entryList->Enter(entries[i], tree);
+	}
+}
+'''
+
+def declareEntryLists():
+
+	declareOnce(_entryListCode, 'entry list helper')
+
+_entryLists = {}
+
+def getEntryList(tree, cut):
+
+	'''
+	Returns the TEntryList of the entries of the tree passing the given cut.
+	Entry lists are built once per tree and cut.
+	'''
+
+	key = (id(tree), str(cut))
+
+	if key not in _entryLists:
+
+		declareEntryLists()
+
+		entries = np.ascontiguousarray(getEvaluator(tree).entries(cut), dtype=np.int64)
+
+		entryList = ROOT.TEntryList('entryList{}'.format(len(_entryLists)), str(cut))
+		entryList.SetDirectory(0)
+
+		ROOT.vbfStudies.fillEntryList(entryList, tree, entries, len(entries))
+
+		_entryLists[key] = entryList
+
+	return _entryLists[key]
+
+@contextmanager
+def onlyEntries(tree, cut):
+
+	'''
+	Restricts the tree to the entries passing the given cut, within a with block.
+	The selections given to Draw inside the block must include the cut.
+	'''
+
+	tree.SetEntryList(getEntryList(tree, cut))
+
+	try:
+
+		yield tree
+
+	finally:
+
+		tree.SetEntryList(0)
@@ -0,0 +1,138 @@
+from lib.helperFunctions import isTightJet, isTightJet_2018
+
+#####################################
+# Per-era configuration for writeTree.py
+# Everything that used to differ between writeTree_2017MiniAOD.py and writeTree_2018MiniAOD.py
+# (trigger versions, filters, object IDs, cuts, input lists) is declared here.
+#####################################
+
+eraConfigs = {}
+
+eraConfigs[2017] = {
+	'year'              : 2017,
+
+	#HLT paths to be stored, as (branch name, path pattern)
+	#Patterns may contain wildcards, see lib/triggerMatcher.py
+
+	'triggers'          : [
+							('HLT_DiJet110_35_Mjj650_PFMET110_v5', 'HLT_DiJet110_35_Mjj650_PFMET110_v*'),
+							('HLT_DiJet110_35_Mjj650_PFMET120_v5', 'HLT_DiJet110_35_Mjj650_PFMET120_v*'),
+							('HLT_DiJet110_35_Mjj650_PFMET130_v5', 'HLT_DiJet110_35_Mjj650_PFMET130_v*'),
+							('HLT_PFMETNoMu110_PFMHTNoMu110_IDTight_v16', 'HLT_PFMETNoMu110_PFMHTNoMu110_IDTight_v*'),
+							('HLT_PFMETNoMu120_PFMHTNoMu120_IDTight_v16', 'HLT_PFMETNoMu120_PFMHTNoMu120_IDTight_v*'),
+							('HLT_PFMETNoMu130_PFMHTNoMu130_IDTight_v15', 'HLT_PFMETNoMu130_PFMHTNoMu130_IDTight_v*'),
+							('HLT_PFMETNoMu140_PFMHTNoMu140_IDTight_v15', 'HLT_PFMETNoMu140_PFMHTNoMu140_IDTight_v*'),
+						  ],
+
+	#MET filters as (branch name, filter pattern) and the process they are read from
+
+	'filters'           : [
+							('Flag_BadPFMuonFilter', 'Flag_BadPFMuonFilter'),
+							('Flag_goodVertices', 'Flag_goodVertices'),
+							('Flag_globalSuperTightHalo2016Filter', 'Flag_globalSuperTightHalo2016Filter'),
+							('Flag_HBHENoiseFilter', 'Flag_HBHENoiseFilter'),
+							('Flag_HBHENoiseIsoFilter', 'Flag_HBHENoiseIsoFilter'),
+							('Flag_EcalDeadCellTriggerPrimitiveFilter', 'Flag_EcalDeadCellTriggerPrimitiveFilter'),
+						  ],
+	'filterProcess'     : 'PAT',
+
+	#Object IDs and working points
+
+	'jetID'             : isTightJet,
+	'electronID'        : 'cutBasedElectronID-Spring15-25ns-V1-standalone-loose',
+	'photonID'          : 'PhotonCutBasedIDLoose',
+	'bTagDiscriminator' : 'pfCombinedSecondaryVertexV2BJetTags',
+	'bTagWP'            : 0.8484,
+
+	#Event level cuts applied while writing the tree
+
+	'metCut'            : 50,
+	'leadingJetPtCut'   : 30,
+
+	#L1 jets stored: BX=0 jets above the pt floor, at most L1MaxJets leading ones
+	#The floor must stay below the thresholds studied with lib/l1Emulation.py
+
+	'L1JetPtFloor'      : 20.,
+	'L1MaxJets'         : 12,
+
+	#Generator level information: summary branches (see lib/genSummary.py)
+	#and, optionally, the pdgId of every prunedGenParticles entry
+
+	'genSummary'        : True,
+	'storeGenParticles' : False,
+
+	#Input lists and output naming
+
+	'inputList'         : 'inputs/MiniAOD_files2017.txt',
+	'localDir'          : 'evaluateJetPairs/inputs/ROOT_MCFiles',
+	'backgroundDir'     : 'inputs/backgroundFiles',
+	'outputPrefix'      : 'VBF_HToInv_2017',
+
+	#Access to the remote files (see lib/remoteInput.py): the redirectors in the order they are tried,
+	#directories with local copies of the /store/... files, and the retry, timeout and read-ahead settings
+
+	'redirectors'       : ['root://cmsxrootd.fnal.gov//', 'root://xrootd-cms.infn.it//', 'root://cms-xrd-global.cern.ch//'],
+	'localReplicaDirs'  : [],
+	'inputAccess'       : {'retries' : 3, 'backoff' : 10., 'openTimeout' : 60, 'requestTimeout' : 300, 'cacheSize' : 1., 'learnEntries' : 10},
+}
+
+eraConfigs[2018] = {
+	'year'              : 2018,
+
+	'triggers'          : [
+							('HLT_DiJet110_35_Mjj650_PFMET110_v9', 'HLT_DiJet110_35_Mjj650_PFMET110_v*'),
+							('HLT_DiJet110_35_Mjj650_PFMET120_v9', 'HLT_DiJet110_35_Mjj650_PFMET120_v*'),
+							('HLT_DiJet110_35_Mjj650_PFMET130_v9', 'HLT_DiJet110_35_Mjj650_PFMET130_v*'),
+							('HLT_PFMETNoMu110_PFMHTNoMu110_IDTight_v20', 'HLT_PFMETNoMu110_PFMHTNoMu110_IDTight_v*'),
+							('HLT_PFMETNoMu120_PFMHTNoMu120_IDTight_v20', 'HLT_PFMETNoMu120_PFMHTNoMu120_IDTight_v*'),
+							('HLT_PFMETNoMu130_PFMHTNoMu130_IDTight_v19', 'HLT_PFMETNoMu130_PFMHTNoMu130_IDTight_v*'),
+							('HLT_PFMETNoMu140_PFMHTNoMu140_IDTight_v19', 'HLT_PFMETNoMu140_PFMHTNoMu140_IDTight_v*'),
+						  ],
+
+	'filters'           : [
+							('Flag_BadPFMuonFilter', 'Flag_BadPFMuonFilter'),
+							('Flag_goodVertices', 'Flag_goodVertices'),
+							('Flag_globalSuperTightHalo2016Filter', 'Flag_globalSuperTightHalo2016Filter'),
+							('Flag_HBHENoiseFilter', 'Flag_HBHENoiseFilter'),
+							('Flag_HBHENoiseIsoFilter', 'Flag_HBHENoiseIsoFilter'),
+							('Flag_EcalDeadCellTriggerPrimitiveFilter', 'Flag_EcalDeadCellTriggerPrimitiveFilter'),
+						  ],
+	'filterProcess'     : '', #Latest process in the file
+
+	'jetID'             : isTightJet_2018,
+	'electronID'        : 'cutBasedElectronID-Fall17-94X-V2-loose',
+	'photonID'          : 'cutBasedPhotonID-Fall17-94X-V1-loose',
+	'bTagDiscriminator' : 'pfCombinedSecondaryVertexV2BJetTags',
+	'bTagWP'            : 0.8484,
+
+	'metCut'            : 50,
+	'leadingJetPtCut'   : 50,
+
+	'L1JetPtFloor'      : 20.,
+	'L1MaxJets'         : 12,
+
+	'genSummary'        : True,
+	'storeGenParticles' : False,
+
+	'inputList'         : 'inputs/MiniAOD_files2018.txt',
+	'localDir'          : None,
+	'backgroundDir'     : None,
+	'outputPrefix'      : 'VBF_HToInv_2018',
+
+	'redirectors'       : ['root://cmsxrootd.fnal.gov//', 'root://xrootd-cms.infn.it//', 'root://cms-xrd-global.cern.ch//'],
+	'localReplicaDirs'  : [],
+	'inputAccess'       : {'retries' : 3, 'backoff' : 10., 'openTimeout' : 60, 'requestTimeout' : 300, 'cacheSize' : 1., 'learnEntries' : 10},
+}
+
+def getEraConfig(year):
+
+	'''
+	Returns the writer configuration for the given data taking year.
+	Raises a ValueError if there is no configuration for that year.
+	'''
+
+	if year not in eraConfigs:
+
+		raise ValueError('No configuration found for year {}! Available years: {}'.format(year, sorted(eraConfigs.keys())))
+
+	return eraConfigs[year]
@@ -0,0 +1,178 @@
+import os
+import json
+import numpy as np
+
+from lib.columns import loadScalars
+
+#####################################
+# Event ranges of the MiniAOD files
+# The largest background files hold ~47k events, so splitting the jobs by files gives very uneven jobs.
+# planShards() splits the files of a sample into shards of about the same number of events:
+# a shard is a list of event ranges (file, first event, number of events), small files being read whole
+# and large files being split between consecutive shards. validatePlan() checks that the ranges of each file
+# do not overlap and cover all its events, so every event is written exactly once.
+# writeTree.py runs over one shard of a plan with --plan and --shard (see callWriteTree.py --eventsPerShard).
+# The run, luminosityBlock and event branches of the trees are used to check the merged tree with duplicateEvents().
+#####################################
+
+def iterateEvents(events, first=0, numEvents=None):
+
+	'''
+	Yields the index and the event for the events of an FWLite Events object in the given range.
+	Without a range, the events are read in order, as when iterating over events.
+
+	ARGUMENTS:
+	---events: FWLite Events of one input file.
+	---first: Index of the first event.
+	---numEvents: Number of events to be read, None to read until the end of the file.
+	'''
+
+	if not first and numEvents is None:
+
+		for numEvent, event in enumerate(events):
+
+			yield numEvent, event
+
+		return
+
+	last = events.size() if numEvents is None else min(first + numEvents, events.size())
+
+	for numEvent in range(first, last):
+
+		events.to(numEvent)
+
+		yield numEvent, events
+
+def readFileList(path):
+
+	'''
+	Returns the list of (file, number of events) of a file list of the background samples, see inputs/backgroundFiles.
+	'''
+
+	files = []
+
+	with open(path, 'r') as f:
+
+		for line in f:
+
+			fields = line.split()
+
+			if fields:
+
+				files.append((fields[0], int(fields[1])))
+
+	return files
+
+def planShards(files, eventsPerShard):
+
+	'''
+	Splits the events of the given files into shards of eventsPerShard events (the last one may be smaller).
+	Returns the list of shards, each a list of ranges {'file', 'first', 'numEvents'}.
+
+	ARGUMENTS:
+	---files: List of (file, number of events), see readFileList.
+	---eventsPerShard: Number of events per shard.
+	'''
+
+	if eventsPerShard <= 0:
+
+		raise ValueError('The number of events per shard must be positive, got {}'.format(eventsPerShard))
+
+	shards = [[]]
+	free = eventsPerShard
+
+	for fileName, numEvents in files:
+
+		first = 0
+
+		while first < numEvents:
+
+			if free == 0:
+
+				shards.append([])
+				free = eventsPerShard
+
+			size = min(free, numEvents - first)
+
+			shards[-1].append({'file' : fileName, 'first' : first, 'numEvents' : size})
+
+			first += size
+			free -= size
+
+	return [shard for shard in shards if shard]
+
+def validatePlan(shards, files):
+
+	'''
+	Raises a ValueError if the ranges of the shards overlap, leave events out, or read files which are not in the list.
+	'''
+
+	numEvents = dict(files)
+
+	ranges = dict((fileName, []) for fileName in numEvents)
+
+	for idx, shard in enumerate(shards):
+
+		for eventRange in shard:
+
+			if eventRange['file'] not in ranges:
+
+				raise ValueError('Shard {} reads {}, which is not in the file list'.format(idx, eventRange['file']))
+
+			ranges[eventRange['file']].append((eventRange['first'], eventRange['first'] + eventRange['numEvents'], idx))
+
+	for fileName, fileRanges in ranges.items():
+
+		end = 0
+
+		for first, last, idx in sorted(fileRanges):
+
+			if first != end:
+
+				raise ValueError('{}: events {}-{} {} (shard {})'.format(fileName, min(first, end), max(first, end) - 1, 'are read twice' if first < end else 'are not read', idx))
+
+			end = last
+
+		if end != numEvents[fileName]:
+
+			raise ValueError('{}: events {}-{} are not read'.format(fileName, end, numEvents[fileName] - 1))
+
+def planPath(sample, directory='inputs'):
+
+	return os.path.join(directory, sample + '_plan.json')
+
+def savePlan(path, sample, inputList, eventsPerShard, shards):
+
+	'''
+	Saves the shards of a sample, after checking them against the file list.
+	'''
+
+	validatePlan(shards, readFileList(inputList))
+
+	plan = {'sample' : sample, 'inputList' : inputList, 'eventsPerShard' : eventsPerShard, 'shards' : shards}
+
+	with open(path, 'w') as f:
+
+		json.dump(plan, f, indent=2, sort_keys=True)
+
+	return plan
+
+def loadPlan(path):
+
+	with open(path, 'r') as f:
+
+		return json.load(f)
+
+def duplicateEvents(tree):
+
+	'''
+	Returns the (run, luminosityBlock, event) of the events appearing more than once in the tree (or chain of chunks).
+	'''
+
+	ids = loadScalars(tree, ['run', 'luminosityBlock', 'event'])
+
+	rows = np.column_stack([ids['run'], ids['luminosityBlock'], ids['event']]).astype(np.int64)
+
+	unique, counts = np.unique(rows, axis=0, return_counts=True)
+
+	return [tuple(row) for row in unique[counts > 1]]
@@ -0,0 +1,205 @@
+import ROOT
+import os
+import json
+import time
+import hashlib
+
+from lib.remoteInput import storePath
+from lib.cuts import inputFingerprint
+
+#####################################
+# Cache of the per-file fragments of writeTree.py
+# writeTree.py writes the events of each input file into a fragment (a ROOT file with an eventTree),
+# kept in a local cache and keyed by the logical file name of the input and a hash of the writer configuration:
+# the branch schema, the triggers, filters, IDs and cuts of the era (see lib/eraConfig.py) and the options changing the events saved.
+# The output of a job is assembled from its fragments, so a rerun (e.g. after a failure, or over a longer input list)
+# only processes the input files without a fragment for the current configuration.
+# The logical file names (/store/...) never change, while the local input files (e.g. with -l) are also identified
+# by their size and modification time, so a changed local file is processed again.
+# A fragment is moved in place only once it is complete, so an interrupted job never leaves a partial fragment behind.
+#####################################
+
+#To be increased when writeTree.py changes how the events are filled, so that the existing fragments are not used anymore
+
+writerVersion = 1
+
+#Configuration entries which do not change the events written
+
+ignoredKeys = ['inputList', 'localDir', 'backgroundDir', 'outputPrefix', 'redirectors', 'localReplicaDirs', 'inputAccess']
+
+def _jsonable(value):
+
+	#Functions (e.g. the jet ID) are identified by their name
+
+	if callable(value): return '{}.{}'.format(value.__module__, value.__name__)
+
+	if isinstance(value, dict): return dict((str(key), _jsonable(item)) for key, item in value.items())
+
+	if isinstance(value, (list, tuple)): return [_jsonable(item) for item in value]
+
+	return value
+
+def configHash(config, schema, options=None):
+
+	'''
+	Returns the hash of the writer configuration.
+
+	ARGUMENTS:
+	---config: Era configuration, see lib/eraConfig.py.
+	---schema: Branch schema of the tree, see lib/vbf_tree.py.
+	---options: Dictionary of the command line options changing the events saved, e.g. skimVetoes.
+	'''
+
+	settings = dict((key, value) for key, value in config.items() if key not in ignoredKeys)
+
+	content = {'writerVersion' : writerVersion, 'config' : _jsonable(settings), 'schema' : _jsonable(schema), 'options' : _jsonable(options or {})}
+
+	return hashlib.sha1(json.dumps(content, sort_keys=True).encode('utf-8')).hexdigest()
+
+class FragmentCache(object):
+
+	'''
+	Fragments of the input files for one writer configuration.
+
+	ARGUMENTS:
+	---directory: Directory of the cache.
+	---configHash: Hash of the writer configuration, see configHash.
+	'''
+
+	def __init__(self, directory, configHash):
+
+		self.directory = directory
+		self.configHash = configHash
+
+	def fingerprint(self, inputFile):
+
+		'''
+		Returns the size and modification time of a local input file (see inputFingerprint in lib/cuts.py),
+		None for a logical file name (/store/...), which always refers to the same content.
+		'''
+
+		lfn = storePath(inputFile)
+
+		if lfn.startswith('/store/'): return None
+
+		return inputFingerprint([inputFile])
+
+	def path(self, inputFile, eventRange=None):
+
+		'''
+		Returns the path of the fragment of the given input file (and range of events, see lib/eventRanges.py),
+		the same for a file given with or without a redirector.
+		'''
+
+		lfn = storePath(inputFile)
+
+		if eventRange: lfn += '#{}+{}'.format(*eventRange)
+
+		fingerprint = self.fingerprint(inputFile)
+
+		if fingerprint: lfn += '#' + fingerprint
+
+		key = hashlib.sha1(lfn.encode('utf-8')).hexdigest()[:20]
+
+		return os.path.join(self.directory, self.configHash[:12], key + '.root')
+
+	def info(self, path):
+
+		'''
+		Returns the information saved in the fragment (input file, event counts), None if the file is not a valid fragment.
+		'''
+
+		if not os.path.exists(path): return None
+
+		fragmentFile = ROOT.TFile.Open(path, 'READ')
+
+		if not fragmentFile or fragmentFile.IsZombie(): return None
+
+		saved = fragmentFile.Get('fragmentInfo')
+
+		info = json.loads(saved.GetTitle()) if saved else None
+
+		fragmentFile.Close()
+
+		if info is None or info['configHash'] != self.configHash: return None
+
+		return info
+
+	def lookup(self, inputFile, eventRange=None):
+
+		'''
+		Returns the path and the information of the fragment of the given input file (and range of events),
+		or None, None if there is none yet.
+		'''
+
+		path = self.path(inputFile, eventRange)
+
+		info = self.info(path)
+
+		if info is None or info['input'] != storePath(inputFile) or info.get('eventRange') != (list(eventRange) if eventRange else None): return None, None
+
+		if info.get('fingerprint') != self.fingerprint(inputFile): return None, None
+
+		return path, info
+
+	def create(self, inputFile, eventRange=None):
+
+		'''
+		Returns a new fragment file for the given input file (and range of events), to be filled and then passed to commit().
+		'''
+
+		path = self.path(inputFile, eventRange)
+
+		if not os.path.isdir(os.path.dirname(path)):
+
+			os.makedirs(os.path.dirname(path))
+
+		return ROOT.TFile(path + '.tmp', 'RECREATE')
+
+	def commit(self, fragmentFile, inputFile, eventRange=None, **counts):
+
+		'''
+		Saves the information of the fragment, closes it and moves it in place. Returns the path of the fragment.
+
+		ARGUMENTS:
+		---fragmentFile: File returned by create(), with the tree written into it.
+		---inputFile: Input file of the fragment.
+		---eventRange: Range of events of the input file, (first event, number of events), None for the whole file.
+		---counts: Event counts of the fragment, e.g. numSavedEvents.
+		'''
+
+		info = {'input' : storePath(inputFile), 'eventRange' : list(eventRange) if eventRange else None, 'fingerprint' : self.fingerprint(inputFile),
+				'configHash' : self.configHash, 'created' : time.strftime('%Y-%m-%d %H:%M:%S')}
+		info.update(counts)
+
+		fragmentFile.cd()
+		fragmentFile.WriteTObject(ROOT.TNamed('fragmentInfo', json.dumps(info, sort_keys=True)))
+
+		tmpPath = fragmentFile.GetName()
+
+		fragmentFile.Close()
+
+		path = tmpPath[:-len('.tmp')]
+
+		os.rename(tmpPath, path)
+
+		return path
+
+def assembleFragments(paths, tree):
+
+	'''
+	Copies the events of the given fragments into the tree, without decompressing them.
+	Returns the number of entries of the tree.
+	'''
+
+	chain = ROOT.TChain(tree.GetName())
+
+	for path in paths:
+
+		chain.Add(path)
+
+	if paths:
+
+		tree.CopyEntries(chain, -1, 'fast')
+
+	return tree.GetEntries()
@@ -0,0 +1,194 @@
+import ROOT
+import numpy as np
+from array import array
+
+from lib.columns import loadScalars
+from lib.entryLists import onlyEntries
+
+#####################################
+# 2D mjj-MET maps of trigger gains
+# The events passing the VBF selections are read once, with their MET, mjj and the decisions of the VBF and MET triggers.
+# GainMaps accumulates, per (MET, mjj) bin, the sum of weights and the sum of squared weights of four categories:
+# -- all    : all the events passing the selections
+# -- vbf    : events passing the VBF trigger
+# -- met    : events passing the MET trigger
+# -- onlyVBF: events passing the VBF trigger and failing the MET trigger
+# The count maps and the ratio maps (with their uncertainties) are then built from these sums,
+# instead of filling each map with a separate TTree::Draw and dividing them with TH1::Divide.
+#####################################
+
+categories = ['all', 'vbf', 'met', 'onlyVBF']
+
+class GainMaps(object):
+
+	'''
+	Sums of weights and of squared weights per (MET, mjj) bin, for each category.
+	The bins are numbered as in ROOT: bin = binx + (nx+2)*biny, including the underflow and overflow bins.
+	fill can be called several times, e.g. once per chunk of events.
+
+	ARGUMENTS:
+	---metEdges: Bin edges on the x-axis (MET).
+	---mjjEdges: Bin edges on the y-axis (mjj).
+	'''
+
+	def __init__(self, metEdges, mjjEdges):
+
+		self.metEdges = np.asarray(metEdges, dtype=np.float64)
+		self.mjjEdges = np.asarray(mjjEdges, dtype=np.float64)
+
+		self.numBins = (len(self.metEdges)+1) * (len(self.mjjEdges)+1)
+
+		self.sumw = dict((category, np.zeros(self.numBins)) for category in categories)
+		self.sumw2 = dict((category, np.zeros(self.numBins)) for category in categories)
+
+	def _bins(self, met, mjj):
+
+		binx = np.searchsorted(self.metEdges, met, side='right')
+		biny = np.searchsorted(self.mjjEdges, mjj, side='right')
+
+		return binx + (len(self.metEdges)+1) * biny
+
+	def fill(self, met, mjj, passVBF, passMET, weights=None, failMET=None):
+
+		'''
+		Adds the given events to the sums.
+
+		ARGUMENTS:
+		---met, mjj: Arrays of MET and mjj values.
+		---passVBF, passMET: Boolean arrays of the trigger decisions.
+		---weights: Event weights, all 1 if None.
+		---failMET: Boolean array of the events failing the MET trigger, for the onlyVBF category. By default, ~passMET.
+					Events where the MET path is not in the HLT menu neither pass nor fail it (see fillGainMaps).
+		'''
+
+		if weights is None:
+
+			weights = np.ones(len(met))
+
+		valid = ~(np.isnan(met) | np.isnan(mjj))
+
+		bins = self._bins(met[valid], mjj[valid])
+
+		if failMET is None:
+
+			failMET = ~passMET
+
+		weights, passVBF, passMET, failMET = weights[valid], passVBF[valid], passMET[valid], failMET[valid]
+
+		masks = {'all' : np.ones(len(bins), dtype=bool), 'vbf' : passVBF, 'met' : passMET, 'onlyVBF' : passVBF & failMET}
+
+		for category, mask in masks.items():
+
+			self.sumw[category] += np.bincount(bins[mask], weights=weights[mask], minlength=self.numBins)
+			self.sumw2[category] += np.bincount(bins[mask], weights=weights[mask]**2, minlength=self.numBins)
+
+	def _histogram(self, name, title, contents, errors):
+
+		histo = ROOT.TH2F(name, title, len(self.metEdges)-1, array('d', self.metEdges), len(self.mjjEdges)-1, array('d', self.mjjEdges))
+		histo.SetDirectory(0)
+		histo.Sumw2()
+
+		for i in range(self.numBins):
+
+			histo.SetBinContent(i, contents[i])
+			histo.SetBinError(i, errors[i])
+
+		histo.GetXaxis().SetTitle('MET (GeV)')
+		histo.GetYaxis().SetTitle('mjj (GeV)')
+
+		return histo
+
+	def counts(self, category, name, title='', scaleFactor=None):
+
+		'''
+		Returns the TH2F of the (weighted) number of events in the given category,
+		with the square root of the sum of squared weights as the bin errors.
+		'''
+
+		scale = scaleFactor or 1.
+
+		histo = self._histogram(name, title, self.sumw[category] * scale, np.sqrt(self.sumw2[category]) * scale)
+
+		histo.SetEntries(self.sumw[category].sum())
+
+		return histo
+
+	def ratio(self, numerator, denominator, name, title=''):
+
+		'''
+		Returns the TH2F of the ratio of two categories, per bin.
+		If the numerator is a subset of the denominator (e.g. vbf / all), the binomial uncertainty
+		for weighted events is used, which reduces to sqrt(p(1-p)/N) for unweighted events.
+		Otherwise the two categories are taken as independent (e.g. onlyVBF / met, which are disjoint).
+		Bins with no events in the denominator are left empty.
+		'''
+
+		num, den = self.sumw[numerator], self.sumw[denominator]
+		num2, den2 = self.sumw2[numerator], self.sumw2[denominator]
+
+		filled = den > 0
+
+		ratio = np.zeros(self.numBins)
+		ratio[filled] = num[filled] / den[filled]
+
+		variance = np.zeros(self.numBins)
+
+		if isSubset(numerator, denominator):
+
+			#Events passing (num) and failing (den - num) are independent
+
+			variance[filled] = (num2[filled] * (1 - ratio[filled])**2 + (den2[filled] - num2[filled]) * ratio[filled]**2) / den[filled]**2
+
+		else:
+
+			variance[filled] = (num2[filled] + ratio[filled]**2 * den2[filled]) / den[filled]**2
+
+		return self._histogram(name, title, ratio, np.sqrt(np.maximum(variance, 0.)))
+
+def isSubset(category, other):
+
+	'''
+	Returns True if the events of the given category are always in the other category.
+	'''
+
+	return category == other or other == 'all' or (category == 'onlyVBF' and other == 'vbf')
+
+def fillGainMaps(tree, maps, vbfTrigger, metTrigger, baseCut, weight=None):
+
+	'''
+	Reads MET, mjj and the trigger decisions of the events passing baseCut once,
+	and fills all the given GainMaps with them (e.g. maps with different binnings).
+
+	ARGUMENTS:
+	---tree: The event tree (or chain).
+	---maps: List of GainMaps to be filled.
+	---vbfTrigger: VBF trigger in consideration.
+	---metTrigger: MET trigger in consideration, None if only the VBF trigger is studied.
+	---baseCut: The VBF selections (Cut object or expression).
+	---weight: Expression of the event weight, None for unweighted events.
+	'''
+
+	names = ['met', 'mjj', vbfTrigger] + [name for name in (metTrigger, weight) if name]
+
+	#Read the columns for the events passing baseCut only, see lib/entryLists.py
+
+	with onlyEntries(tree, baseCut):
+
+		columns = loadScalars(tree, names, str(baseCut))
+
+	#A trigger branch is -1 for the events where the path is not in the HLT menu,
+	#which neither pass nor fail the trigger, as with triggerFired and triggerFailed (see lib/cuts.py)
+
+	passVBF = columns[vbfTrigger] == 1
+	passMET = columns[metTrigger] == 1 if metTrigger else np.zeros(len(passVBF), dtype=bool)
+	failMET = columns[metTrigger] == 0 if metTrigger else np.ones(len(passVBF), dtype=bool)
+
+	weights = columns[weight] if weight else None
+
+	for gainMaps in maps:
+
+		gainMaps.fill(columns['met'], columns['mjj'], passVBF, passMET, weights, failMET)
+
+	print('INFO: Gain maps filled with {} events passing {}'.format(len(passVBF), getattr(baseCut, 'name', baseCut)))
+
+	return maps
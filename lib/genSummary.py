@@ -0,0 +1,121 @@
+import ROOT
+
+from lib.cppHelpers import declareOnce
+
+#####################################
+# Generator level summary of an event
+# Instead of storing every prunedGenParticles entry, only the quantities used in the studies are stored:
+# -- The boson of the hard process (H for the signal, Z/W for the V+jets backgrounds),
+#    its type and kinematics, e.g. for the Higgs pT and the V+jets k-factors
+# -- The two outgoing quarks of the hard process (the VBF quarks for the signal) and their invariant mass
+# The hard process particles are picked in C++, so Python only handles a handful of particles per event.
+#####################################
+
+_summaryCode = '''
+#include "DataFormats/HepMCCandidate/interface/GenParticle.h"
+
+namespace vbfStudies {
+
+	// Returns the indices of the particles coming from the hard process
+	std::vector<int> hardProcessIndices(const std::vector<reco::GenParticle>& particles) {
+
+		std::vector<int> indices;
+
+		for (size_t i = 0; i < particles.size(); ++i) {
+
+			if (particles[i].isHardProcess()) indices.push_back(i);
+		}
+
+		return indices;
+	}
+}
+'''
+
+#Bosons in order of preference, in case there is more than one in the hard process
+
+bosonPdgIds = [25, 23, 24]
+
+def declareGenSummary():
+
+	declareOnce(_summaryCode, 'gen summary helper')
+
+def findBoson(particles):
+
+	'''
+	Returns the last copy of the hard process boson, None if there is none.
+	'''
+
+	for bosonPdgId in bosonPdgIds:
+
+		candidates = [prt for prt in particles if abs(prt.pdgId()) == bosonPdgId]
+
+		if candidates:
+
+			lastCopies = [prt for prt in candidates if prt.isLastCopy()]
+
+			return lastCopies[-1] if lastCopies else candidates[-1]
+
+	return None
+
+def findOutgoingQuarks(particles):
+
+	'''
+	Returns the outgoing quarks of the hard process (status 23), ordered in decreasing pt.
+	'''
+
+	quarks = [prt for prt in particles if abs(prt.pdgId()) <= 6 and prt.status() == 23]
+
+	return sorted(quarks, key=lambda prt: prt.pt(), reverse=True)
+
+def fillGenSummary(genParticles_, branches):
+
+	'''
+	Fills the gen summary branches (see genSummaryBranches in lib/vbf_tree.py) for the given prunedGenParticles collection.
+	Branches keep their default values if the boson or the quark pair is not found.
+	'''
+
+	declareGenSummary()
+
+	particles = [genParticles_[k] for k in ROOT.vbfStudies.hardProcessIndices(genParticles_)]
+
+	boson = findBoson(particles)
+
+	if boson is not None:
+
+		branches['gen_bosonPdgId'][0] = boson.pdgId()
+		branches['gen_boson_pt'][0] = boson.pt()
+		branches['gen_boson_eta'][0] = boson.eta()
+		branches['gen_boson_phi'][0] = boson.phi()
+		branches['gen_boson_mass'][0] = boson.mass()
+
+	quarks = findOutgoingQuarks(particles)
+
+	branches['gen_nQuarks'][0] = len(quarks)
+
+	if len(quarks) >= 2:
+
+		q1, q2 = quarks[0], quarks[1]
+
+		branches['gen_quark1_pt'][0] = q1.pt()
+		branches['gen_quark1_eta'][0] = q1.eta()
+		branches['gen_quark1_phi'][0] = q1.phi()
+		branches['gen_quark2_pt'][0] = q2.pt()
+		branches['gen_quark2_eta'][0] = q2.eta()
+		branches['gen_quark2_phi'][0] = q2.phi()
+
+		branches['gen_mjj_quarks'][0] = (q1.p4() + q2.p4()).M()
+		branches['gen_absEtaDiff_quarks'][0] = abs(q1.eta() - q2.eta())
+
+def fillGenParticles(genParticles_, branches):
+
+	'''
+	Stores the pdgId of every particle in the collection, only if storeGenParticles is set in the era configuration.
+	'''
+
+	branches['nParticles'][0] = len(genParticles_)
+
+	pdgId = branches['pdgId']
+
+	for j, prt in enumerate(genParticles_):
+
+		pdgId[j] = prt.pdgId()
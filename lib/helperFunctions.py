@@ -1,5 +1,4 @@
 import ROOT
-from math import pi
 
 def isTightJet(jet):
 
@@ -37,58 +36,59 @@ def isTightJet(jet):
 
 	return True
 
-def invMassTwoJets(jets_):
-	
+def isTightJet_2018(jet):
+
 	'''
-	Calculates the invariant mass of two leading jets in the event.
+	Returns True if the given jet passes the tight ID requirements (2018).
+	Otherwise, returns False.
 	'''
-	
-	leadingJet = jets_[0]
-	trailingJet = jets_[1]
-	
-	total_p4 = leadingJet.p4() + trailingJet.p4()
+	if abs(jet.eta()) <= 2.6:
 
-	mjj = total_p4.M()
+		if jet.nConstituents() <= 1: return False
 
-	return mjj
+		if jet.neutralHadronEnergyFraction() >= 0.9: return False
 
+		if jet.neutralEmEnergyFraction() >= 0.9: return False
 
-def minJetMETPhi(jets_, mets_):
+		if jet.chargedHadronEnergyFraction() <= 0: return False
 
-	'''
-	Calculates the minimum phi difference between four leading jets and MET.
-	If there are less than four jets in the event, it calculates the minimum phi difference by looking at all the jets.
-	'''
+		if jet.chargedMultiplicity() <= 0: return False
+
+	if 2.6 < abs(jet.eta()) <= 2.7:
+
+		if jet.neutralHadronEnergyFraction() >= 0.9: return False
+
+		if jet.neutralEmEnergyFraction() >= 0.99: return False
 
-	phiDiffList = []	
-	met = mets_[0]
+		if jet.chargedMultiplicity() <= 0: return False
 
-	if len(jets_) <= 4:
-		for j in jets_:
+	if 2.7 < abs(jet.eta()) <= 3.0:
 
-			if j.pt() < 30: continue
-			phi_diff = abs(j.phi() - met.phi())
-			
-			if phi_diff <= pi:
-				phiDiffList.append(phi_diff)
+		if not 0.02 < jet.neutralEmEnergyFraction() < 0.99: return False
 
-			else:
-				phiDiffList.append(2*pi - phi_diff)
+		if jet.neutralMultiplicity() <= 2: return False
 
-	else:
-		for i in range(4): #Take only the first four leading jets
+	if abs(jet.eta()) > 3.0:
 
-			if jets_[i].pt() < 30: continue
-			phi_diff = abs(jets_[i].phi() - met.phi())
-			
-			if phi_diff <= pi:
-				phiDiffList.append(phi_diff)
+		if jet.neutralEmEnergyFraction() >= 0.9: return False
 
-			else:
-				phiDiffList.append(2*pi - phi_diff)
+		if jet.neutralHadronEnergyFraction() <= 0.2: return False
 
-	if phiDiffList:
+		if jet.neutralMultiplicity() <= 10: return False
 
-		return min(phiDiffList)
+	return True
 
-	return -1.0 #These events will not pass 	
+def invMassTwoJets(jets_):
+	
+	'''
+	Calculates the invariant mass of two leading jets in the event.
+	'''
+	
+	leadingJet = jets_[0]
+	trailingJet = jets_[1]
+	
+	total_p4 = leadingJet.p4() + trailingJet.p4()
+
+	mjj = total_p4.M()
+
+	return mjj
@@ -0,0 +1,128 @@
+import numpy as np
+
+from lib.columns import loadJagged
+from lib.kinematics import pairMasses
+from lib.derivedVariables import pairingStrategies, pairValues
+from lib.results import Results
+
+#####################################
+# Leading pair vs. max mjj pair, from the jets stored in eventTree
+# For each event, the pair of jets with the largest invariant mass is compared with the two leading jets,
+# in the three eta geometries of the two leading jets. All the pair masses of all the events are computed at once
+# (see lib/kinematics.py), and the results are kept in a Results (see lib/results.py), so the results of many files
+# (e.g. processed in parallel or on batch nodes, see studyJetPairs.py) are merged by adding them.
+#####################################
+
+geometries = ['twoCentralJets', 'twoForwardJets', 'oneCentralJetOneForwardJet']
+
+#Binning of the fraction plots (mjj of the leading pair) and of the 2D mjj plot (max mjj pair vs. leading pair)
+
+mjjBins = np.arange(500., 2500., 100.)
+mjjBins2D = np.arange(500., 2000., 50.)
+
+def jetGeometry(eta1, eta2):
+
+	'''
+	Returns the index of the geometry of the two leading jets in geometries, -1 for missing jets.
+	Jets with |eta| <= 2.5 are central.
+	'''
+
+	with np.errstate(invalid='ignore'):
+
+		central1, central2 = np.abs(eta1) <= 2.5, np.abs(eta2) <= 2.5
+
+	geometry = np.where(central1 & central2, 0, np.where(~central1 & ~central2, 1, 2))
+
+	return np.where(np.isnan(eta1) | np.isnan(eta2), -1, geometry)
+
+def jetPairResults(inputs=None, metadata=None):
+
+	'''
+	Returns an empty Results (see lib/results.py) of the jet pair study, per geometry of the two leading jets:
+	-- fraction_<geometry> : efficiency of the events where the leading pair is the max mjj pair, vs. mjj of the leading pair
+	-- mjj2D_<geometry>    : mjj of the max mjj pair (x) vs. mjj of the leading pair (y)
+	-- leading_<geometry>, other_<geometry> : number of events where the max mjj pair is the leading pair or another pair
+	'''
+
+	results = Results(inputs, metadata)
+
+	for geometry in geometries:
+
+		results.addEfficiency('fraction_' + geometry, mjjBins)
+		results.addHistogram('mjj2D_' + geometry, mjjBins2D, mjjBins2D)
+
+		results.count('leading_' + geometry, 0)
+		results.count('other_' + geometry, 0)
+
+	return results
+
+def fillJetPairs(results, pt, eta, phi, energy, ptCut=0.):
+
+	'''
+	Adds the events with the given (events x jets) arrays, padded with NaN (see lib/columns.py), to the results.
+	'''
+
+	if pt.shape[1] < 2: return results #No event with two jets
+
+	leadingMjj = pairMasses(pt[:, :2], eta[:, :2], phi[:, :2], energy[:, :2])[:, 0]
+
+	first, second = pairingStrategies['maxMjj'](pt, eta, phi, energy, ptCut)
+
+	hasPair = first >= 0
+
+	maxMjj = np.where(hasPair, pairMasses(*pairValues((pt, eta, phi, energy), first, second))[:, 0], np.nan)
+
+	isLeading = (first == 0) & (second == 1)
+
+	geometry = jetGeometry(eta[:, 0], eta[:, 1])
+
+	for idx, name in enumerate(geometries):
+
+		selected = (geometry == idx) & hasPair & ~np.isnan(leadingMjj)
+
+		results.fillEfficiency('fraction_' + name, leadingMjj[selected], isLeading[selected])
+		results.fill('mjj2D_' + name, maxMjj[selected], leadingMjj[selected])
+
+		results.count('leading_' + name, int(isLeading[selected].sum()))
+		results.count('other_' + name, int((~isLeading[selected]).sum()))
+
+	return results
+
+def fraction(results, geometry):
+
+	'''
+	Returns the TEfficiency of the events where the leading pair is the max mjj pair, as a function of mjj of the leading pair.
+	'''
+
+	return results.efficiency('fraction_' + geometry, 'Leading pair is the max mjj pair ({});mjj of the leading pair (GeV);Fraction of events'.format(geometry))
+
+def histogram2D(results, geometry):
+
+	'''
+	Returns the TH2F of mjj of the max mjj pair (x-axis) vs. mjj of the leading pair (y-axis).
+	'''
+
+	histo = results.histogram('mjj2D_' + geometry, geometry)
+
+	histo.GetXaxis().SetTitle('mjj from the highest mjj pair (GeV)')
+	histo.GetYaxis().SetTitle('mjj from the leading jet pair (GeV)')
+
+	return histo
+
+def studyJetPairs(tree, selection='', ptCut=0., inputs=None):
+
+	'''
+	Runs the jet pair study over the events of the tree passing the selection, returns the Results.
+
+	ARGUMENTS:
+	---tree: eventTree, or a chain of them.
+	---selection: Cut applied before the study.
+	---ptCut: Only the jets above this pt are paired for the max mjj pair.
+	---inputs: Inputs recorded in the Results, see lib/results.py. Results of different settings are not merged.
+	'''
+
+	counts, jets = loadJagged(tree, 'nJet', ['jet_pt', 'jet_eta', 'jet_phi', 'jet_energy'], selection)
+
+	results = jetPairResults(inputs, {'selection' : str(selection), 'ptCut' : ptCut})
+
+	return fillJetPairs(results, jets['jet_pt'], jets['jet_eta'], jets['jet_phi'], jets['jet_energy'], ptCut)
@@ -0,0 +1,80 @@
+import numpy as np
+
+#####################################
+# Vectorized kinematics over padded object arrays
+# All the arrays are (events x objects), padded with NaN as returned by lib/columns.py.
+#####################################
+
+def fourMomenta(pt, eta, phi, energy):
+
+	'''
+	Returns px, py, pz and E arrays for the given pt, eta, phi and energy arrays.
+	'''
+
+	return pt*np.cos(phi), pt*np.sin(phi), pt*np.sinh(eta), energy
+
+def pairIndices(numObjects):
+
+	'''
+	Returns the two index arrays (i, j), i < j, of all the pairs among numObjects objects.
+	'''
+
+	return np.triu_indices(numObjects, k=1)
+
+def pairMasses(pt, eta, phi, energy):
+
+	'''
+	Computes the invariant mass of every pair of objects in each event.
+	Returns a (events x pairs) array, pairs ordered as in pairIndices.
+	Pairs involving a padding entry are NaN.
+	'''
+
+	px, py, pz, E = fourMomenta(pt, eta, phi, energy)
+
+	i, j = pairIndices(pt.shape[1])
+
+	massSquared = (E[:, i] + E[:, j])**2 - (px[:, i] + px[:, j])**2 - (py[:, i] + py[:, j])**2 - (pz[:, i] + pz[:, j])**2
+
+	#Rounding errors can make the mass squared slightly negative for (nearly) collinear pairs
+
+	return np.sqrt(np.clip(massSquared, 0., None))
+
+def maxPairMass(pt, eta, phi, energy, ptCut=0.):
+
+	'''
+	Returns the largest invariant mass among the pairs of objects with pt > ptCut, per event.
+	Events with less than two such objects get -1.
+	'''
+
+	masses = pairMasses(pt, eta, phi, energy)
+
+	i, j = pairIndices(pt.shape[1])
+
+	with np.errstate(invalid='ignore'):
+
+		accepted = (pt[:, i] > ptCut) & (pt[:, j] > ptCut)
+
+	masses = np.where(accepted, masses, -1.)
+
+	if masses.shape[1] == 0:
+
+		return np.full(pt.shape[0], -1.)
+
+	return masses.max(axis=1)
+
+def leadingValues(values, n=2):
+
+	'''
+	Returns the n largest values per event in decreasing order, as a (events x n) array.
+	Missing entries are NaN.
+	'''
+
+	filled = np.where(np.isnan(values), -np.inf, values)
+
+	if filled.shape[1] < n:
+
+		filled = np.hstack([filled, np.full((filled.shape[0], n - filled.shape[1]), -np.inf)])
+
+	leading = -np.sort(-filled, axis=1)[:, :n]
+
+	return np.where(np.isinf(leading), np.nan, leading)
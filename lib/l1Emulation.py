@@ -0,0 +1,142 @@
+import numpy as np
+
+from lib.columns import loadJagged
+from lib.kinematics import maxPairMass, leadingValues
+
+#####################################
+# Emulation of the VBF L1 seed, L1_DoubleJet_115_40_DoubleJet40_Mass_Max620
+# The seed fires if:
+# -- One L1 jet has pt > 115 GeV and another one has pt > 40 GeV
+# -- Any pair of L1 jets with pt > 40 GeV has an invariant mass above 620 GeV
+# The emulation runs over the stored L1_jet_pt/eta/phi/energy columns of all the events at once.
+#####################################
+
+defaultThresholds = {'leadingJetPt' : 115., 'trailingJetPt' : 40., 'pairJetPt' : 40., 'mjj' : 620.}
+
+L1JetColumns = ['L1_jet_pt', 'L1_jet_eta', 'L1_jet_phi', 'L1_jet_energy']
+
+class L1Jets(object):
+
+	'''
+	L1 jets of a set of events, as (events x jets) arrays padded with NaN.
+	The quantities used by the seed are computed lazily and cached,
+	so scanning the thresholds does not recompute the pair masses.
+	'''
+
+	def __init__(self, pt, eta, phi, energy):
+
+		self.pt, self.eta, self.phi, self.energy = pt, eta, phi, energy
+
+		self._leading = None
+		self._maxMjj = {}
+
+	@classmethod
+	def fromTree(cls, tree, selection='', maxJets=None):
+
+		'''
+		Loads the L1 jets of the events in the tree passing the given selection.
+		If maxJets is given, only the leading maxJets L1 jets of each event are considered.
+		'''
+
+		counts, columns = loadJagged(tree, 'L1_nJet', L1JetColumns, selection, maxJets)
+
+		return cls(*[columns[name] for name in L1JetColumns])
+
+	@classmethod
+	def fromEvent(cls, event):
+
+		'''
+		Builds the L1 jets of a single event read from eventTree.
+		'''
+
+		n = event.L1_nJet
+
+		return cls(*[np.array([[getattr(event, name)[k] for k in range(n)]], dtype=np.float64) for name in L1JetColumns])
+
+	def __len__(self):
+
+		return self.pt.shape[0]
+
+	def leadingPts(self):
+
+		'''
+		Returns the pt of the two leading L1 jets per event (NaN if missing).
+		'''
+
+		if self._leading is None:
+
+			self._leading = leadingValues(self.pt, 2)
+
+		return self._leading
+
+	def maxMjj(self, pairJetPt):
+
+		'''
+		Returns the largest invariant mass among the pairs of L1 jets with pt > pairJetPt (-1 if no such pair).
+		'''
+
+		if pairJetPt not in self._maxMjj:
+
+			self._maxMjj[pairJetPt] = maxPairMass(self.pt, self.eta, self.phi, self.energy, pairJetPt)
+
+		return self._maxMjj[pairJetPt]
+
+def emulateL1Seed(jets, leadingJetPt=115., trailingJetPt=40., pairJetPt=40., mjj=620.):
+
+	'''
+	Returns a boolean array telling which events pass the L1 seed with the given thresholds.
+
+	ARGUMENTS:
+	---jets: L1Jets object.
+	---leadingJetPt: pt threshold of the leading L1 jet.
+	---trailingJetPt: pt threshold of the second L1 jet.
+	---pairJetPt: pt threshold of the L1 jets considered while computing the pair masses.
+	---mjj: Threshold on the largest pair mass.
+	'''
+
+	leading = jets.leadingPts()
+
+	with np.errstate(invalid='ignore'):
+
+		passJets = (leading[:, 0] > leadingJetPt) & (leading[:, 1] > trailingJetPt)
+
+	return passJets & (jets.maxMjj(pairJetPt) > mjj)
+
+def scanL1Thresholds(jets, leadingJetPts=(115.,), trailingJetPts=(40.,), mjjs=(620.,), pairJetPts=(40.,), weights=None):
+
+	'''
+	Evaluates the L1 seed for every combination of the given thresholds.
+	Returns a dictionary mapping (leadingJetPt, trailingJetPt, pairJetPt, mjj) to
+	(number of passing events, fraction of events passing).
+	If weights are given, the weighted sums are used instead of event counts.
+	'''
+
+	if weights is None:
+
+		weights = np.ones(len(jets))
+
+	total = weights.sum()
+
+	leading = jets.leadingPts()
+
+	results = {}
+
+	for pairJetPt in pairJetPts:
+
+		maxMjj = jets.maxMjj(pairJetPt)
+
+		for leadingJetPt in leadingJetPts:
+
+			for trailingJetPt in trailingJetPts:
+
+				with np.errstate(invalid='ignore'):
+
+					passJets = (leading[:, 0] > leadingJetPt) & (leading[:, 1] > trailingJetPt)
+
+				for mjj in mjjs:
+
+					passed = weights[passJets & (maxMjj > mjj)].sum()
+
+					results[(leadingJetPt, trailingJetPt, pairJetPt, mjj)] = (passed, passed/total if total else 0.)
+
+	return results
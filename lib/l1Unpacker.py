@@ -0,0 +1,111 @@
+import ROOT
+
+from lib.cppHelpers import declareOnce
+
+#####################################
+# Bulk extraction of L1 objects from BXVectors
+# The loops over the L1 objects run in C++ (declared below through the ROOT interpreter)
+# and write directly into the branch buffers, so filling the L1 branches of an event
+# costs a single call per collection instead of one call per object and attribute.
+#####################################
+
+_unpackerCode = '''
+#include "DataFormats/L1Trigger/interface/Jet.h"
+#include "DataFormats/L1Trigger/interface/EtSum.h"
+
+namespace vbfStudies {
+
+	// Copies the jets of the given bunch crossing with pt >= ptFloor into the output arrays,
+	// keeping at most maxJets of them. Returns the number of jets copied.
+	int unpackL1Jets(const BXVector<l1t::Jet>& jets, int bx, float ptFloor, int maxJets,
+	                 float* pt, float* eta, float* phi, float* energy) {
+
+		int n = 0;
+
+		if (bx < jets.getFirstBX() || bx > jets.getLastBX()) return n;
+
+		for (auto jet = jets.begin(bx); jet != jets.end(bx) && n < maxJets; ++jet) {
+
+			if (jet->pt() < ptFloor) continue;
+
+			pt[n] = jet->pt();
+			eta[n] = jet->eta();
+			phi[n] = jet->phi();
+			energy[n] = jet->energy();
+
+			++n;
+		}
+
+		return n;
+	}
+
+	// Copies the first sum of the given type in the given bunch crossing into the outputs.
+	// Returns false if there is no such sum.
+	bool unpackL1EtSum(const BXVector<l1t::EtSum>& sums, int bx, int type,
+	                   float* pt, float* eta, float* phi) {
+
+		if (bx < sums.getFirstBX() || bx > sums.getLastBX()) return false;
+
+		for (auto sum = sums.begin(bx); sum != sums.end(bx); ++sum) {
+
+			if (sum->getType() != type) continue;
+
+			pt[0] = sum->pt();
+			eta[0] = sum->eta();
+			phi[0] = sum->phi();
+
+			return true;
+		}
+
+		return false;
+	}
+}
+'''
+
+def declareUnpacker():
+
+	declareOnce(_unpackerCode, 'L1 unpacker')
+
+class L1Unpacker(object):
+
+	'''
+	Fills the L1 jet and MET branches from the L1 BXVectors of an event.
+
+	ARGUMENTS:
+	---ptFloor: L1 jets with pt below this value are not stored.
+	---maxJets: At most this many L1 jets are stored per event (the leading ones, L1 jets are pt ordered).
+	---bx: The bunch crossing to be stored.
+	'''
+
+	def __init__(self, ptFloor=0., maxJets=1000, bx=0):
+
+		declareUnpacker()
+
+		self.ptFloor = ptFloor
+		self.maxJets = maxJets
+		self.bx = bx
+
+		#Resolve the EtSum type once, instead of once per sum and event
+
+		self.missingEtType = int(ROOT.l1t.EtSum.kMissingEt)
+
+	def fillJets(self, bxVector_jet, branches):
+
+		'''
+		Fills L1_nJet and the L1_jet_* arrays.
+		'''
+
+		maxJets = min(self.maxJets, len(branches['L1_jet_pt']))
+
+		branches['L1_nJet'][0] = ROOT.vbfStudies.unpackL1Jets(bxVector_jet, self.bx, self.ptFloor, maxJets,
+															 branches['L1_jet_pt'], branches['L1_jet_eta'],
+															 branches['L1_jet_phi'], branches['L1_jet_energy'])
+
+	def fillMET(self, bxVector_met, branches):
+
+		'''
+		Fills L1_met, L1_met_eta and L1_met_phi. They keep their default values if there is no L1 MET in the event.
+		'''
+
+		ROOT.vbfStudies.unpackL1EtSum(bxVector_met, self.bx, self.missingEtType,
+									  branches['L1_met'], branches['L1_met_eta'], branches['L1_met_phi'])
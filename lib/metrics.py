@@ -0,0 +1,317 @@
+import ROOT
+import os
+import json
+import time
+import glob
+import socket
+import atexit
+from collections import OrderedDict
+
+#####################################
+# Progress metrics of the jobs
+# Each job (e.g. one writeTree.py job) writes its counters into its own metrics file, one JSON record per line:
+# -- start   : job name, host, process id and reporting interval
+# -- progress: all the counters (events read and saved, rejections per cut, bytes read, failovers, retries, read errors...), every `interval` seconds
+# -- file    : one record per input file: site, time to the first event (latency), duration, events and bytes read
+# -- end     : final counters and status, 'done' or 'failed' (the job exited without calling finish())
+# The files of many jobs running at the same time are summarized with summarizeMetrics() and printMetricsSummary(),
+# which point out the stalled and slow jobs (stragglers) and the slow sites.
+#####################################
+
+metricsDir = os.path.join('logFiles', 'metrics')
+
+def siteOf(fileName):
+
+	'''
+	Returns the site an input file is read from: the host of a remote file (e.g. root://cmsxrootd.fnal.gov//store/...), 'local' otherwise.
+	'''
+
+	if '://' not in fileName: return 'local'
+
+	return fileName.split('://', 1)[1].split('/', 1)[0]
+
+class JobMetrics(object):
+
+	'''
+	Counters of a job, written into logFiles/metrics/<job>.jsonl at a fixed interval.
+
+	ARGUMENTS:
+	---job: Name of the job, e.g. the name of its output file.
+	---interval: Time between two progress records, in seconds.
+	---path: Path of the metrics file. By default, logFiles/metrics/<job>.jsonl.
+	'''
+
+	def __init__(self, job, interval=30., path=None):
+
+		self.job = job
+		self.interval = interval
+		self.path = path or os.path.join(metricsDir, job + '.jsonl')
+
+		if not os.path.isdir(os.path.dirname(self.path)):
+
+			os.makedirs(os.path.dirname(self.path))
+
+		#A rerun of the job starts a new file
+
+		self.out = open(self.path, 'w')
+
+		self.counters = OrderedDict((name, 0) for name in ('eventsRead', 'eventsSaved', 'bytesRead', 'failovers', 'retries', 'readErrors'))
+
+		self.startTime = self.lastWrite = time.time()
+
+		self.currentFile = None
+		self.finished = False
+
+		self.write({'type' : 'start', 'host' : socket.gethostname(), 'pid' : os.getpid(), 'interval' : interval})
+
+		atexit.register(self._exit)
+
+	def write(self, record):
+
+		record.update({'job' : self.job, 'time' : time.time()})
+
+		self.out.write(json.dumps(record) + '\n')
+		self.out.flush()
+
+	def count(self, name, value=1):
+
+		self.counters[name] = self.counters.get(name, 0) + value
+
+	def reject(self, stage):
+
+		'''
+		Counts an event rejected at the given stage of the selection.
+		'''
+
+		self.count('rejected_' + stage)
+
+	def event(self):
+
+		'''
+		Counts an event read, to be called at the start of each event.
+		Writes a progress record once every interval.
+		'''
+
+		self.counters['eventsRead'] += 1
+
+		now = time.time()
+
+		if self.currentFile is not None and self.currentFile['latency'] is None:
+
+			self.currentFile['latency'] = now - self.currentFile['start']
+
+		if now - self.lastWrite >= self.interval:
+
+			self.progress(now)
+
+	def progress(self, now=None):
+
+		now = now or time.time()
+
+		self.lastWrite = now
+
+		elapsed = now - self.startTime
+
+		self.write({'type' : 'progress', 'elapsed' : elapsed, 'counters' : self.counters, 'file' : self.currentFile and self.currentFile['file']})
+
+		print('INFO: {}: {} events read, {} saved, {:.1f} events/s'.format(self.job, self.counters['eventsRead'], self.counters['eventsSaved'], self.counters['eventsRead'] / max(elapsed, 1e-9)))
+
+	def startFile(self, fileName):
+
+		'''
+		Starts the timing of an input file, to be called before opening it.
+		'''
+
+		self.endFile()
+
+		self.currentFile = {'file' : fileName, 'site' : siteOf(fileName), 'start' : time.time(), 'latency' : None,
+							'eventsRead' : self.counters['eventsRead'], 'bytesRead' : ROOT.TFile.GetFileBytesRead()}
+
+	def setSource(self, url):
+
+		'''
+		Sets the URL the current input file is read from, e.g. after a failover to another site.
+		'''
+
+		if self.currentFile is not None:
+
+			self.currentFile['site'] = siteOf(url)
+
+	def endFile(self):
+
+		'''
+		Writes the record of the current input file, if any.
+		'''
+
+		if self.currentFile is None: return
+
+		info, self.currentFile = self.currentFile, None
+
+		bytesRead = ROOT.TFile.GetFileBytesRead() - info['bytesRead']
+
+		self.count('bytesRead', bytesRead)
+
+		self.write({'type' : 'file', 'file' : info['file'], 'site' : info['site'], 'latency' : info['latency'], 'duration' : time.time() - info['start'],
+					'events' : self.counters['eventsRead'] - info['eventsRead'], 'bytesRead' : bytesRead})
+
+	def finish(self, status='done'):
+
+		'''
+		Writes the final record of the job.
+		'''
+
+		if self.finished: return
+
+		self.endFile()
+
+		self.write({'type' : 'end', 'status' : status, 'elapsed' : time.time() - self.startTime, 'counters' : self.counters})
+
+		self.out.close()
+
+		self.finished = True
+
+	def _exit(self):
+
+		#The job exited without finishing, e.g. after an exception
+
+		self.finish('failed')
+
+#####################################
+# Summary of many jobs
+#####################################
+
+def readMetrics(path):
+
+	'''
+	Returns the records of a metrics file. A line being written by a running job is ignored.
+	'''
+
+	records = []
+
+	with open(path, 'r') as f:
+
+		for line in f:
+
+			try:
+
+				records.append(json.loads(line))
+
+			except ValueError:
+
+				break
+
+	return records
+
+def summarizeMetrics(paths=None, now=None, slowFraction=0.5, stalledIntervals=3):
+
+	'''
+	Summarizes the metrics files of many jobs (by default, logFiles/metrics/*.jsonl).
+	Returns a dictionary with:
+	-- jobs      : per job, its status (running, stalled, done, failed), counters, elapsed time and event rate
+	-- totals    : the counters summed over all the jobs
+	-- stragglers: the running jobs which are stalled (no record for stalledIntervals intervals),
+	               or slower than slowFraction times the median rate of the jobs
+	-- sites     : per site, the number of files, mean latency, and read rate (bytes/s)
+	'''
+
+	now = now or time.time()
+
+	paths = sorted(glob.glob(os.path.join(metricsDir, '*.jsonl'))) if paths is None else paths
+
+	jobs, totals, sites = OrderedDict(), OrderedDict(), OrderedDict()
+
+	for path in paths:
+
+		records = readMetrics(path)
+
+		if not records: continue
+
+		start, last = records[0], records[-1]
+
+		#Counters of the last progress (or end) record
+
+		counters = {}
+
+		for record in records:
+
+			if 'counters' in record: counters = record['counters']
+
+		files = [record for record in records if record['type'] == 'file']
+
+		if last['type'] == 'end':
+
+			status = last['status']
+
+		elif now - last['time'] > stalledIntervals * start.get('interval', 30.):
+
+			status = 'stalled'
+
+		else:
+
+			status = 'running'
+
+		elapsed = (last['time'] if status != 'running' else now) - start['time']
+
+		jobs[start['job']] = {'status' : status, 'host' : start.get('host'), 'counters' : counters, 'elapsed' : elapsed,
+							  'rate' : counters.get('eventsRead', 0) / max(elapsed, 1e-9), 'lastUpdate' : now - last['time'], 'path' : path}
+
+		for name, value in counters.items():
+
+			totals[name] = totals.get(name, 0) + value
+
+		for record in files:
+
+			site = sites.setdefault(record['site'], {'files' : 0, 'latency' : 0., 'bytesRead' : 0, 'duration' : 0.})
+
+			site['files'] += 1
+			site['latency'] += record['latency'] or 0.
+			site['bytesRead'] += record['bytesRead']
+			site['duration'] += record['duration']
+
+	for site in sites.values():
+
+		site['latency'] /= site['files']
+		site['rate'] = site['bytesRead'] / max(site['duration'], 1e-9)
+
+	rates = sorted(job['rate'] for job in jobs.values())
+
+	medianRate = rates[len(rates)//2] if rates else 0.
+
+	stragglers = [name for name, job in jobs.items() if job['status'] == 'stalled' or (job['status'] == 'running' and job['rate'] < slowFraction * medianRate)]
+
+	return {'jobs' : jobs, 'totals' : totals, 'stragglers' : stragglers, 'sites' : sites, 'medianRate' : medianRate}
+
+def printMetricsSummary(summary):
+
+	jobs = summary['jobs']
+
+	statuses = OrderedDict()
+
+	for job in jobs.values():
+
+		statuses[job['status']] = statuses.get(job['status'], 0) + 1
+
+	print('INFO: {} jobs: {}'.format(len(jobs), ', '.join('{} {}'.format(count, status) for status, count in statuses.items())))
+	print('INFO: Median rate: {:.1f} events/s'.format(summary['medianRate']))
+
+	print('INFO: Totals:')
+
+	for name, value in summary['totals'].items():
+
+		print('  {:<30}: {}'.format(name, value))
+
+	if summary['stragglers']:
+
+		print('WARNING: Stragglers:')
+
+		for name in summary['stragglers']:
+
+			job = jobs[name]
+
+			print('  {:<40} {:<8} on {}: {:.1f} events/s, last update {:.0f} s ago'.format(name, job['status'], job['host'], job['rate'], job['lastUpdate']))
+
+	print('INFO: Sites:')
+
+	for name, site in sorted(summary['sites'].items(), key=lambda item: item[1]['rate']):
+
+		print('  {:<40}: {:>5} files, latency {:.1f} s, {:.2f} MB/s'.format(name, site['files'], site['latency'], site['rate'] / 1e6))
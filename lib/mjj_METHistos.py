@@ -2,13 +2,31 @@ import ROOT
 import numpy as np
 import os
 
+from lib.dataset import datasetName
+from lib.outputStore import getOutputStore
+from lib.plotting import submitPlot
+from lib.entryLists import onlyEntries
+from lib.gainMaps import GainMaps, fillGainMaps
+from lib.cuts import vbfTopology, leadingJetPtAbove, trailingJetPtAbove, triggerFired, triggerFailed
+
+# Style of the 2D histograms: no stat box, numbers printed on bins
+
+plotStyle = {'size' : (800, 600), 'optStat' : 0, 'paintTextFormat' : '.2g'}
+
+# Binning of the 2D histograms, the VBF trigger gain maps have twice larger mjj bins
+
+mjj_array = np.arange(500., 5000., 450.)
+met_array = np.arange(50., 300., 20.)
+
+mjj_array_gain = mjj_array[::2]
+
 def fillAndSave_MjjMETHisto(tree, allCuts, scaleFactor, fileName, histoName=None, saveToROOTFile=False):
 
 	'''
 	Used by other draw2DHisto functions to fill, draw and save the 2D histogram,
 	given all the cuts applied and the eventTree.
 
-	allCuts must be a string containing all the cuts applied.
+	allCuts must contain all the cuts applied.
 
 	File name must be provided to save the png file.
 
@@ -16,7 +34,7 @@ def fillAndSave_MjjMETHisto(tree, allCuts, scaleFactor, fileName, histoName=None
 
 	===ARGUMENTS===
 	--- tree           : The eventTree in the ROOT file.
-	--- allCuts        : A string containing all the cuts applied, including trigger cuts.
+	--- allCuts        : All the cuts applied, including trigger cuts, as a string or a Cut (see lib/cuts.py).
 	--- scaleFactor    : The scale factor for the histogram.
 						 If histogram is not to be scaled, scaleFactor=None can be passed into the function.
 	--- fileName       : Name of the png file to be saved.
@@ -26,43 +44,22 @@ def fillAndSave_MjjMETHisto(tree, allCuts, scaleFactor, fileName, histoName=None
 
 	Returns the filled histogram.
 	''' 
-	# No stat box in the histogram
-	
-	ROOT.gStyle.SetOptStat(0)
-	
-	# Plot with numbers printed on bins
-
-	ROOT.gStyle.SetPaintTextFormat('.2g')
-
-	mjj_array = np.arange(500., 5000., 450.)
-	met_array = np.arange(50., 300., 20.)
-	
-	if saveToROOTFile:
-
-		if not 'out1.root' in os.listdir('.'):
-
-			out = ROOT.TFile('out1.root', 'RECREATE')
-
-		else:
-
-			out = ROOT.TFile('out1.root', 'UPDATE')
-
 	# Get whether the histogram is for events passing VBF trigger
 	# or MET trigger.
 
 	histoType = fileName.split('_')[-1]
 
-	if histoName:
-	
-		histo = ROOT.TH2F(histoName, histoName, len(met_array)-1, met_array, len(mjj_array)-1, mjj_array)	
+	if not histoName:
 
-		tree.Draw('mjj:met>>{}'.format(histoName), allCuts, '')
+		histoName = 'histo'
+	
+	histo = ROOT.TH2F(histoName, histoName, len(met_array)-1, met_array, len(mjj_array)-1, mjj_array)	
 
-	else:
+	# Only the entries passing the cuts are read, see lib/entryLists.py
 
-		histo = ROOT.TH2F('histo', 'histo', len(met_array)-1, met_array, len(mjj_array)-1, mjj_array)
+	with onlyEntries(tree, allCuts):
 
-		tree.Draw('mjj:met>>histo', allCuts, '')
+		tree.Draw('mjj:met>>{}'.format(histoName), str(allCuts), '')
 	
 	if 'passingOnlyVBF' in histoType:
 		histo.SetTitle('Events Passing VBF Trigger & Failing MET Trigger')
@@ -86,28 +83,23 @@ def fillAndSave_MjjMETHisto(tree, allCuts, scaleFactor, fileName, histoName=None
 		print('INFO: Scaling the 2D histogram by {}'.format(scaleFactor))
 		histo.Scale(scaleFactor)
 
-	# Get the relevant dir, create one if neccessary
+	# Get the relevant dir
 
 	pngDir = 'pngImages/mjj_MET2DPlots'
 
-	if not os.path.isdir(pngDir): os.makedirs(pngDir)
-
 	file_path = os.path.join(pngDir, fileName)
 
-	# Define the canvas and print the histogram
+	# Submit the histogram to be printed in the background, see lib/plotting.py
 
-	canv = ROOT.TCanvas('canv', 'canv', 800, 600)
+	submitPlot(file_path, [(histo, 'COLZ,TEXT')], **plotStyle)
 
-	histo.Draw('COLZ,TEXT')
-	
-	canv.Print(file_path)
+	# The histogram is written into out1.root at the end of the job, see lib/outputStore.py
 
 	if saveToROOTFile:
 	
-		out.Write()
+		getOutputStore().file('out1.root').put(histo, histoName)
 
 	# Seperate the histogram from the current working directory
-	# i.e. the ROOT file
 
 	histo.SetDirectory(0)
 
@@ -115,8 +107,6 @@ def fillAndSave_MjjMETHisto(tree, allCuts, scaleFactor, fileName, histoName=None
 	print('INFO: {} saved'.format(file_path))
 	print('*'*20 + '\n')
 
-	#out.Close()
-
 	return histo
 
 def draw2DHistoForEventsAcceptedOnlyByVBFTrigger(dataFile, vbfTrigger, metTrigger, cuts, scaleFactor, saveToROOTFile=False):
@@ -132,7 +122,7 @@ def draw2DHistoForEventsAcceptedOnlyByVBFTrigger(dataFile, vbfTrigger, metTrigge
 	y-axis: mjj
 
 	===ARGUMENTS===
-	--- dataFile       : The input ROOT file containing the eventTree
+	--- dataFile       : The input ROOT file containing the eventTree, or a manifest listing several such files (see lib/dataset.py)
 	--- vbfTrigger     : VBF trigger in consideration 
 	--- metTrigger     : MET trigger in consideration
 	--- cuts           : A list or tuple containing leading jet pt and trailing jet pt cuts: (leadJetPt, trailingJetPt)
@@ -151,16 +141,15 @@ def draw2DHistoForEventsAcceptedOnlyByVBFTrigger(dataFile, vbfTrigger, metTrigge
 
 	leadJetPtCut, trailJetPtCut = cuts[0], cuts[1]
 
-	allCuts = 'minPhi_jetMET > 0.5 && jet_eta[0]*jet_eta[1]<0 && absEtaDiff_leadingTwoJets > 2.5 && jet_pt[0] > ' + str(leadJetPtCut) + ' && jet_pt[1] > ' + str(trailJetPtCut) 
+	allCuts = vbfTopology & leadingJetPtAbove(leadJetPtCut) & trailingJetPtAbove(trailJetPtCut)
 	
 	# Append the trigger business
 
-	allCuts += ' && {0} == 0 && {1} == 1 '.format(metTrigger, vbfTrigger)
+	allCuts = allCuts & triggerFailed(metTrigger) & triggerFired(vbfTrigger)
 
-	f = ROOT.TFile(dataFile)
-	tree = f.eventTree
+	tree = getOutputStore().eventTree(dataFile)
 
-	fileName = dataFile.replace('.root', '')
+	fileName = datasetName(dataFile)
 
 	if 'inputs' in fileName:
 	
@@ -182,7 +171,6 @@ def draw2DHistoForEventsAcceptedOnlyByVBFTrigger(dataFile, vbfTrigger, metTrigge
 
 	filledHisto.SetDirectory(0)
 
-	f.Close()
 	
 	return filledHisto
 
@@ -198,7 +186,7 @@ def draw2DHistoForEventsAcceptedByMETTrigger(dataFile, metTrigger, cuts, scaleFa
 	y-axis: mjj
 
 	===ARGUMENTS===
-	--- dataFile       : Input ROOT file containing eventTree.
+	--- dataFile       : Input ROOT file containing eventTree, or a manifest listing several such files (see lib/dataset.py).
 	--- metTrigger     : MET trigger in consideration.
 	--- cuts   	       : A list or tuple containing leading jet pt and trailing jet pt cuts: (leadJetPt, trailJetPt)
 	--- scaleFactor    : The scale factor for the histogram.
@@ -219,16 +207,15 @@ def draw2DHistoForEventsAcceptedByMETTrigger(dataFile, metTrigger, cuts, scaleFa
 
 	leadJetPtCut, trailJetPtCut = cuts[0], cuts[1]
 
-	allCuts = 'minPhi_jetMET > 0.5 && jet_eta[0]*jet_eta[1]<0 && absEtaDiff_leadingTwoJets > 2.5 && jet_pt[0] > ' + str(leadJetPtCut) + ' && jet_pt[1] > ' + str(trailJetPtCut) 
+	allCuts = vbfTopology & leadingJetPtAbove(leadJetPtCut) & trailingJetPtAbove(trailJetPtCut)
 	
 	# Append the trigger business
 
-	allCuts += ' && {} == 1'.format(metTrigger)
+	allCuts = allCuts & triggerFired(metTrigger)
 	
-	f = ROOT.TFile(dataFile)
-	tree = f.eventTree
+	tree = getOutputStore().eventTree(dataFile)
 	
-	fileName = dataFile.replace('.root', '')
+	fileName = datasetName(dataFile)
 	
 	if 'inputs' in fileName:
 	
@@ -250,39 +237,36 @@ def draw2DHistoForEventsAcceptedByMETTrigger(dataFile, metTrigger, cuts, scaleFa
 
 	filledHisto.SetDirectory(0)
 
-	f.Close()
 	
 	return filledHisto
 
-def draw2DHistoForPercentageVBFTriggerGain(dataFile, vbfTrigger, metTrigger, cuts, saveToROOTFile=False):
+def datasetPrefix(dataFile):
 
 	'''
-	Plots a 2D histogram containing the ratio of the following as a function of mjj and MET:
-	-- Number of events that pass the given VBF trigger but not the given MET trigger
-	-- Number of events that pass the given MET trigger
-	
-	===ARGUMENTS===
-	--- dataFile       : Input ROOT file containing eventTree.
-	--- vbfTrigger     : VBF trigger in consideration.
-	--- metTrigger     : MET trigger in consideration.
-	--- cuts   	       : A list or tuple containing leading jet pt and trailing jet pt cuts: (leadJetPt, trailJetPt)
-	--- saveToROOTFile : If True, the histogram will be saved into a ROOT file. By default, this option is False.
+	Returns the dataset name used as the prefix of the png file names.
+	'''
 
-	Saves the 2D histogram in the relevant directory.
+	fileName = datasetName(dataFile)
 
-	Doesn't return anything.
-	'''
-	# No stat box in thee histogram
+	if 'inputs' in fileName:
 
-	ROOT.gStyle.SetOptStat(0)
-	
-	# Plot with numbers printed on bins
+		fileName = fileName.split('/')[-1]
 
-	ROOT.gStyle.SetPaintTextFormat('.2g')
-	
-	# Don't scale any histogram
+	return fileName
 
-	scaleFactor = None
+def makeGainMaps(dataFile, vbfTrigger, metTrigger, cuts):
+
+	'''
+	Reads the events passing the VBF selections once, and returns two GainMaps (see lib/gainMaps.py):
+	-- With the binning of the 2D histograms (mjjBins)
+	-- With twice larger mjj bins (mjjBins_gain), used for the VBF trigger gain maps
+
+	===ARGUMENTS===
+	--- dataFile       : Input ROOT file containing eventTree, or a manifest listing several such files (see lib/dataset.py).
+	--- vbfTrigger     : VBF trigger in consideration.
+	--- metTrigger     : MET trigger in consideration, None if only the VBF trigger is studied.
+	--- cuts   	       : A list or tuple containing leading jet pt and trailing jet pt cuts: (leadJetPt, trailJetPt)
+	'''
 
 	if len(cuts) != 2: raise ValueError('Number of cuts should be exactly 2!')
 
@@ -290,47 +274,88 @@ def draw2DHistoForPercentageVBFTriggerGain(dataFile, vbfTrigger, metTrigger, cut
 
 	leadJetPtCut, trailJetPtCut = cuts[0], cuts[1]
 
-	histo_eventsPassingMETTrigger = draw2DHistoForEventsAcceptedByMETTrigger(dataFile, metTrigger, cuts, scaleFactor, saveToROOTFile)
+	mainCuts = vbfTopology & leadingJetPtAbove(leadJetPtCut) & trailingJetPtAbove(trailJetPtCut)
 
-	histo_eventsPassingVBFTrigger_failingMETTrrigger = draw2DHistoForEventsAcceptedOnlyByVBFTrigger(dataFile, vbfTrigger, metTrigger, cuts, scaleFactor, saveToROOTFile)
+	tree = getOutputStore().eventTree(dataFile)
 
-	# Divide the two histograms
+	gainMaps = GainMaps(met_array, mjj_array), GainMaps(met_array, mjj_array_gain)
 
-	histo_eventsPassingVBFTrigger_failingMETTrrigger.Divide(histo_eventsPassingMETTrigger)
+	fillGainMaps(tree, gainMaps, vbfTrigger, metTrigger, mainCuts)
 
-	pngDir = 'pngImages/mjj_MET2DPlots'
+	return gainMaps
 
-	if not os.path.isdir(pngDir): os.makedirs(pngDir)
+def saveMap(histo, fileName, drawOption='COLZ,TEXT'):
 
-	fileName = dataFile.replace('.root', '')
-	
-	if 'inputs' in fileName:
+	'''
+	Submits the given 2D histogram to be printed in pngImages/mjj_MET2DPlots in the background (see lib/plotting.py).
+	'''
+
+	file_path = os.path.join('pngImages/mjj_MET2DPlots', fileName)
+
+	submitPlot(file_path, [(histo, drawOption)], **plotStyle)
+
+	print('*'*20)
+	print('INFO: {} saved'.format(file_path))
+	print('*'*20 + '\n')
+
+def draw2DHistoForPercentageVBFTriggerGain(dataFile, vbfTrigger, metTrigger, cuts, saveToROOTFile=False, scaleFactor=None, gainMaps=None):
+
+	'''
+	Plots a 2D histogram containing the ratio of the following as a function of mjj and MET:
+	-- Number of events that pass the given VBF trigger but not the given MET trigger
+	-- Number of events that pass the given MET trigger
+	The two numbers are also plotted, as in draw2DHistoForEventsAcceptedOnlyByVBFTrigger and draw2DHistoForEventsAcceptedByMETTrigger.
+	All the maps are filled from a single read of the tree, the errors of the ratio are given by GainMaps.ratio (see lib/gainMaps.py).
 	
-		fileName = fileName.split('/')[-1]		
+	===ARGUMENTS===
+	--- dataFile       : Input ROOT file containing eventTree, or a manifest listing several such files (see lib/dataset.py).
+	--- vbfTrigger     : VBF trigger in consideration.
+	--- metTrigger     : MET trigger in consideration.
+	--- cuts   	       : A list or tuple containing leading jet pt and trailing jet pt cuts: (leadJetPt, trailJetPt)
+	--- saveToROOTFile : If True, the two numbers will be saved into a ROOT file. By default, this option is False.
+	--- scaleFactor    : The scale factor for the two numbers, the ratio is not affected. By default, they are not scaled.
+	--- gainMaps       : GainMaps returned by makeGainMaps, filled with both triggers. If None, the tree is read here.
 
-	fileName += '_mjj_METHisto_ratioHist.png'
+	Saves the 2D histograms in the relevant directory.
 
-	#fileName = 'mjj_METHisto_RatioHist_leadJetPtCut{0}_trailJetPtCut{1}.png'.format(leadJetPtCut, trailJetPtCut)
+	Returns the ratio histogram.
+	'''
 
-	file_path = os.path.join(pngDir, fileName)
+	if gainMaps is None:
 
-	# Define the canvas and print the histogram
+		gainMaps = makeGainMaps(dataFile, vbfTrigger, metTrigger, cuts)
 
-	canv = ROOT.TCanvas('canv', 'canv', 800, 600)
+	maps, maps_gain = gainMaps
 
-	histo_eventsPassingVBFTrigger_failingMETTrrigger.Draw('COLZ,TEXT,E')
-	
-	canv.Print(file_path)
+	fileName = datasetPrefix(dataFile)
 
-	print('*'*20)
-	print('INFO: {} saved'.format(file_path))
-	print('*'*20 + '\n')
+	# The two numbers: the png files with the binning of the 2D histograms,
+	# the ROOT file with twice larger mjj bins, as the ratio
+
+	for category, histoName, title, suffix in [('onlyVBF', 'EventsAcc_OnlyByVBFTrigger', 'Events Passing VBF Trigger & Failing MET Trigger', 'passingOnlyVBF'),
+											   ('met', 'EventsAcc_ByMETTrigger', 'Events Passing MET Trigger', 'passingMET')]:
+
+		if scaleFactor: print('INFO: Scaling the 2D histogram by {}'.format(scaleFactor))
+
+		saveMap(maps.counts(category, histoName, title, scaleFactor), fileName + '_mjj_METHisto_{}.png'.format(suffix))
+
+		if saveToROOTFile:
+
+			getOutputStore().file('out1.root').put(maps_gain.counts(category, histoName, title, scaleFactor), histoName)
+
+	# The ratio, with its errors on the bins
 
-def draw2DHisto_PercentageOfEventsPassingVBFTrigger(dataFile, vbfTrigger, cuts):
+	ratio = maps_gain.ratio('onlyVBF', 'met', 'VBFTriggerGain', 'Events Passing Only VBF Trigger / Events Passing MET Trigger')
+
+	saveMap(ratio, fileName + '_mjj_METHisto_ratioHist.png', 'COLZ,TEXT,E')
+
+	return ratio
+
+def draw2DHisto_PercentageOfEventsPassingVBFTrigger(dataFile, vbfTrigger, cuts, gainMaps=None):
 
 	'''
 	Fills, draws and saves a 2D histogram containing the ratio of number of events passing the VBF trigger,
-	as a function of mjj and MET.
+	as a function of mjj and MET, with the binomial errors on the bins (see lib/gainMaps.py).
 	
 	Saves the histogram as a .png file in the relevant directory.
 	
@@ -338,73 +363,55 @@ def draw2DHisto_PercentageOfEventsPassingVBFTrigger(dataFile, vbfTrigger, cuts):
 	---inputFile: The ROOT file containing the eventTree.
 	---vbfTrigger: VBF trigger in consideration.
 	---cuts: A tuple or list of length 2, containing leading jet pt and trailing jet pt cuts: (leadJetPt, trailJetPt)
-	''' 
-	if len(cuts) != 2: raise ValueError('Number of cuts should be exactly 2!')
-
-	if not (isinstance(cuts, list) or isinstance(cuts, tuple)): raise TypeError('cuts must be provided as a list or tuple!')
+	---gainMaps: GainMaps returned by makeGainMaps for the same VBF trigger. If None, the tree is read here.
 
-	# Proceed if no problem
-
-	# No stat box in thee histogram
-
-	ROOT.gStyle.SetOptStat(0)
-	
-	# Plot with numbers printed on bins
-
-	ROOT.gStyle.SetPaintTextFormat('.2g')
+	Returns the ratio histogram.
+	''' 
+	if gainMaps is None:
 
-	# Don't scale any histogram
+		gainMaps = makeGainMaps(dataFile, vbfTrigger, None, cuts)
 
-	scaleFactor = None
+	maps = gainMaps[0]
 
 	leadJetPtCut, trailJetPtCut = cuts[0], cuts[1]
-	
-	mainCuts = 'minPhi_jetMET > 0.5 && jet_eta[0]*jet_eta[1]<0 && absEtaDiff_leadingTwoJets > 2.5 && jet_pt[0] > ' + str(leadJetPtCut) + ' && jet_pt[1] > ' + str(trailJetPtCut) 
-	
-	# Append the trigger business
-
-	allCuts = mainCuts + ' && {} == 1'.format(vbfTrigger)
-	
-	f = ROOT.TFile(dataFile)
-	tree = f.eventTree
 
 	fileName_withVBFTrigger = 'mjj_METHisto_leadJetPtCut{0}_trailJetPtCut{1}_numEventsPassingVBFTrigger.png'.format(leadJetPtCut, trailJetPtCut)
 
 	fileName_allEvents = 'mjj_METHisto_RatioHist_leadJetPtCut{0}_trailJetPtCut{1}_numEventsWithoutVBFTrigger.png'.format(leadJetPtCut, trailJetPtCut)
 	
-	# Get the two histograms
+	# The two numbers
 
-	hist = fillAndSave_MjjMETHisto(tree, allCuts, scaleFactor, fileName_withVBFTrigger)
+	saveMap(maps.counts('vbf', 'EventsPassingVBF', 'Events Passing VBF Trigger'), fileName_withVBFTrigger)
 
-	hist_allEvents = fillAndSave_MjjMETHisto(tree, mainCuts, scaleFactor, fileName_allEvents)
+	saveMap(maps.counts('all', 'EventsWithoutVBF', 'Events Passing VBF Selections (No Trigger Req)'), fileName_allEvents)
 
-	# Divide the two histograms
-	
-	hist.Divide(hist_allEvents)
-
-	# Save the ratio histogram
+	# The ratio, with its errors on the bins
 
-	pngDir = 'pngImages/mjj_MET2DPlots'
-
-	if not os.path.isdir(pngDir): os.makedirs(pngDir)
+	ratio = maps.ratio('vbf', 'all', 'VBFTriggerEff', 'Events Passing VBF Trigger / Events Passing VBF Selections')
 
 	fileName = 'mjj_METHisto_RatioEventsPassingVBFTrig_leadJetPtCut{0}_trailJetPtCut{1}.png'.format(leadJetPtCut, trailJetPtCut)
 
-	file_path = os.path.join(pngDir, fileName)
-
-	# Define the canvas and print the histogram
+	saveMap(ratio, fileName, 'COLZ,TEXT,E')
 
-	canv = ROOT.TCanvas('canv', 'canv', 800, 600)
+	return ratio
 
-	hist.Draw('COLZ,TEXT')
-	
-	canv.Print(file_path)
+def draw2DGainMaps(dataFile, vbfTrigger, metTrigger, cuts, scaleFactor=None, saveToROOTFile=False):
 
-	print('*'*20)
-	print('INFO: {} saved'.format(file_path))
-	print('*'*20 + '\n')
-	
+	'''
+	Draws all the 2D histograms of draw2DHistoForPercentageVBFTriggerGain and draw2DHisto_PercentageOfEventsPassingVBFTrigger,
+	reading the tree only once.
 
+	===ARGUMENTS===
+	--- dataFile       : Input ROOT file containing eventTree, or a manifest listing several such files (see lib/dataset.py).
+	--- vbfTrigger     : VBF trigger in consideration.
+	--- metTrigger     : MET trigger in consideration.
+	--- cuts   	       : A list or tuple containing leading jet pt and trailing jet pt cuts: (leadJetPt, trailJetPt)
+	--- scaleFactor    : The scale factor for the numbers of events passing the triggers. By default, they are not scaled.
+	--- saveToROOTFile : If True, the numbers of events passing the triggers will be saved into a ROOT file. By default, this option is False.
+	'''
 
+	gainMaps = makeGainMaps(dataFile, vbfTrigger, metTrigger, cuts)
 
+	draw2DHistoForPercentageVBFTriggerGain(dataFile, vbfTrigger, metTrigger, cuts, saveToROOTFile, scaleFactor, gainMaps)
 
+	draw2DHisto_PercentageOfEventsPassingVBFTrigger(dataFile, vbfTrigger, cuts, gainMaps)
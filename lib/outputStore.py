@@ -0,0 +1,172 @@
+import ROOT
+import atexit
+from collections import OrderedDict
+
+from lib.dataset import openEventTree
+from lib.compaction import compactFiles
+
+#####################################
+# Shared store for the inputs and outputs of the reading functions
+# -- Each input (ROOT file or manifest) is opened read-only once, and the event tree is shared by all the functions.
+# -- Objects to be saved are collected per output file and written at the end with flushOutputs(),
+#    opening each output file once. Objects already in the file with the same name are overwritten,
+#    so running the functions again does not pile up new key cycles.
+#####################################
+
+class OutputFile(object):
+
+	'''
+	The objects to be written into one output ROOT file.
+
+	ARGUMENTS:
+	---path: Path of the ROOT file.
+	---recreate: If True, the file is recreated at the next flush, otherwise it is updated.
+	'''
+
+	def __init__(self, path, recreate=False):
+
+		self.path = path
+		self.recreate = recreate
+
+		self.objects = OrderedDict()
+
+	def put(self, obj, name, folder=''):
+
+		'''
+		Schedules obj to be written as folder/name.
+		Histograms are detached from the current directory, so that they stay alive until they are written.
+		If an object with the same name and folder was put before, it is replaced.
+		'''
+
+		if hasattr(obj, 'SetDirectory'):
+
+			obj.SetDirectory(0)
+
+		self.objects[(folder, name)] = obj
+
+	def flush(self):
+
+		'''
+		Writes all the scheduled objects, opening the file once.
+		'''
+
+		if not self.objects: return 0
+
+		f = ROOT.TFile.Open(self.path, 'RECREATE' if self.recreate else 'UPDATE')
+
+		for (folder, name), obj in self.objects.items():
+
+			directory = f
+
+			if folder:
+
+				directory = f.GetDirectory(folder)
+
+				if not directory:
+
+					directory = f.mkdir(folder, folder)
+
+			directory.WriteTObject(obj, name, 'Overwrite')
+
+		f.Close()
+
+		numObjects = len(self.objects)
+
+		self.objects = OrderedDict()
+		self.recreate = False
+
+		return numObjects
+
+class OutputStore(object):
+
+	'''
+	Holds the input trees and the output files of a job.
+	'''
+
+	def __init__(self):
+
+		self.inputs = {}
+		self.outputs = OrderedDict()
+
+	def eventTree(self, inputFile):
+
+		'''
+		Returns the event tree of the given input (see lib/dataset.py), opening it only the first time.
+		'''
+
+		if inputFile not in self.inputs:
+
+			self.inputs[inputFile] = openEventTree(inputFile)
+
+		return self.inputs[inputFile]
+
+	def file(self, path, recreate=False):
+
+		'''
+		Returns the OutputFile for the given path.
+		If recreate is True, the existing file is replaced at the next flush.
+		'''
+
+		if path not in self.outputs:
+
+			self.outputs[path] = OutputFile(path)
+
+		if recreate:
+
+			self.outputs[path].recreate = True
+
+		return self.outputs[path]
+
+	def flush(self):
+
+		'''
+		Writes the scheduled objects of all the output files.
+		Returns the paths of the files written.
+		'''
+
+		written = []
+
+		for path, output in self.outputs.items():
+
+			numObjects = output.flush()
+
+			if numObjects:
+
+				print('INFO: {} objects written to {}'.format(numObjects, path))
+
+				written.append(path)
+
+		return written
+
+_store = None
+
+def getOutputStore():
+
+	'''
+	Returns the store shared by all the reading functions.
+	'''
+
+	global _store
+
+	if _store is None:
+
+		_store = OutputStore()
+
+		atexit.register(_store.flush)
+
+	return _store
+
+def flushOutputs(compact=False):
+
+	'''
+	Writes the objects scheduled in the shared store.
+	If compact is True, the files written are compacted afterwards (see lib/compaction.py).
+	'''
+
+	if _store is None: return
+
+	written = _store.flush()
+
+	if compact:
+
+		compactFiles(written)
@@ -0,0 +1,299 @@
+import ROOT
+import os
+import json
+import atexit
+import pickle
+import hashlib
+import multiprocessing
+
+#####################################
+# Batch plotting
+# Analysis functions submit the finished histograms/efficiencies of a plot with submitPlot and return immediately.
+# The plots are rendered to png files in a pool of worker processes running ROOT in batch mode.
+# A snapshot of the objects is taken at submission, so they can be modified or deleted afterwards.
+# A plot is not rendered again if the png file exists and its inputs (objects and drawing options) have not changed,
+# the hashes of the inputs are kept in .plotHashes.json.
+# All submitted plots are guaranteed to be rendered after flushPlots() is called (also called at exit).
+# The gStyle settings of the submitting process (e.g. gStyle.SetOptStat(0)) are taken with the snapshot,
+# so a plot looks the same whichever worker renders it, and the per-plot options do not leak into the next plots.
+#####################################
+
+hashFile = '.plotHashes.json'
+
+#gStyle settings sent with each plot, as (getter, setter)
+
+styleSettings = {
+	'optStat'         : ('GetOptStat', 'SetOptStat'),
+	'optTitle'        : ('GetOptTitle', 'SetOptTitle'),
+	'optFit'          : ('GetOptFit', 'SetOptFit'),
+	'paintTextFormat' : ('GetPaintTextFormat', 'SetPaintTextFormat'),
+}
+
+def _getStyle():
+
+	return dict((name, getattr(ROOT.gStyle, getter)()) for name, (getter, setter) in styleSettings.items())
+
+def _setStyle(style):
+
+	for name, value in style.items():
+
+		getattr(ROOT.gStyle, styleSettings[name][1])(value)
+
+def _initWorker():
+
+	ROOT.gROOT.SetBatch(True)
+	ROOT.TH1.AddDirectory(False)
+
+def _render(filePath, payload):
+
+	'''
+	Draws the given objects on a canvas and saves it into filePath.
+	Runs in a worker process.
+	'''
+
+	items, options = pickle.loads(payload)
+
+	#The style of the submitting process, with the options of the plot; the previous style is restored afterwards
+
+	previousStyle = _getStyle()
+
+	_setStyle(options['style'])
+
+	try:
+
+		return _draw(filePath, items, options)
+
+	finally:
+
+		_setStyle(previousStyle)
+
+def _draw(filePath, items, options):
+
+	width, height = options.get('size', (700, 500))
+
+	canv = ROOT.TCanvas('canv', 'canv', width, height)
+
+	if options.get('grid'): canv.SetGrid()
+	if options.get('logy'): canv.SetLogy(1)
+	if options.get('logz'): canv.SetLogz(1)
+
+	for obj, drawOption in items:
+
+		obj.Draw(drawOption)
+
+	yRange = options.get('yRange')
+
+	if yRange is not None:
+
+		first = items[0][0]
+
+		if isinstance(first, ROOT.TEfficiency):
+
+			ROOT.gPad.Update()
+			first = first.GetPaintedGraph()
+
+		first.SetMinimum(yRange[0])
+		first.SetMaximum(yRange[1])
+
+	legendOptions = options.get('legend')
+
+	if legendOptions:
+
+		legend = ROOT.TLegend(*legendOptions['position'])
+		legend.SetBorderSize(legendOptions.get('borderSize', 0))
+
+		for idx, label, entryOption in legendOptions['entries']:
+
+			legend.AddEntry(items[idx][0], label, entryOption)
+
+		legend.Draw('same')
+
+	plotDir = os.path.dirname(filePath)
+
+	if plotDir and not os.path.isdir(plotDir):
+
+		try: os.makedirs(plotDir)
+
+		except OSError: pass #Created by another worker in the meantime
+
+	canv.Print(filePath)
+
+	return filePath
+
+class PlotRenderer(object):
+
+	'''
+	Renders the submitted plots in a pool of worker processes.
+
+	ARGUMENTS:
+	---numWorkers: Number of worker processes. By default, one per core.
+				   If 0, the plots are rendered in the current process when flushed.
+	'''
+
+	def __init__(self, numWorkers=None):
+
+		self.numWorkers = multiprocessing.cpu_count() if numWorkers is None else numWorkers
+
+		self.pool = None
+		self.pending = []
+
+		self.numRendered = 0
+		self.numSkipped = 0
+
+		self.hashes = {}
+
+		if os.path.exists(hashFile):
+
+			with open(hashFile, 'r') as f:
+
+				self.hashes = json.load(f)
+
+	def submit(self, filePath, items, **options):
+
+		'''
+		Submits a plot to be rendered into filePath.
+		Returns False if the plot is up to date and will not be rendered again, True otherwise.
+
+		ARGUMENTS:
+		---filePath: Path of the png file. The directory is created if needed.
+		---items: List of (object, draw option) tuples, drawn in the given order.
+		---options: Canvas and style options:
+					size=(width, height), grid, logy, logz,
+					optStat, optTitle, optFit, paintTextFormat (by default, the gStyle settings of this process at submission),
+					yRange=(min, max) for the first object,
+					legend={'position' : (x1, y1, x2, y2), 'entries' : [(object, label, option), ...]}
+		'''
+
+		#gStyle settings of this process at submission, overridden by the options of the plot
+
+		style = _getStyle()
+
+		for name in styleSettings:
+
+			if options.get(name) is not None:
+
+				style[name] = options.pop(name)
+
+		options['style'] = style
+
+		legendOptions = options.get('legend')
+
+		if legendOptions:
+
+			#Legend entries refer to the objects by their position in items,
+			#since the objects are copied while being sent to the workers
+
+			objects = [obj for obj, drawOption in items]
+
+			entries = []
+
+			for obj, label, entryOption in legendOptions['entries']:
+
+				idx = [k for k, other in enumerate(objects) if other is obj][0]
+
+				entries.append((idx, label, entryOption))
+
+			options['legend'] = dict(legendOptions, entries=entries)
+
+		payload = pickle.dumps((list(items), options), 2)
+
+		digest = hashlib.sha1(payload).hexdigest()
+
+		if os.path.exists(filePath) and self.hashes.get(filePath) == digest:
+
+			self.numSkipped += 1
+
+			return False
+
+		if self.numWorkers > 0:
+
+			if self.pool is None:
+
+				self.pool = multiprocessing.Pool(self.numWorkers, initializer=_initWorker)
+
+			result = self.pool.apply_async(_render, (filePath, payload))
+
+		else:
+
+			result = None
+
+		self.pending.append((filePath, digest, payload, result))
+
+		return True
+
+	def flush(self):
+
+		'''
+		Waits until all the submitted plots are rendered.
+		'''
+
+		if not self.pending: return
+
+		for filePath, digest, payload, result in self.pending:
+
+			if result is None:
+
+				_initWorker()
+				_render(filePath, payload)
+
+			else:
+
+				result.get()
+
+			self.hashes[filePath] = digest
+			self.numRendered += 1
+
+		self.pending = []
+
+		with open(hashFile, 'w') as f:
+
+			json.dump(self.hashes, f, indent=1, sort_keys=True)
+
+		print('INFO: {} plots rendered, {} plots up to date'.format(self.numRendered, self.numSkipped))
+
+	def close(self):
+
+		self.flush()
+
+		if self.pool is not None:
+
+			self.pool.close()
+			self.pool.join()
+
+			self.pool = None
+
+_renderer = None
+
+def getRenderer():
+
+	'''
+	Returns the renderer shared by all the plotting functions.
+	'''
+
+	global _renderer
+
+	if _renderer is None:
+
+		_renderer = PlotRenderer()
+
+		atexit.register(_renderer.close)
+
+	return _renderer
+
+def submitPlot(filePath, items, **options):
+
+	'''
+	Submits a plot to the shared renderer, see PlotRenderer.submit.
+	'''
+
+	return getRenderer().submit(filePath, items, **options)
+
+def flushPlots():
+
+	'''
+	Waits until all the plots submitted to the shared renderer are rendered.
+	'''
+
+	if _renderer is not None:
+
+		_renderer.flush()
@@ -0,0 +1,254 @@
+import ROOT
+import os
+import time
+
+from lib.metrics import siteOf
+
+#####################################
+# Access to the remote input files
+# The MiniAOD files are read through xrootd redirectors, where transient failures used to kill the job.
+# InputAccess opens a file from the first source which works, in this order:
+# -- a local replica of the file (same /store/... path under one of the replica directories)
+# -- the redirectors of the era configuration, the primary one first and then the alternates
+# Each round over the sources is retried with an increasing wait, and a redirector which failed
+# is tried last for the next files of the job. The sources may be local directories, e.g. to test a job without the network.
+# A read error while the events are looped over (see isReadError) reopens the file the same way, see readFailed():
+# writeTree.py then resumes the loop from the event it was processing.
+# The xrootd timeouts and the read-ahead (TTreeCache) of the trees read from the files are set once per process.
+#####################################
+
+def storePath(fileName):
+
+	'''
+	Returns the logical file name (/store/...) of a file given with or without a redirector,
+	e.g. /store/mc/... for root://cmsxrootd.fnal.gov///store/mc/...
+	'''
+
+	if '://' in fileName:
+
+		fileName = '/' + fileName.split('://', 1)[1].split('/', 1)[1].lstrip('/')
+
+	return fileName
+
+def openFile(url):
+
+	'''
+	Opens the file, returns None if it could not be opened.
+	'''
+
+	try:
+
+		rootFile = ROOT.TFile.Open(url, 'READ')
+
+	except (IOError, OSError): #Newer versions of ROOT raise instead of returning a null pointer
+
+		return None
+
+	if not rootFile or rootFile.IsZombie(): return None
+
+	return rootFile
+
+_configured = False
+
+def configureReads(openTimeout=60, requestTimeout=300, cacheSize=1., learnEntries=10, asyncPrefetch=True):
+
+	'''
+	Sets the xrootd timeouts and the read-ahead of the trees, only once per process and before the first file is opened.
+
+	ARGUMENTS:
+	---openTimeout: Time allowed to connect to a server, in seconds.
+	---requestTimeout: Time allowed for a request (e.g. an open or a read) to be answered, in seconds.
+	---cacheSize: Size of the TTreeCache of the trees, in units of their cluster size (TTreeCache.Size of ROOT). 0 disables the cache.
+	---learnEntries: Number of entries after which the cache only fetches the branches read so far, i.e. the ones actually used.
+	---asyncPrefetch: If True, the next cluster of entries is fetched while the current one is processed.
+	'''
+
+	global _configured
+
+	if _configured: return
+
+	#Read by the xrootd client when it starts; the retries are made by InputAccess, over all the sources
+
+	os.environ.setdefault('XRD_CONNECTIONWINDOW', str(int(openTimeout)))
+	os.environ.setdefault('XRD_REQUESTTIMEOUT', str(int(requestTimeout)))
+	os.environ.setdefault('XRD_CONNECTIONRETRY', '1')
+
+	ROOT.gEnv.SetValue('TTreeCache.Size', float(cacheSize))
+	ROOT.gEnv.SetValue('TFile.AsyncPrefetching', int(asyncPrefetch))
+
+	ROOT.TTreeCache.SetLearnEntries(learnEntries)
+
+	_configured = True
+
+#Categories of the cms::Exception raised by FWLite when reading a file fails
+
+readErrorCategories = ['FileReadError', 'FileOpenError']
+
+def isReadError(error):
+
+	'''
+	Returns True if an exception raised while reading the events comes from the I/O (e.g. a server which went away),
+	i.e. the file is to be reopened, and False otherwise (e.g. a ProductNotFound exception), the exception being raised right away.
+	'''
+
+	if isinstance(error, (IOError, OSError)): return True
+
+	message = str(error)
+
+	return any(category in message for category in readErrorCategories)
+
+class InputAccess(object):
+
+	'''
+	Opens the input files with retries and failover.
+
+	ARGUMENTS:
+	---redirectors: URL prefixes of the redirectors, tried in this order. Local directories can be used, e.g. for tests.
+	---localReplicaDirs: Directories searched first for a local copy of the files.
+	---retries: Number of rounds over all the sources after the first one.
+	---backoff: Wait before the first retry, in seconds. The wait is doubled after each round, up to maxBackoff.
+	---opener: Function opening a URL and returning the open file, or None if it failed. By default, openFile.
+	---sleep: Function waiting the given number of seconds, time.sleep by default.
+	'''
+
+	def __init__(self, redirectors, localReplicaDirs=(), retries=3, backoff=10., maxBackoff=300., opener=openFile, sleep=time.sleep):
+
+		self.redirectors = list(redirectors)
+		self.localReplicaDirs = list(localReplicaDirs)
+
+		self.retries = retries
+		self.backoff = backoff
+		self.maxBackoff = maxBackoff
+
+		self.opener = opener
+		self.sleep = sleep
+
+	def sources(self, fileName):
+
+		'''
+		Returns the URLs the file can be read from, in the order they are tried.
+		'''
+
+		#A local file is read directly
+
+		if '://' not in fileName and os.path.exists(fileName): return [fileName]
+
+		lfn = storePath(fileName)
+
+		urls = [os.path.join(directory, lfn.lstrip('/')) for directory in self.localReplicaDirs if os.path.exists(os.path.join(directory, lfn.lstrip('/')))]
+
+		urls += [redirector.rstrip('/') + '//' + lfn.lstrip('/') if '://' in redirector else os.path.join(redirector, lfn.lstrip('/')) for redirector in self.redirectors]
+
+		#A file given with a redirector which is not configured is still tried, after the configured ones
+
+		if '://' in fileName and not any(fileName.startswith(redirector.rstrip('/')) for redirector in self.redirectors):
+
+			urls.append(fileName)
+
+		return urls
+
+	def _demote(self, url):
+
+		#Move the redirector of a failed URL to the end of the list, for the next files
+
+		for redirector in self.redirectors:
+
+			if url.startswith(redirector.rstrip('/')) and len(self.redirectors) > 1:
+
+				self.redirectors.remove(redirector)
+				self.redirectors.append(redirector)
+
+				return
+
+	def open(self, fileName, metrics=None):
+
+		'''
+		Returns the URL which the file could be opened from, and the open file.
+		Raises an IOError if the file could not be opened from any source after all the retries.
+
+		ARGUMENTS:
+		---fileName: Logical file name (/store/...) or URL of the file.
+		---metrics: JobMetrics of the job (see lib/metrics.py), counting the sources which failed in the first round as failovers,
+					and the following rounds as retries.
+		'''
+
+		wait = self.backoff
+
+		failed = False
+
+		for attempt in range(self.retries + 1):
+
+			if attempt > 0:
+
+				print('WARNING: Could not open {} from any source, retrying in {:.0f} s ({}/{})'.format(fileName, wait, attempt, self.retries))
+
+				if metrics: metrics.count('retries')
+
+				self.sleep(wait)
+
+				wait = min(2*wait, self.maxBackoff)
+
+			for url in self.sources(fileName):
+
+				rootFile = self.opener(url)
+
+				if rootFile:
+
+					if failed:
+
+						print('INFO: {} opened from {}'.format(fileName, siteOf(url)))
+
+					return url, rootFile
+
+				print('WARNING: Could not open {}'.format(url))
+
+				if metrics and attempt == 0: metrics.count('failovers')
+
+				failed = True
+
+				self._demote(url)
+
+		raise IOError('Could not open {} after {} attempts over {}'.format(fileName, self.retries + 1, ', '.join(self.sources(fileName))))
+
+	def readFailed(self, url, error, numFailures, metrics=None):
+
+		'''
+		To be called when reading the events of a file opened from url failed, before opening it again.
+		Returns False if the file failed to be read too many times (more than the number of retries), i.e. the error is to be raised.
+		Otherwise, the source of the failed read is tried last and the next open waits as between two rounds of open().
+
+		ARGUMENTS:
+		---url: URL the file was read from.
+		---error: Exception raised while reading the file.
+		---numFailures: Number of read failures of the file so far, including this one.
+		---metrics: JobMetrics of the job, counting the read errors.
+		'''
+
+		if metrics: metrics.count('readErrors')
+
+		if numFailures > self.retries: return False
+
+		wait = min(self.backoff * 2**(numFailures - 1), self.maxBackoff)
+
+		print('WARNING: Reading {} failed ({}), reopening the file in {:.0f} s ({}/{})'.format(url, error, wait, numFailures, self.retries))
+
+		self._demote(url)
+
+		self.sleep(wait)
+
+		return True
+
+def getInputAccess(config, localReplicaDirs=(), **options):
+
+	'''
+	Returns the InputAccess of the given era configuration (see lib/eraConfig.py), configuring the reads of the process.
+	The given local replica directories are searched before the ones of the configuration,
+	and the options override the settings of the configuration (config['inputAccess']).
+	'''
+
+	settings = dict(config['inputAccess'])
+	settings.update(options)
+
+	configureReads(settings['openTimeout'], settings['requestTimeout'], settings['cacheSize'], settings['learnEntries'])
+
+	return InputAccess(config['redirectors'], list(localReplicaDirs) + config['localReplicaDirs'], settings['retries'], settings['backoff'])
@@ -0,0 +1,371 @@
+import ROOT
+import os
+import json
+import numpy as np
+from array import array
+from collections import OrderedDict
+
+#####################################
+# Mergeable analysis results
+# Results holds the outcome of an analysis over some inputs: histograms (as sums of weights and of squared weights per bin),
+# efficiencies (a numerator and a denominator histogram), cut flow counters and metadata,
+# together with the inputs which contributed to them.
+# Partial results of the same analysis, e.g. from a pool of processes or from batch jobs, are combined with merge().
+# Merging is associative and refuses results sharing an input, so no input is counted twice.
+# Results are saved into a compact .npz file, and converted to ROOT objects only at the end.
+#####################################
+
+class Histogram(object):
+
+	'''
+	A 1D or 2D histogram, as numpy arrays of the sum of weights and sum of squared weights per bin,
+	including the underflow and overflow bins. The 2D bins are numbered as in ROOT: bin = binx + (nx+2)*biny.
+
+	ARGUMENTS:
+	---edges: Bin edges on the x-axis.
+	---yEdges: Bin edges on the y-axis, None for a 1D histogram.
+	'''
+
+	def __init__(self, edges, yEdges=None):
+
+		self.edges = np.asarray(edges, dtype=np.float64)
+		self.yEdges = None if yEdges is None else np.asarray(yEdges, dtype=np.float64)
+
+		numBins = len(self.edges)+1
+
+		if self.yEdges is not None:
+
+			numBins *= len(self.yEdges)+1
+
+		self.sumw = np.zeros(numBins)
+		self.sumw2 = np.zeros(numBins)
+
+		self.numEntries = 0
+
+	def fill(self, x, y=None, weights=None):
+
+		'''
+		Fills the given arrays of values (and weights).
+		'''
+
+		x = np.asarray(x, dtype=np.float64)
+
+		bins = np.searchsorted(self.edges, x, side='right')
+
+		if self.yEdges is not None:
+
+			bins = bins + (len(self.edges)+1) * np.searchsorted(self.yEdges, np.asarray(y, dtype=np.float64), side='right')
+
+		if weights is None:
+
+			weights = np.ones(len(x))
+
+		self.sumw += np.bincount(bins, weights=weights, minlength=len(self.sumw))
+		self.sumw2 += np.bincount(bins, weights=np.asarray(weights)**2, minlength=len(self.sumw))
+
+		self.numEntries += len(x)
+
+	def copy(self):
+
+		histo = Histogram(self.edges, self.yEdges)
+
+		histo.sumw, histo.sumw2 = self.sumw.copy(), self.sumw2.copy()
+		histo.numEntries = self.numEntries
+
+		return histo
+
+	def compatible(self, other):
+
+		if not np.array_equal(self.edges, other.edges): return False
+
+		if (self.yEdges is None) != (other.yEdges is None): return False
+
+		return self.yEdges is None or np.array_equal(self.yEdges, other.yEdges)
+
+	def merge(self, other):
+
+		if not self.compatible(other):
+
+			raise ValueError('Cannot merge histograms with different bin edges')
+
+		self.sumw += other.sumw
+		self.sumw2 += other.sumw2
+
+		self.numEntries += other.numEntries
+
+	def toROOT(self, name, title=''):
+
+		'''
+		Returns the histogram as a TH1F or TH2F.
+		'''
+
+		if self.yEdges is None:
+
+			histo = ROOT.TH1F(name, title, len(self.edges)-1, array('d', self.edges))
+
+		else:
+
+			histo = ROOT.TH2F(name, title, len(self.edges)-1, array('d', self.edges), len(self.yEdges)-1, array('d', self.yEdges))
+
+		histo.SetDirectory(0)
+		histo.Sumw2()
+
+		for i in range(len(self.sumw)):
+
+			histo.SetBinContent(i, self.sumw[i])
+			histo.SetBinError(i, np.sqrt(self.sumw2[i]))
+
+		histo.SetEntries(self.numEntries)
+
+		return histo
+
+class Results(object):
+
+	'''
+	Histograms, efficiencies, cut flow counters and metadata of an analysis,
+	with the inputs which contributed to them.
+
+	ARGUMENTS:
+	---inputs: Dictionary mapping each input (e.g. a file path) to an identifier of its content (e.g. size and modification time),
+			   or a list of inputs.
+	---metadata: Dictionary of the settings of the analysis, e.g. the cuts. Only results with the same metadata are merged.
+	'''
+
+	def __init__(self, inputs=None, metadata=None):
+
+		if inputs is None:
+
+			inputs = {}
+
+		elif not isinstance(inputs, dict):
+
+			inputs = dict((name, None) for name in inputs)
+
+		self.inputs = inputs
+
+		#Kept as it is saved, e.g. tuples as lists, so saved and new results compare equal
+
+		self.metadata = json.loads(json.dumps(metadata or {}))
+
+		self.histograms = OrderedDict()
+		self.efficiencies = OrderedDict()
+		self.counters = OrderedDict()
+
+	#Booking and filling
+
+	def addHistogram(self, name, edges, yEdges=None):
+
+		self.histograms[name] = Histogram(edges, yEdges)
+
+		return self.histograms[name]
+
+	def fill(self, name, x, y=None, weights=None):
+
+		self.histograms[name].fill(x, y, weights)
+
+	def addEfficiency(self, name, edges):
+
+		'''
+		Books an efficiency: a numerator (passed) and a denominator (total) histogram with the same bins.
+		'''
+
+		self.efficiencies[name] = (Histogram(edges), Histogram(edges))
+
+	def fillEfficiency(self, name, values, passed, weights=None):
+
+		'''
+		Fills the denominator with all the values, and the numerator with the values where passed is True.
+		'''
+
+		numerator, denominator = self.efficiencies[name]
+
+		values = np.asarray(values, dtype=np.float64)
+		passed = np.asarray(passed, dtype=bool)
+
+		denominator.fill(values, weights=weights)
+		numerator.fill(values[passed], weights=None if weights is None else np.asarray(weights)[passed])
+
+	def count(self, name, value=1):
+
+		'''
+		Adds value to the given counter. Counters are kept in the order they are first used, e.g. as a cut flow.
+		'''
+
+		self.counters[name] = self.counters.get(name, 0) + value
+
+	#Merging
+
+	def merge(self, other):
+
+		'''
+		Adds the results of another Results of the same analysis (same metadata) over other inputs.
+		'''
+
+		shared = set(self.inputs) & set(other.inputs)
+
+		if shared:
+
+			raise ValueError('Inputs already merged: {}'.format(', '.join(sorted(shared))))
+
+		if self.metadata != other.metadata:
+
+			raise ValueError('Cannot merge results with different metadata: {} and {}'.format(self.metadata, other.metadata))
+
+		for name, histo in other.histograms.items():
+
+			if name in self.histograms:
+
+				self.histograms[name].merge(histo)
+
+			else:
+
+				self.histograms[name] = histo.copy()
+
+		for name, (numerator, denominator) in other.efficiencies.items():
+
+			if name in self.efficiencies:
+
+				self.efficiencies[name][0].merge(numerator)
+				self.efficiencies[name][1].merge(denominator)
+
+			else:
+
+				self.efficiencies[name] = (numerator.copy(), denominator.copy())
+
+		for name, value in other.counters.items():
+
+			self.count(name, value)
+
+		self.inputs.update(other.inputs)
+
+		return self
+
+	#ROOT objects
+
+	def histogram(self, name, title=''):
+
+		return self.histograms[name].toROOT(name, title)
+
+	def efficiency(self, name, title=''):
+
+		'''
+		Returns the efficiency as a TEfficiency, weighted if the histograms were filled with weights.
+		'''
+
+		numerator, denominator = self.efficiencies[name]
+
+		passed, total = numerator.toROOT(name + '_passed'), denominator.toROOT(name + '_total')
+
+		efficiency = ROOT.TEfficiency(passed, total)
+		efficiency.SetName(name)
+		efficiency.SetTitle(title)
+		efficiency.SetDirectory(0)
+
+		return efficiency
+
+	#Serialization
+
+	def save(self, path):
+
+		'''
+		Saves the results into a .npz file.
+		'''
+
+		if not path.endswith('.npz'): path += '.npz'
+
+		header = {'inputs' : self.inputs, 'metadata' : self.metadata, 'counters' : list(self.counters.items()), 'histograms' : [], 'efficiencies' : []}
+
+		arrays = {}
+
+		def addArrays(key, histo):
+
+			arrays[key + '_edges'] = histo.edges
+			arrays[key + '_sumw'] = histo.sumw
+			arrays[key + '_sumw2'] = histo.sumw2
+
+			if histo.yEdges is not None:
+
+				arrays[key + '_yEdges'] = histo.yEdges
+
+			return {'key' : key, 'numEntries' : histo.numEntries, 'is2D' : histo.yEdges is not None}
+
+		for i, (name, histo) in enumerate(self.histograms.items()):
+
+			header['histograms'].append(dict(addArrays('h{}'.format(i), histo), name=name))
+
+		for i, (name, (numerator, denominator)) in enumerate(self.efficiencies.items()):
+
+			header['efficiencies'].append({'name' : name, 'numerator' : addArrays('e{}n'.format(i), numerator), 'denominator' : addArrays('e{}d'.format(i), denominator)})
+
+		tmpPath = path[:-len('.npz')] + '.tmp.npz'
+
+		np.savez_compressed(tmpPath, header=np.array(json.dumps(header)), **arrays)
+
+		os.rename(tmpPath, path)
+
+	@classmethod
+	def load(cls, path):
+
+		'''
+		Loads results saved with save().
+		'''
+
+		#The arrays are read from the file while it is open, and the file is closed before returning
+
+		with np.load(path) as data:
+
+			header = json.loads(str(data['header']))
+
+			results = cls(header['inputs'], header['metadata'])
+
+			for name, value in header['counters']:
+
+				results.counters[name] = value
+
+			def getHistogram(info):
+
+				key = info['key']
+
+				histo = Histogram(np.array(data[key + '_edges']), np.array(data[key + '_yEdges']) if info['is2D'] else None)
+
+				histo.sumw, histo.sumw2 = np.array(data[key + '_sumw']), np.array(data[key + '_sumw2'])
+				histo.numEntries = info['numEntries']
+
+				return histo
+
+			for info in header['histograms']:
+
+				results.histograms[info['name']] = getHistogram(info)
+
+			for info in header['efficiencies']:
+
+				results.efficiencies[info['name']] = (getHistogram(info['numerator']), getHistogram(info['denominator']))
+
+		return results
+
+def mergeResults(results):
+
+	'''
+	Merges a list of Results (or paths of saved results) into a new Results.
+	Raises a ValueError if the list is empty.
+	'''
+
+	if not results:
+
+		raise ValueError('No results to merge')
+
+	merged = None
+
+	for result in results:
+
+		if not isinstance(result, Results):
+
+			result = Results.load(result)
+
+		if merged is None:
+
+			merged = Results(metadata=result.metadata)
+
+		merged.merge(result)
+
+	return merged
@@ -1,6 +1,9 @@
 import ROOT
 import os
-from math import sqrt
+
+from lib.l1Emulation import L1Jets, emulateL1Seed, defaultThresholds
+from lib.plotting import submitPlot
+from lib.cuts import Cut, minPhiJetMET, oppositeHemispheres, mjjAbove, leadingJetPtAbove, trailingJetPtAbove, metAbove, getEvaluator
 
 def applyVBFSelections(tree, cuts, drawHisto=False):
 
@@ -12,7 +15,7 @@ def applyVBFSelections(tree, cuts, drawHisto=False):
 	'''
 	labels = ['total', 'METCut', 'LeadJetPt', 'TrailJetPt', 'MinPhiJetMET', 'NegEtaProd', 'EtaDiff', 'bJetCut', 'LeptonVeto', 'PhotonVeto', 'mjjCut']
 
- 	eventCounter = [0 for label in labels] 
+	eventCounter = [0 for label in labels] 
 
 	mjj_cut = cuts[0]
 	leadingJetPt_cut = cuts[1]
@@ -29,95 +32,97 @@ def applyVBFSelections(tree, cuts, drawHisto=False):
 	tree.Draw('jet_pt[1]>>trailingJetPt_hist0')
 	tree.Draw('nJet>>numJets_hist0')
 
-	cut = 'minPhi_jetMET > 0.5'
-	
-	eventCounter[1] = tree.GetEntries(cut)
-	tree.Draw('met>>met_hist1', cut, '')
-	tree.Draw('mjj>>mjj_hist1', cut, '')
-	tree.Draw('jet_pt[0]>>leadingJetPt_hist1', cut, '')
-	tree.Draw('jet_pt[1]>>trailingJetPt_hist1', cut, '')
-	tree.Draw('nJet>>numJets_hist1', cut, '')	
-	
-	cut += ' && jet_eta[0]*jet_eta[1] < 0'
-
-	eventCounter[2] = tree.GetEntries(cut)
-	tree.Draw('met>>met_hist2', cut, '')
-	tree.Draw('mjj>>mjj_hist2', cut, '')
-	tree.Draw('jet_pt[0]>>leadingJetPt_hist2', cut, '')
-	tree.Draw('jet_pt[1]>>trailingJetPt_hist2', cut, '')
-	tree.Draw('nJet>>numJets_hist2', cut, '')	
-	
-	cut += ' && abs(jet_eta[0] - jet_eta[1]) > 2.5'
-
-	eventCounter[3] = tree.GetEntries(cut)
-	tree.Draw('met>>met_hist3', cut, '')
-	tree.Draw('mjj>>mjj_hist3', cut, '')
-	tree.Draw('jet_pt[0]>>leadingJetPt_hist3', cut, '')
-	tree.Draw('jet_pt[1]>>trailingJetPt_hist3', cut, '')
-	tree.Draw('nJet>>numJets_hist3', cut, '')	
-	
-	cut += ' && contains_bJet == 0'
-
-	eventCounter[4] = tree.GetEntries(cut)
-	tree.Draw('met>>met_hist4', cut, '')
-	tree.Draw('mjj>>mjj_hist4', cut, '')
-	tree.Draw('jet_pt[0]>>leadingJetPt_hist4', cut, '')
-	tree.Draw('jet_pt[1]>>trailingJetPt_hist4', cut, '')
-	tree.Draw('nJet>>numJets_hist4', cut, '')	
-	
-	cut += ' && containsLepton == 0'
-	
-	eventCounter[5] = tree.GetEntries(cut)
-	tree.Draw('met>>met_hist5', cut, '')
-	tree.Draw('mjj>>mjj_hist5', cut, '')
-	tree.Draw('jet_pt[0]>>leadingJetPt_hist5', cut, '')
-	tree.Draw('jet_pt[1]>>trailingJetPt_hist5', cut, '')
-	tree.Draw('nJet>>numJets_hist5', cut, '')	
-	
-	cut += ' && containsPhoton == 0'
-
-	eventCounter[6] = tree.GetEntries(cut)
-	tree.Draw('met>>met_hist6', cut, '')
-	tree.Draw('mjj>>mjj_hist6', cut, '')
-	tree.Draw('jet_pt[0]>>leadingJetPt_hist6', cut, '')
-	tree.Draw('jet_pt[1]>>trailingJetPt_hist6', cut, '')
-	tree.Draw('nJet>>numJets_hist6', cut, '')	
-	
-	cut += ' && mjj > ' + str(mjj_cut)
-	
-	eventCounter[7] = tree.GetEntries(cut)
-	tree.Draw('met>>met_hist7', cut, '')
-	tree.Draw('mjj>>mjj_hist7', cut, '')
-	tree.Draw('jet_pt[0]>>leadingJetPt_hist7', cut, '')
-	tree.Draw('jet_pt[1]>>trailingJetPt_hist7', cut, '')
-	tree.Draw('nJet>>numJets_hist7', cut, '')	
-	
-	cut += ' && jet_pt[0] > ' + str(leadingJetPt_cut)
-	
-	eventCounter[8] = tree.GetEntries(cut)
-	tree.Draw('met>>met_hist8', cut, '')
-	tree.Draw('mjj>>mjj_hist8', cut, '')
-	tree.Draw('jet_pt[0]>>leadingJetPt_hist8', cut, '')
-	tree.Draw('jet_pt[1]>>trailingJetPt_hist8', cut, '')
-	tree.Draw('nJet>>numJets_hist8', cut, '')	
-	
-	cut += ' && jet_pt[1] > ' + str(trailingJetPt_cut)
-	
-	eventCounter[9] = tree.GetEntries(cut)
-	tree.Draw('met>>met_hist9', cut, '')
-	tree.Draw('mjj>>mjj_hist9', cut, '')
-	tree.Draw('jet_pt[0]>>leadingJetPt_hist9', cut, '')
-	tree.Draw('jet_pt[1]>>trailingJetPt_hist9', cut, '')
-	tree.Draw('nJet>>numJets_hist9', cut, '')	
-	
-	cut += ' && met > ' + str(met_cut)
-
-	eventCounter[10] = tree.GetEntries(cut)
-	tree.Draw('met>>met_hist10', cut, '')
-	tree.Draw('mjj>>mjj_hist10', cut, '')
-	tree.Draw('jet_pt[0]>>leadingJetPt_hist10', cut, '')
-	tree.Draw('jet_pt[1]>>trailingJetPt_hist10', cut, '')
-	tree.Draw('nJet>>numJets_hist10', cut, '')	
+	evaluator = getEvaluator(tree) #Event counts are computed from memoized masks, see lib/cuts.py
+
+	cut = minPhiJetMET
+	
+	eventCounter[1] = evaluator.count(cut)
+	tree.Draw('met>>met_hist1', str(cut), '')
+	tree.Draw('mjj>>mjj_hist1', str(cut), '')
+	tree.Draw('jet_pt[0]>>leadingJetPt_hist1', str(cut), '')
+	tree.Draw('jet_pt[1]>>trailingJetPt_hist1', str(cut), '')
+	tree.Draw('nJet>>numJets_hist1', str(cut), '')	
+	
+	cut = cut & oppositeHemispheres
+
+	eventCounter[2] = evaluator.count(cut)
+	tree.Draw('met>>met_hist2', str(cut), '')
+	tree.Draw('mjj>>mjj_hist2', str(cut), '')
+	tree.Draw('jet_pt[0]>>leadingJetPt_hist2', str(cut), '')
+	tree.Draw('jet_pt[1]>>trailingJetPt_hist2', str(cut), '')
+	tree.Draw('nJet>>numJets_hist2', str(cut), '')	
+	
+	cut = cut & Cut('abs(jet_eta[0] - jet_eta[1]) > 2.5')
+
+	eventCounter[3] = evaluator.count(cut)
+	tree.Draw('met>>met_hist3', str(cut), '')
+	tree.Draw('mjj>>mjj_hist3', str(cut), '')
+	tree.Draw('jet_pt[0]>>leadingJetPt_hist3', str(cut), '')
+	tree.Draw('jet_pt[1]>>trailingJetPt_hist3', str(cut), '')
+	tree.Draw('nJet>>numJets_hist3', str(cut), '')	
+	
+	cut = cut & Cut('contains_bJet == 0')
+
+	eventCounter[4] = evaluator.count(cut)
+	tree.Draw('met>>met_hist4', str(cut), '')
+	tree.Draw('mjj>>mjj_hist4', str(cut), '')
+	tree.Draw('jet_pt[0]>>leadingJetPt_hist4', str(cut), '')
+	tree.Draw('jet_pt[1]>>trailingJetPt_hist4', str(cut), '')
+	tree.Draw('nJet>>numJets_hist4', str(cut), '')	
+	
+	cut = cut & Cut('containsLepton == 0')
+	
+	eventCounter[5] = evaluator.count(cut)
+	tree.Draw('met>>met_hist5', str(cut), '')
+	tree.Draw('mjj>>mjj_hist5', str(cut), '')
+	tree.Draw('jet_pt[0]>>leadingJetPt_hist5', str(cut), '')
+	tree.Draw('jet_pt[1]>>trailingJetPt_hist5', str(cut), '')
+	tree.Draw('nJet>>numJets_hist5', str(cut), '')	
+	
+	cut = cut & Cut('containsPhoton == 0')
+
+	eventCounter[6] = evaluator.count(cut)
+	tree.Draw('met>>met_hist6', str(cut), '')
+	tree.Draw('mjj>>mjj_hist6', str(cut), '')
+	tree.Draw('jet_pt[0]>>leadingJetPt_hist6', str(cut), '')
+	tree.Draw('jet_pt[1]>>trailingJetPt_hist6', str(cut), '')
+	tree.Draw('nJet>>numJets_hist6', str(cut), '')	
+	
+	cut = cut & mjjAbove(mjj_cut)
+	
+	eventCounter[7] = evaluator.count(cut)
+	tree.Draw('met>>met_hist7', str(cut), '')
+	tree.Draw('mjj>>mjj_hist7', str(cut), '')
+	tree.Draw('jet_pt[0]>>leadingJetPt_hist7', str(cut), '')
+	tree.Draw('jet_pt[1]>>trailingJetPt_hist7', str(cut), '')
+	tree.Draw('nJet>>numJets_hist7', str(cut), '')	
+	
+	cut = cut & leadingJetPtAbove(leadingJetPt_cut)
+	
+	eventCounter[8] = evaluator.count(cut)
+	tree.Draw('met>>met_hist8', str(cut), '')
+	tree.Draw('mjj>>mjj_hist8', str(cut), '')
+	tree.Draw('jet_pt[0]>>leadingJetPt_hist8', str(cut), '')
+	tree.Draw('jet_pt[1]>>trailingJetPt_hist8', str(cut), '')
+	tree.Draw('nJet>>numJets_hist8', str(cut), '')	
+	
+	cut = cut & trailingJetPtAbove(trailingJetPt_cut)
+	
+	eventCounter[9] = evaluator.count(cut)
+	tree.Draw('met>>met_hist9', str(cut), '')
+	tree.Draw('mjj>>mjj_hist9', str(cut), '')
+	tree.Draw('jet_pt[0]>>leadingJetPt_hist9', str(cut), '')
+	tree.Draw('jet_pt[1]>>trailingJetPt_hist9', str(cut), '')
+	tree.Draw('nJet>>numJets_hist9', str(cut), '')	
+	
+	cut = cut & metAbove(met_cut)
+
+	eventCounter[10] = evaluator.count(cut)
+	tree.Draw('met>>met_hist10', str(cut), '')
+	tree.Draw('mjj>>mjj_hist10', str(cut), '')
+	tree.Draw('jet_pt[0]>>leadingJetPt_hist10', str(cut), '')
+	tree.Draw('jet_pt[1]>>trailingJetPt_hist10', str(cut), '')
+	tree.Draw('nJet>>numJets_hist10', str(cut), '')	
 	
 	#Create the output directory for png files if not created before
 
@@ -155,13 +160,11 @@ def applyVBFSelections(tree, cuts, drawHisto=False):
 			hist.GetYaxis().SetTitle('Number of Events')
 			hist.SetTitle('')
 
-			#Save the histgrams as png files
+			#Save the histgrams as png files, rendered in the background (see lib/plotting.py)
 			
-			canv = ROOT.TCanvas('canv', 'canv')
-			hist.Draw()
 			pngFile = os.path.join(outputDir, histo_label+'.png')
 
-			canv.Print(pngFile)
+			submitPlot(pngFile, [(hist, '')])
 
 	out.Write()
 	out.Close()
@@ -176,22 +179,13 @@ def applyL1Selection(event):
 	'''
 	Applies L1 selection to a given event.
 	Returns True if event passes the L1 trigger, otherwise returns False.
+	The seed is emulated from the stored L1 jets, see lib/l1Emulation.py.
+	To evaluate the seed over a whole tree, use L1Jets.fromTree and emulateL1Seed instead.
 	'''
 
 	if event.L1_nJet < 2: return False
 
-	else:
-		
-		L1_totalEnergy = event.L1_jet_energy[0] + event.L1_jet_energy[1]
-		L1_totalPx = event.L1_jet_px[0] + event.L1_jet_px[1]			
-		L1_totalPy = event.L1_jet_py[0] + event.L1_jet_py[1]			
-		L1_totalPz = event.L1_jet_pz[0] + event.L1_jet_pz[1]			
-		
-		L1_mjj = sqrt(L1_totalEnergy**2 - L1_totalPx**2 - L1_totalPy**2 - L1_totalPz**2) #Invariant mass of two leading jets at L1 level
-
-		if not (event.L1_jet_pt[0] > 115 and event.L1_jet_pt[1] > 40 and L1_mjj > 620): return False #Simulating the L1 trigger
-
-	return True
+	return bool(emulateL1Seed(L1Jets.fromEvent(event), **defaultThresholds)[0])
 
 def applyHLTSelection(event, HLT_path):
 
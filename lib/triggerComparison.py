@@ -0,0 +1,220 @@
+import ROOT
+import numpy as np
+from array import array
+from itertools import combinations
+
+from lib.columns import loadScalars
+from lib.cuts import getEvaluator
+from lib.entryLists import onlyEntries
+
+#####################################
+# Comparison of any number of triggers over any number of variables
+# The variables and trigger bits of the events passing the common cuts are read once (see lib/columns.py),
+# and all the histograms are then filled from numpy arrays:
+# -- The acceptance of each trigger, as a function of each variable
+# -- The overlap categories of each pair of triggers: passing only the first, only the second, or both
+# Comparing the seven 2017 paths pairwise is then one read of the tree instead of 21 separate jobs.
+#####################################
+
+def histogramFromArray(name, title, edges, values, weights=None):
+
+	'''
+	Returns a TH1F with the given bin edges, filled with the given values and weights,
+	including the underflow and overflow bins, with the sum of squared weights as the bin errors.
+	'''
+
+	histo = ROOT.TH1F(name, title, len(edges)-1, array('d', edges))
+	histo.SetDirectory(0)
+	histo.Sumw2()
+
+	if weights is None:
+
+		weights = np.ones(len(values))
+
+	valid = ~np.isnan(values)
+
+	#Bin numbers as in ROOT: 0 is the underflow bin, len(edges) the overflow bin
+
+	bins = np.searchsorted(edges, values[valid], side='right')
+
+	sumw = np.bincount(bins, weights=weights[valid], minlength=len(edges)+1)
+	sumw2 = np.bincount(bins, weights=weights[valid]**2, minlength=len(edges)+1)
+
+	for i in range(len(edges)+1):
+
+		histo.SetBinContent(i, sumw[i])
+		histo.SetBinError(i, np.sqrt(sumw2[i]))
+
+	histo.SetEntries(int(valid.sum()))
+
+	return histo
+
+class TriggerComparison(object):
+
+	'''
+	Result of compareTriggers: the variables and trigger decisions of the events passing the common cuts.
+
+	ARGUMENTS:
+	---triggers: List of trigger names.
+	---labels: Dictionary mapping the trigger names to their labels.
+	---variables: Dictionary mapping the variable names to (expression, bin edges, extra cut or None).
+	---values: Dictionary mapping the variable names to their values per event.
+	---passed: Dictionary mapping the trigger names to boolean arrays.
+	---selected: Dictionary mapping the variable names to the boolean arrays of their extra cuts.
+	---categories: Dictionary mapping the category names (e.g. eta regions) to boolean arrays.
+	---weights: Event weights.
+	'''
+
+	def __init__(self, triggers, labels, variables, values, passed, selected, categories, weights):
+
+		self.triggers = triggers
+		self.labels = labels
+		self.variables = variables
+		self.values = values
+		self.passed = passed
+		self.selected = selected
+		self.categories = categories
+		self.weights = weights
+
+	def _mask(self, variable, category):
+
+		mask = self.selected[variable]
+
+		if category is not None:
+
+			mask = mask & self.categories[category]
+
+		return mask
+
+	def histogram(self, variable, mask, name, title=''):
+
+		'''
+		Returns the histogram of the given variable for the events in mask.
+		'''
+
+		return histogramFromArray(name, title, self.variables[variable][1], self.values[variable][mask], self.weights[mask])
+
+	def acceptance(self, trigger, variable, category=None):
+
+		'''
+		Returns the histogram of the given variable for the events passing the common cuts and the trigger.
+		'''
+
+		mask = self._mask(variable, category) & self.passed[trigger]
+
+		name = '_'.join(filter(None, ['acc', variable, self.labels[trigger], category]))
+
+		return self.histogram(variable, mask, name, trigger)
+
+	def overlap(self, trigger1, trigger2, variable, category=None):
+
+		'''
+		Returns a dictionary of histograms of the given variable for the events passing
+		only trigger1 ('only1'), only trigger2 ('only2') and both ('both').
+		'''
+
+		mask = self._mask(variable, category)
+
+		pass1, pass2 = self.passed[trigger1], self.passed[trigger2]
+
+		label1, label2 = self.labels[trigger1], self.labels[trigger2]
+
+		masks = {'only1' : pass1 & ~pass2, 'only2' : ~pass1 & pass2, 'both' : pass1 & pass2}
+
+		titles = {'only1' : label1 + ' only', 'only2' : label2 + ' only', 'both' : label1 + ' and ' + label2}
+
+		histos = {}
+
+		for key in masks:
+
+			name = '_'.join(filter(None, ['overlap', variable, label1, label2, key, category]))
+
+			histos[key] = self.histogram(variable, mask & masks[key], name, titles[key])
+
+		return histos
+
+	def pairs(self):
+
+		'''
+		Returns all the pairs of triggers.
+		'''
+
+		return list(combinations(self.triggers, 2))
+
+	def overlapCounts(self, category=None):
+
+		'''
+		Returns a dictionary mapping each pair of triggers to the (weighted) number of events
+		passing only the first, only the second and both of them.
+		'''
+
+		mask = np.ones(len(self.weights), dtype=bool) if category is None else self.categories[category]
+
+		counts = {}
+
+		for trigger1, trigger2 in self.pairs():
+
+			pass1, pass2 = self.passed[trigger1] & mask, self.passed[trigger2] & mask
+
+			counts[(trigger1, trigger2)] = (self.weights[pass1 & ~pass2].sum(), self.weights[~pass1 & pass2].sum(), self.weights[pass1 & pass2].sum())
+
+		return counts
+
+def compareTriggers(tree, triggers, variables, baseCut, labels=None, categories=None, weight=None):
+
+	'''
+	Reads the given variables and trigger bits once, for the events passing baseCut,
+	and returns a TriggerComparison.
+
+	ARGUMENTS:
+	---tree: The event tree (or chain).
+	---triggers: List of trigger names.
+	---variables: Dictionary mapping the variable names to (expression, bin edges) or (expression, bin edges, extra cut),
+				  the extra cut is applied only for that variable, on top of baseCut.
+	---baseCut: The cut common to all the histograms (Cut object or expression).
+	---labels: Labels of the triggers, in the same order. By default, the trigger names.
+	---categories: Dictionary mapping category names to cuts, e.g. eta regions.
+	---weight: Expression of the event weight, None for unweighted events.
+	'''
+
+	if labels is None:
+
+		labels = triggers
+
+	variables = dict((name, (spec[0], np.asarray(spec[1], dtype=np.float64), spec[2] if len(spec) > 2 else None)) for name, spec in variables.items())
+
+	names = [expression for expression, edges, extraCut in variables.values()] + list(triggers)
+
+	if weight:
+
+		names.append(weight)
+
+	#Read all the columns for the events passing baseCut only, see lib/entryLists.py
+
+	with onlyEntries(tree, baseCut):
+
+		columns = loadScalars(tree, ['Entry$'] + names, str(baseCut))
+
+	entries = columns['Entry$'].astype(np.int64)
+
+	evaluator = getEvaluator(tree)
+
+	values = dict((name, columns[spec[0]]) for name, spec in variables.items())
+
+	#A trigger branch is -1 for the events where the path is not in the HLT menu, which do not pass it (as triggerFired in lib/cuts.py)
+
+	passed = dict((trigger, columns[trigger] == 1) for trigger in triggers)
+
+	selected = {}
+
+	for name, (expression, edges, extraCut) in variables.items():
+
+		selected[name] = np.ones(len(entries), dtype=bool) if extraCut is None else evaluator.mask(extraCut)[entries]
+
+	categoryMasks = dict((name, evaluator.mask(cut)[entries]) for name, cut in (categories or {}).items())
+
+	weights = columns[weight] if weight else np.ones(len(entries))
+
+	print('INFO: {} triggers compared over {} events passing {}'.format(len(triggers), len(entries), getattr(baseCut, 'name', baseCut)))
+
+	return TriggerComparison(list(triggers), dict(zip(triggers, labels)), variables, values, passed, selected, categoryMasks, weights)
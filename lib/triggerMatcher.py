@@ -0,0 +1,89 @@
+import re
+import fnmatch
+
+class TriggerMatcher(object):
+
+	'''
+	Matches trigger/filter name patterns to the paths of a trigger menu.
+
+	Patterns may contain shell-style wildcards, e.g. HLT_DiJet110_35_Mjj650_PFMET110_v*,
+	so that a menu version bump does not leave the branch unfilled.
+	The patterns are compiled once per trigger menu into a table of (branch name, path index) slots.
+	After that, filling the branches of an event only costs one accept() call per pattern.
+
+	ARGUMENTS:
+	---patterns: List of (branch name, pattern) tuples.
+	---label: Label used while reporting, e.g. 'HLT' or 'MET filter'.
+	'''
+
+	def __init__(self, patterns, label='HLT'):
+
+		self.label = label
+
+		self.patterns = [(branchName, pattern, re.compile(fnmatch.translate(pattern))) for branchName, pattern in patterns]
+
+		self.menuID = None
+
+		self.slots = []
+		self.unmatched = []
+
+		self.numMenus = 0
+
+	def compile(self, triggerNames):
+
+		'''
+		Builds the slot table for the given edm::TriggerNames.
+		Reports the patterns that do not match any path in the menu.
+		'''
+
+		names = [triggerNames.triggerName(k) for k in range(triggerNames.size())]
+
+		self.slots = []
+		self.unmatched = []
+
+		for branchName, pattern, regex in self.patterns:
+
+			matches = [k for k, name in enumerate(names) if regex.match(name)]
+
+			if not matches:
+
+				self.unmatched.append(pattern)
+
+				continue
+
+			if len(matches) > 1:
+
+				print('WARNING: {} pattern {} matches several paths, using {}'.format(self.label, pattern, names[matches[0]]))
+
+			self.slots.append((branchName, matches[0]))
+
+		self.numMenus += 1
+
+		if self.unmatched:
+
+			print('WARNING: {} patterns not found in the menu: {}'.format(self.label, ', '.join(self.unmatched)))
+
+	def update(self, triggerNames):
+
+		'''
+		Recompiles the slot table only if the trigger menu has changed since the last call.
+		'''
+
+		menuID = triggerNames.parameterSetID().compactForm()
+
+		if menuID != self.menuID:
+
+			self.compile(triggerNames)
+
+			self.menuID = menuID
+
+	def fill(self, triggerResults, branches):
+
+		'''
+		Fills the branch buffers with the decisions in the given edm::TriggerResults.
+		update() must be called for the event before calling this function.
+		'''
+
+		for branchName, k in self.slots:
+
+			branches[branchName][0] = 1 if triggerResults.accept(k) else 0
@@ -0,0 +1,167 @@
+from lib.branchBuffers import BranchBuffers
+
+max_num = 1000
+
+#####################################
+# Branch schema of eventTree
+# Each entry is (branch name, leaf type, size branch, default value)
+# Size branch is None for scalar branches.
+# Scalars are reset to their default value at the start of each event,
+# so a default value in the tree means that the quantity was not found for that event:
+# -999 for kinematic quantities, -1 for trigger, filter and veto decisions.
+#####################################
+
+#Event identifiers, to find the events of the trees in MiniAOD and check that no event is written twice
+
+eventIdBranches = [
+	('run', 'I', None, -1),
+	('luminosityBlock', 'I', None, -1),
+	('event', 'L', None, -1),
+]
+
+#MET, jet, lepton and photon information
+
+eventBranches = [
+	('met', 'F', None, -999.),
+	('met_phi', 'F', None, -999.),
+	('met_eta', 'F', None, -999.),
+
+	('nJet', 'I', None, 0),
+	('jet_pt', 'F', 'nJet', 0.),
+	('jet_energy', 'F', 'nJet', 0.),
+	('jet_eta', 'F', 'nJet', 0.),
+	('jet_phi', 'F', 'nJet', 0.),
+	('jet_btag_CSVv2', 'F', 'nJet', 0.),
+
+	('minPhi_jetMET', 'F', None, -1.),
+	('mjj', 'F', None, -999.),
+	('absEtaDiff_leadingTwoJets', 'F', None, -999.),
+
+	('nElectron', 'I', None, 0),
+	('electron_pt', 'F', 'nElectron', 0.),
+	('electron_phi', 'F', 'nElectron', 0.),
+	('electron_eta', 'F', 'nElectron', 0.),
+	('electron_energy', 'F', 'nElectron', 0.),
+
+	('nMuon', 'I', None, 0),
+	('muon_pt', 'F', 'nMuon', 0.),
+	('muon_phi', 'F', 'nMuon', 0.),
+	('muon_eta', 'F', 'nMuon', 0.),
+	('muon_energy', 'F', 'nMuon', 0.),
+
+	('nTau', 'I', None, 0),
+	('tau_pt', 'F', 'nTau', 0.),
+	('tau_phi', 'F', 'nTau', 0.),
+	('tau_eta', 'F', 'nTau', 0.),
+	('tau_energy', 'F', 'nTau', 0.),
+
+	('nPhoton', 'I', None, 0),
+	('photon_pt', 'F', 'nPhoton', 0.),
+	('photon_phi', 'F', 'nPhoton', 0.),
+	('photon_eta', 'F', 'nPhoton', 0.),
+	('photon_energy', 'F', 'nPhoton', 0.),
+
+	#Veto decisions, computed from the loose objects stored above
+	#and the b-tag values of the tight jets
+
+	('containsElectron', 'I', None, -1),
+	('containsMuon', 'I', None, -1),
+	('containsTau', 'I', None, -1),
+	('containsLepton', 'I', None, -1),
+	('containsPhoton', 'I', None, -1),
+	('contains_bJet', 'I', None, -1),
+]
+
+#Generator level summary, see lib/genSummary.py
+#Stored if genSummary is set in the era configuration
+
+genSummaryBranches = [
+	('gen_bosonPdgId', 'I', None, 0),
+	('gen_boson_pt', 'F', None, -999.),
+	('gen_boson_eta', 'F', None, -999.),
+	('gen_boson_phi', 'F', None, -999.),
+	('gen_boson_mass', 'F', None, -999.),
+
+	('gen_nQuarks', 'I', None, 0),
+	('gen_quark1_pt', 'F', None, -999.),
+	('gen_quark1_eta', 'F', None, -999.),
+	('gen_quark1_phi', 'F', None, -999.),
+	('gen_quark2_pt', 'F', None, -999.),
+	('gen_quark2_eta', 'F', None, -999.),
+	('gen_quark2_phi', 'F', None, -999.),
+	('gen_mjj_quarks', 'F', None, -999.),
+	('gen_absEtaDiff_quarks', 'F', None, -999.),
+]
+
+#pdgId of every prunedGenParticles entry
+#Stored only if storeGenParticles is set in the era configuration
+
+genParticleBranches = [
+	('nParticles', 'I', None, 0),
+	('pdgId', 'I', 'nParticles', 0),
+]
+
+#L1 level information for jets and MET
+
+L1Branches = [
+	('L1_nJet', 'I', None, 0),
+	('L1_jet_pt', 'F', 'L1_nJet', 0.),
+	('L1_jet_energy', 'F', 'L1_nJet', 0.),
+	('L1_jet_eta', 'F', 'L1_nJet', 0.),
+	('L1_jet_phi', 'F', 'L1_nJet', 0.),
+
+	('L1_met', 'F', None, -999.),
+	('L1_met_eta', 'F', None, -999.),
+	('L1_met_phi', 'F', None, -999.),
+]
+
+def getBranchSchema(config):
+
+	'''
+	Returns the full branch schema for the given era configuration (see lib/eraConfig.py).
+	HLT paths and MET filters of the era are added as integer branches named after the path/filter.
+	Generator level branches are added according to the genSummary and storeGenParticles settings.
+	'''
+
+	schema = eventIdBranches + eventBranches
+
+	if config['genSummary']:
+
+		schema += genSummaryBranches
+
+	if config['storeGenParticles']:
+
+		schema += genParticleBranches
+
+	for trigger, pattern in config['triggers']:
+
+		schema.append((trigger, 'I', None, -1))
+
+	schema += L1Branches
+
+	for flag, pattern in config['filters']:
+
+		schema.append((flag, 'I', None, -1))
+
+	return schema
+
+def defineBranches(config):
+
+	'''
+	Creates the buffers for all the branches in the schema of the given era configuration.
+	Returns a BranchBuffers object, see lib/branchBuffers.py.
+	'''
+
+	return BranchBuffers(getBranchSchema(config), max_num)
+
+def declare_branches(tree, branches):
+
+	'''
+	Creates the branches of the given tree, using the buffers created by defineBranches.
+	'''
+
+	print('######## Creating branches ########')
+
+	branches.declare(tree)
+
+	print('######## Branches declared ########')
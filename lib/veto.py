@@ -1,78 +1,81 @@
 import ROOT
 
-def containsLooseElectron(electrons_):
+def selectLooseElectrons(electrons_, electronID='cutBasedElectronID-Spring15-25ns-V1-standalone-loose'):
 
 	'''
-	Returns True if there is at least one electron that passes 2017 loose ID requirements in the given electrons_ set.
-	Otherwise, returns False.
+	Returns the list of electrons in the given electrons_ set that pass the loose ID requirements.
+	The ID working point is the one of the era configuration (config['electronID'], see lib/eraConfig.py).
 	'''
 
-	looseElectron = False
+	return [el for el in electrons_ if el.electronID(electronID) == 1. and el.pt() > 10 and abs(el.eta()) < 2.5]
 
-	for el in electrons_:
+def selectLooseMuons(muons_):
 
-		if el.electronID('cutBasedElectronID-Spring15-25ns-V1-standalone-loose') == 1. and el.pt() > 10 and abs(el.eta()) < 2.5:
+	'''
+	Returns the list of muons in the given muons_ set that pass the loose ID requirements, the same for all the eras.
+	'''
 
-			looseElectron = True
+	return [mu for mu in muons_ if (mu.isGlobalMuon() or mu.isTrackerMuon()) and mu.isPFMuon() and mu.pt() > 5]
 
-	return looseElectron
+def selectLooseTaus(taus_):
 
-def containsLooseMuon(muons_):
-	
 	'''
-	Returns True if there is at least one muon that passes 2017 loose ID requirements in the given muons_ set.
-	Otherwise, returns False.
+	Returns the list of taus in the given taus_ set that pass the loose requirements, the same for all the eras.
 	'''
-	
-	looseMuon = False
 
-	for mu in muons_:
+	return [tau for tau in taus_ if tau.pt() > 20 and abs(tau.eta()) < 2.3]
 
-		if (mu.isGlobalMuon() or mu.isTrackerMuon()) and mu.isPFMuon() and mu.pt() > 5: 
+def selectLoosePhotons(photons_, photonID='PhotonCutBasedIDLoose'):
+
+	'''
+	Returns the list of photons in the given photons_ set that pass the loose ID requirements.
+	The ID working point is the one of the era configuration (config['photonID'], see lib/eraConfig.py).
+	'''
 
-			looseMuon = True
+	return [ph for ph in photons_ if ph.photonID(photonID) == 1 and abs(ph.eta()) < 2.5 and ph.pt() > 15]
 
-	return looseMuon
+def containsLooseElectron(electrons_, electronID='cutBasedElectronID-Spring15-25ns-V1-standalone-loose'):
 
-def containsLooseTau(taus_):
-	
 	'''
-	Returns True if there is at least one tau that passes 2017 loose ID requirements in the given taus_ set.
+	Returns True if there is at least one electron that passes the loose ID requirements (see selectLooseElectrons) in the given electrons_ set.
 	Otherwise, returns False.
 	'''
 
-	looseTau = False
+	return len(selectLooseElectrons(electrons_, electronID)) > 0
 
-	for tau in taus_:
-
-		if tau.pt() > 20 and abs(tau.eta()) < 2.3:
+def containsLooseMuon(muons_):
 	
-			looseTau = True
-
-	return looseTau
+	'''
+	Returns True if there is at least one muon that passes the loose ID requirements (see selectLooseMuons) in the given muons_ set.
+	Otherwise, returns False.
+	'''
 
-def containsLoosePhoton(photons_):
+	return len(selectLooseMuons(muons_)) > 0
 
+def containsLooseTau(taus_):
+	
 	'''
-	Returns True if there is at least one photon that passes 2017 loose ID requirements in the given photons_ set.
+	Returns True if there is at least one tau that passes the loose requirements (see selectLooseTaus) in the given taus_ set.
 	Otherwise, returns False.
 	'''
-	
-	loosePhoton = False
 
-	for ph in photons_:
+	return len(selectLooseTaus(taus_)) > 0
 
-		if ph.photonID('PhotonCutBasedIDLoose') == 1 and abs(ph.eta()) < 2.5 and ph.pt() > 15:
-	
-			loosePhoton = True
+def containsLoosePhoton(photons_, photonID='PhotonCutBasedIDLoose'):
 
-	return loosePhoton
+	'''
+	Returns True if there is at least one photon that passes the loose ID requirements (see selectLoosePhotons) in the given photons_ set.
+	Otherwise, returns False.
+	'''
 
-def containsLeptonOrPhoton(electrons, muons, taus, photons):
+	return len(selectLoosePhotons(photons_, photonID)) > 0
+
+def containsLeptonOrPhoton(electrons, muons, taus, photons, electronID='cutBasedElectronID-Spring15-25ns-V1-standalone-loose', photonID='PhotonCutBasedIDLoose'):
 
 	'''
 	Wrapper function to apply lepton and photon veto to an event, given the relevant sets of objects.
 	Returns True if there are no loose photon/leptons found in the event, otherwise returns False.
+	electronID and photonID are the names of the loose ID working points of the era configuration (see lib/eraConfig.py).
 	'''
 
 	electrons_ = electrons.product()
@@ -80,31 +83,41 @@ def containsLeptonOrPhoton(electrons, muons, taus, photons):
 	taus_ = taus.product()
 	photons_ = photons.product()
  
-	contains_lepton_photon = containsLooseElectron(electrons_) or containsLooseMuon(muons_) or containsLooseTau(taus_) or containsLoosePhoton(photons_)
+	contains_lepton_photon = containsLooseElectron(electrons_, electronID) or containsLooseMuon(muons_) or containsLooseTau(taus_) or containsLoosePhoton(photons_, photonID)
 
 	return contains_lepton_photon
 
-def contains_bJet(jets):
+def bTagValues(jets, discriminator='pfCombinedSecondaryVertexV2BJetTags'):
 
 	'''
-	Given all tight jets, determines whether there is a tagged b-jet or not according to 2017 requirements.
-	Returns True if there is at least one b-jet, returns False otherwise.
+	Returns the list of b-tag discriminator values of the given jets.
+	Jets without the given discriminator get -1.
 	'''
 
-	has_bJet = False
+	values = []
 
 	for jet in jets:
 
+		value = -1.
+
 		#Getting b-tag information for each jet
-		tags = jet.getPairDiscri()
+		for tag in jet.getPairDiscri():
 
-		for tag in tags:
+			if tag.first == discriminator:
 
-			if tag.first == 'pfCombinedSecondaryVertexV2BJetTags':
+				value = tag.second
 
-				jet_btag_CSVv2 = tag.second
+		values.append(value)
 
-				if jet_btag_CSVv2 > 0.8484: has_bJet = True
-	
-	return has_bJet
- 
+	return values
+
+def contains_bJet(jets, discriminator='pfCombinedSecondaryVertexV2BJetTags', workingPoint=0.8484):
+
+	'''
+	Given all tight jets, determines whether there is a tagged b-jet or not.
+	Returns True if there is at least one b-jet, returns False otherwise.
+	discriminator and workingPoint define the b-tagging requirement, taken from the era configuration
+	(config['bTagDiscriminator'] and config['bTagWP'], see lib/eraConfig.py).
+	'''
+
+	return any(value > workingPoint for value in bTagValues(jets, discriminator))
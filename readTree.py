@@ -11,6 +11,11 @@ from lib.selections import *
 from lib.drawTriggerEff import *
 from lib.drawCompGraph import *
 from lib.mjj_METHistos import *
+from lib.dataset import listManifests, chunkFiles, totalEvents
+from lib.plotting import flushPlots
+from lib.outputStore import getOutputStore, flushOutputs
+from lib.derivedVariables import addDerivedVariables
+from lib.cuts import saveSelectionCaches
 
 def getArgs():
 
@@ -18,46 +23,19 @@ def getArgs():
     parser.add_argument('-y', '--year', help = 'The production year for MiniAOD file (2017 or 2018)', type = int)
     parser.add_argument('-t', '--test', help = 'Run over the test file', action = 'store_true')
     parser.add_argument('-s', '--shortTest', help = 'Run over the short test file', action = 'store_true')
-    parser.add_argument('-c', '--clean', help = 'Clean the ROOT file by deleting all previous histograms', action = 'store_true')
+    parser.add_argument('-c', '--clean', help = 'Compact the output ROOT files after writing, keeping only the latest cycle of each histogram', action = 'store_true')
+    parser.add_argument('-p', '--pairing', help = 'Attach the dijet variables of the given pairing strategies (leading, maxMjj, forwardMost) to the tree, see lib/derivedVariables.py', nargs = '*', default = [])
     parser.add_argument('-n', '--noWrite', help = 'Do not write the efficiency graphs and histograms to the ROOT file', action = 'store_true')
     parser.add_argument('-b', '--background', help = '''
-                                                     Run over ZJetsToNuNu background files
+                                                     Run over ZJetsToNuNu background samples
                                                      User must also provide this option with an index between 0-6,
-                                                      telling the script to run over which background file.
+                                                      telling the script to run over which background sample.
+                                                     All the chunks of the sample listed in its manifest are read together.
                                                      ''', type= int) 
     args = parser.parse_args()
 
     return args
 
-def deleteHistos(histo):
-
-    '''
-    Removes the first 30 versions of the given histogram.
-    Called only if -c option is specified while running the script.
-    '''
-    for i in range(30):
-
-        hist = histo + ';' + str(i+1)
-        ROOT.gDirectory.Delete(hist)    
- 
-def cleanROOTFile(inputFile, histos):
-    
-    '''
-    Removes the first 30 versions of the given histograms from the ROOT file.
-    Called only if -c option is specified while running the script.
-    '''
-    print('Cleaning the ROOT file')
-
-    f = ROOT.TFile.Open(inputFile, 'UPDATE')
-
-    for histo in histos:
-
-        deleteHistos(histo)
-
-    f.Close()
-    
-    print('Cleaning done')
-
 def deltaR(prt1, prt2):
     
     eta1, eta2 = prt1.eta, prt2.eta
@@ -266,19 +244,25 @@ def main():
         idx = args.background
         inputDir = 'inputs'
 
-        inputList = [fileName for fileName in os.listdir(inputDir) if fileName.startswith('ZJetsToNuNu')]
-        inputFile = os.path.join(inputDir, inputList[idx])
+        # The chunks of each sample are listed in a manifest, see lib/dataset.py
+        # Manifests are sorted by name, so idx follows the order of the x-sections below
+
+        inputList = listManifests(inputDir, prefix='ZJetsToNuNu')
+        inputFile = inputList[idx]
         print('Starting job')
         print('File: {}'.format(inputFile))
+        print('Chunks: {}'.format(', '.join(chunkFiles(inputFile))))
 
-        # Hard coded x-sections and number of events for each background sample
+        # Hard coded x-sections for each background sample
+        # The number of events is the number of events looped over for all the chunks in the manifest
     
         xSections = [306.2, 0.3434, 91.38, 0.005146, 13.13, 3.245, 1.500]
-        numEvents = [19859833, 338948, 16052981, 6734, 9134120, 5697594, 2030827] 
-    
-        scaleFactors = calculateScaleFactors(xSections, numEvents)
 
-        scaleFactor = scaleFactors[idx]
+        numEvents = totalEvents(inputFile)
+
+        print('Number of events: {}'.format(numEvents))
+
+        scaleFactor = xSections[idx]/numEvents
 
     else:
  
@@ -286,6 +270,15 @@ def main():
         print('Starting job')
         print('File: {}'.format(inputFile))
     
+    # Attach the dijet variables of the requested pairing strategies to the tree,
+    # e.g. with -p maxMjj, 'maxMjj.mjj' can be used in all the selections and histograms
+
+    for strategy in args.pairing:
+
+        alias = addDerivedVariables(getOutputStore().eventTree(inputFile), strategy)
+
+        print('Derived variables: {}.mjj, {}.absEtaDiff, ...'.format(alias, alias))
+
     #Define the histograms
 
     #histos = declareHistos()
@@ -305,28 +298,6 @@ def main():
 
     jetCuts = cuts[1:3] # Only the jet pt cuts
     
-    #####################################
-    # Clean the ROOT file if needed
-    # Not updated, NOT RECOMMENDED TO USE
-    #####################################
-
-    if args.clean:
-
-        histos = []
-        
-        for trigger in triggers:
-
-            histos.append('eff_graph_' + trigger + '_MET')
-            histos.append('eff_graph_' + trigger + '_mjj')
-            histos.append('met_hist_afterVBFCutsAndTrigger_' + trigger)
-            histos.append('met_hist_afterVBFCuts')
-            histos.append('met_hist')
-            histos.append('mjj_hist_afterVBFCutsAndTrigger_' + trigger)
-            histos.append('mjj_hist_afterVBFCuts')
-            histos.append('mjj_hist')
-
-        cleanROOTFile(inputFile, histos)
-
     ###############################
     # CALL FUNCTIONS HERE 
     ###############################
@@ -364,93 +335,50 @@ def main():
         drawTriggerEff_MET(inputFile, triggers[0], args, cuts[0], cuts[1], cuts[2])
         
         ##################################################################################
-        # drawCompGraph_mjj:  Call to draw a comparison graph (number of events passing for each) for two triggers, as a function of mjj.
-        #                       Unlike drawTriggerEff_mjj, by default, the graph is drawn considering all three cases.
-        #
-        #                      Outputs:
-        #                      Saves the comparison graph as a png file in pngImages/triggerCompPlots/mjjPlots
-        #
-        #                      Check out lib/drawCompGraph.py for implementation.
-        ##################################################################################
-
-        drawCompGraph_mjj(inputFile, triggers[0], triggers[4], legendLabels[0], legendLabels[4], cuts)
-        
-        ##################################################################################
-        # drawCompGraph_MET:  Call to draw a comparison graph (number of events passing for each) for two triggers, as a function of MET.
-        #                       Unlike drawTriggerEff_MET, by default, the graph is drawn considering all three cases.
+        # drawCompGraphs:  Call to draw comparison graphs (number of events passing for each) for each pair of the given triggers,
+        #                  as a function of mjj and MET. The tree is read once for all the triggers and both variables.
+        #                  drawCompGraph_mjj and drawCompGraph_MET do the same for a single variable.
         #
         #                      Outputs:
-        #                      Saves the comparison graph as a png file in pngImages/triggerCompPlots/METPlots
+        #                      Saves the comparison graphs as png files in pngImages/triggerCompPlots/mjj_plots and MET_plots
         #
-        #                      Check out lib/drawCompGraph.py for implementation.
+        #                      Check out lib/drawCompGraph.py and lib/triggerComparison.py for implementation.
         ##################################################################################
 
-        drawCompGraph_MET(inputFile, triggers[0], triggers[4], legendLabels[0], legendLabels[4], cuts)
+        drawCompGraphs(inputFile, [triggers[0], triggers[4]], [legendLabels[0], legendLabels[4]], cuts)
 
     ##################################################################################
-    # draw2DHistoForEventsAcceptedOnlyByVBFTrigger: Call to draw a 2D histogram with MET on x-axis and mjj on y-axis.
-    #                                                The histogram will contain events that passes a given VBF trigger, but doesnt'pass the given MET trigger.
+    # draw2DGainMaps: Call to draw 2D histograms with MET on x-axis and mjj on y-axis, reading the tree only once:
+    #                 -- Events passing the given VBF trigger but failing the given MET trigger, and events passing the MET trigger
+    #                    (as in draw2DHistoForEventsAcceptedOnlyByVBFTrigger and draw2DHistoForEventsAcceptedByMETTrigger)
+    #                 -- The ratio of the two (as in draw2DHistoForPercentageVBFTriggerGain)
+    #                 -- The ratio of the events passing the VBF trigger to the events passing the VBF selections
+    #                    (as in draw2DHisto_PercentageOfEventsPassingVBFTrigger)
     #
-    #                                                If the histograms are to be scaled, the function must be provided with the scale factor, using scaleFactor argument.
-    #                                                Otherwise, scaleFactor arg can be ignored.
-    # 
-    #                                                Outputs:
-    #                                                If saveToROOTFile option is set to True (False by default), the 2D histogram will be saved to a new ROOT file.
-    #                                                Also saves the histogram as a png file in pngImages/mjj_MET2DPlots.
-    #
-    #                                                Check out lib/mjj_METHistos.py for implementation.
-    ##################################################################################
-    
-    ##################################################################################
-    # draw2DHistoForEventsAcceptedByMETTrigger    : Call to draw a 2D histogram with MET on x-axis and mjj on y-axis.
-    #                                                The histogram will contain events that passes the given MET trigger.
+    #                 The ratios are drawn with their errors on the bins, see lib/gainMaps.py.
+    #                 If the histograms are to be scaled, the function must be provided with the scale factor, using scaleFactor argument.
     #
-    #                                                If the histograms are to be scaled, the function must be provided with the scale factor, using scaleFactor argument.
-    #                                                Otherwise, scaleFactor arg can be ignored.
-    # 
-    #                                                Outputs:
-    #                                                If saveToROOTFile option is set to True (False by default), the 2D histogram will be saved to a new ROOT file.
-    #                                                Also saves the histogram as a png file in pngImages/mjj_MET2DPlots.
+    #                 Outputs:
+    #                 If saveToROOTFile option is set to True (False by default), the numbers of events passing the triggers will be saved to a new ROOT file.
+    #                 Also saves the histograms as png files in pngImages/mjj_MET2DPlots.
     #
-    #                                                Check out lib/mjj_METHistos.py for implementation.
+    #                 Check out lib/mjj_METHistos.py for implementation.
     ##################################################################################
 
-    draw2DHistoForEventsAcceptedOnlyByVBFTrigger(inputFile, triggers[0], triggers[4], jetCuts, scaleFactor, saveToROOTFile=True) 
-    draw2DHistoForEventsAcceptedByMETTrigger(inputFile, triggers[4], jetCuts, scaleFactor, saveToROOTFile=True)
+    draw2DGainMaps(inputFile, triggers[0], triggers[4], jetCuts, scaleFactor, saveToROOTFile=True)
 
-    ##################################################################################
-    # draw2DHistoForPercentageVBFTriggerGain      : Call to draw a 2D histogram with MET on x-axis and mjj on y-axis.
-    #                                                The histogram entries will be the ratio of the two:
-    #                                                -- Number of events passing the given VBF trigger but failing the given MET trigger
-    #                                                -- Number of events passing the given MET trigger
-    #
-    #                                                Outputs:
-    #                                                If saveToROOTFile option is set to True (False by default), the 2D histogram will be saved to a new ROOT file.
-    #                                               Also saves the histogram as a png file in pngImages/mjj_MET2DPlots.
-    #
-    #                                                Check out lib/mjj_METHistos.py for implementation.
-    #
-    #                                                NOTE: When draw2DHistoForPercentageVBFTriggerGain is called, 
-    #                                                draw2DHistoForEventsAcceptedOnlyByVBFTrigger and draw2DHistoForEventsAcceptedByMETTrigger are also called inside the function.
-    #                                                Thus, individual histograms (before the ratio is taken) are also saved.
-    #                                                No need to call these two functions individually. 
-    ##################################################################################
+    # Write the histograms and graphs into the output ROOT files, see lib/outputStore.py
+    # With -c, the files are compacted afterwards, see lib/compaction.py
 
-    draw2DHistoForPercentageVBFTriggerGain(inputFile, triggers[0], triggers[4], jetCuts) 
-    
-    ##################################################################################
-    # draw2DHisto_PercentageOfEventsPassingVBFTrigger: Call to draw a 2D histogram with MET on x-axis and mjj on y-axis.
-    #                                                  The histogram entries will be the ratio of the two:
-    #                                                  -- Number of events passing the given VBF trigger 
-    #                                                  -- Number of events passing the basic VBF selections, no trigger requirement
-    #
-    #                                                   Outputs:
-    #                                                   Saves the histogram as a png file in pngImages/mjj_MET2DPlots.
-    #
-    #                                                  Check out lib/mjj_METHistos.py for implementation.
-    ##################################################################################
+    flushOutputs(compact=args.clean)
+
+    # Save the entries passing each cut beside the input file, for the next jobs, see lib/cuts.py
+
+    saveSelectionCaches()
+
+    # Wait until all the png files are rendered, see lib/plotting.py
 
-    draw2DHisto_PercentageOfEventsPassingVBFTrigger(inputFile, triggers[0], jetCuts)
+    flushPlots()
 
 if __name__ == '__main__':
 
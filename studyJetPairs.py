@@ -0,0 +1,178 @@
+import ROOT
+import os
+import glob
+import argparse
+import multiprocessing
+
+from lib.dataset import openEventTree
+from lib.plotting import submitPlot, flushPlots
+from lib.outputStore import getOutputStore, flushOutputs
+from lib.cuts import vbfTopology, leadingJetPtAbove, trailingJetPtAbove, treeFiles, inputFingerprint
+from lib.jetPairs import studyJetPairs, geometries, fraction, histogram2D
+from lib.results import mergeResults
+from lib.batch import analysisTasks, getExecutor, executors, mapReduce
+
+#####################################
+# Leading pair vs. max mjj pair study over the event trees written by writeTree.py (see lib/jetPairs.py).
+# Replaces the MiniAOD event loops of evaluateJetPairs/: the input files (or manifests) are processed in parallel,
+# and the fractions of events where the leading pair is the max mjj pair are plotted per eta geometry
+# of the two leading jets, in pngImages/jetPairs. The histograms are also saved in output/jetPairs.root,
+# and the merged results (see lib/results.py) in output/jetPairs_results.npz.
+# On batch nodes, each job saves its partial results with -o, and the partial results are merged afterwards:
+#
+#   python studyJetPairs.py inputs/VBF_HToInv_M125_13TeV.root -o partials/VBF.npz
+#   python studyJetPairs.py --merge partials/*.npz
+#####################################
+
+def getArgs():
+
+	parser = argparse.ArgumentParser()
+	parser.add_argument('files', help = 'Input ROOT files or manifests containing eventTree (saved results with --merge). By default, inputs/*.root', nargs = '*')
+	parser.add_argument('-j', '--jobs', help = 'Number of files processed in parallel. By default, one per core', type = int)
+	parser.add_argument('--ptCut', help = 'Only the jets above this pt are paired for the max mjj pair', type = float, default = 0.)
+	parser.add_argument('--noVBFCuts', help = 'Do not apply the VBF cuts before the study', action = 'store_true')
+	parser.add_argument('-o', '--output', help = 'Only save the (partial) results into this .npz file, e.g. on a batch node')
+	parser.add_argument('--merge', help = 'Merge the saved results given as files instead of processing event trees', action = 'store_true')
+	parser.add_argument('--batch', help = 'Run one batch job per input file with the given executor (see lib/batch.py), instead of a pool of processes', choices = sorted(executors))
+	args = parser.parse_args()
+
+	return args
+
+#VBF cuts of the study, with the leading jet pt cuts of evaluateJetPairs/getFractionPlot.py
+
+vbfCuts = vbfTopology & leadingJetPtAbove(160) & trailingJetPtAbove(50)
+
+def processFile(inputFile, selection, ptCut):
+
+	'''
+	Runs the study over one input, in a worker process.
+	'''
+
+	ROOT.gROOT.SetBatch(True)
+
+	tree = openEventTree(inputFile)
+
+	#The input is recorded with its content, so the same input is never merged twice
+
+	results = studyJetPairs(tree, selection, ptCut, inputs={inputFile : inputFingerprint(treeFiles(tree))})
+
+	print('INFO: {} done'.format(inputFile))
+
+	return results
+
+def _processFile(job):
+
+	return processFile(*job)
+
+def runJobs(args):
+
+	'''
+	Runs the study over the input files, in parallel. Returns the list of the results per file (or of the paths of the saved results).
+	'''
+
+	inputFiles = args.files or sorted(glob.glob(os.path.join('inputs', '*.root')))
+
+	if not inputFiles:
+
+		raise ValueError('No input files given, and no ROOT files found in inputs/')
+
+	selection = '' if args.noVBFCuts else str(vbfCuts)
+
+	if args.batch:
+
+		options = ['--ptCut', str(args.ptCut)] + (['--noVBFCuts'] if args.noVBFCuts else [])
+
+		tasks = analysisTasks(__file__, inputFiles, os.path.join('output', 'partials'), options)
+
+		#The partial results saved by the jobs
+
+		partials = mapReduce(tasks, getExecutor(args.batch, args.jobs), merge=list, pollInterval=5.)
+
+		if partials is None:
+
+			raise RuntimeError('Some of the jobs failed, see the logs in logFiles/')
+
+		return partials
+
+	jobs = [(inputFile, selection, args.ptCut) for inputFile in inputFiles]
+
+	numWorkers = min(args.jobs or multiprocessing.cpu_count(), len(jobs))
+
+	if numWorkers > 1:
+
+		pool = multiprocessing.Pool(numWorkers)
+
+		results = pool.map(_processFile, jobs)
+
+		pool.close()
+		pool.join()
+
+	else:
+
+		results = [_processFile(job) for job in jobs]
+
+	return results
+
+def main():
+
+	ROOT.gROOT.SetBatch(True)
+
+	args = getArgs()
+
+	if args.merge:
+
+		if not args.files:
+
+			raise ValueError('--merge needs the saved results to be merged, e.g. output/partials/*.npz')
+
+		results = mergeResults(args.files)
+
+	else:
+
+		results = mergeResults(runJobs(args))
+
+	if args.output:
+
+		if os.path.dirname(args.output) and not os.path.isdir(os.path.dirname(args.output)):
+
+			os.makedirs(os.path.dirname(args.output))
+
+		results.save(args.output)
+
+		print('INFO: Results of {} inputs saved in {}'.format(len(results.inputs), args.output))
+
+		return
+
+	# Results
+
+	if not os.path.isdir('output'):
+
+		os.makedirs('output')
+
+	results.save(os.path.join('output', 'jetPairs_results.npz'))
+
+	out = getOutputStore().file(os.path.join('output', 'jetPairs.root'), recreate=True)
+
+	print('*'*10)
+	print('RESULTS')
+	print('*'*10)
+
+	for geometry in geometries:
+
+		print('{:<30}: max mjj for the leading pair: {:>8}, for other pairs: {:>8}'.format(geometry, results.counters['leading_' + geometry], results.counters['other_' + geometry]))
+
+		eff = fraction(results, geometry)
+		histo2D = histogram2D(results, geometry)
+
+		submitPlot(os.path.join('pngImages', 'jetPairs', 'fraction_' + geometry + '.png'), [(eff, 'AP')], grid=True)
+		submitPlot(os.path.join('pngImages', 'jetPairs', 'mjj2D_' + geometry + '.png'), [(histo2D, 'COLZ')], optStat=0, logz=True)
+
+		out.put(eff, eff.GetName())
+		out.put(histo2D, histo2D.GetName())
+
+	flushOutputs()
+	flushPlots()
+
+if __name__ == '__main__':
+
+	main()
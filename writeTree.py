@@ -0,0 +1,694 @@
+import ROOT
+import time
+import argparse
+import os
+import sys
+
+from lib.eraConfig import getEraConfig
+from lib.vbf_tree import defineBranches, declare_branches
+from lib.helperFunctions import invMassTwoJets
+from lib.angularVariables import minDeltaPhiJetMET
+from lib.veto import selectLooseElectrons, selectLooseMuons, selectLooseTaus, selectLoosePhotons, bTagValues
+from lib.triggerMatcher import TriggerMatcher
+from lib.l1Unpacker import L1Unpacker
+from lib.genSummary import fillGenSummary, fillGenParticles
+from lib.dataset import manifestPath, addChunk, makeChunk
+from lib.metrics import JobMetrics
+from lib.remoteInput import getInputAccess, isReadError
+from lib.fragmentCache import FragmentCache, configHash, assembleFragments
+from lib.eventRanges import iterateEvents, loadPlan
+
+# load FWLite C++ libraries
+ROOT.gSystem.Load("libFWCoreFWLite.so");
+ROOT.gSystem.Load("libDataFormatsFWLite.so");
+ROOT.FWLiteEnabler.enable()
+
+# load FWlite python libraries
+from DataFormats.FWLite import Handle, Events
+
+def fillObjects(branches, countBranch, prefix, objects):
+
+	'''
+	Stores the kinematics of the given objects in the <prefix>_pt/eta/phi/energy branches
+	and the number of objects in countBranch.
+	'''
+
+	pt, eta = branches[prefix + '_pt'], branches[prefix + '_eta']
+	phi, energy = branches[prefix + '_phi'], branches[prefix + '_energy']
+
+	for i, obj in enumerate(objects):
+
+		pt[i] = obj.pt()
+		eta[i] = obj.eta()
+		phi[i] = obj.phi()
+		energy[i] = obj.energy()
+
+	branches[countBranch][0] = len(objects)
+
+def writeTree(inputFile, tree, branches, config, matchers, args, numEvents, numSavedEvents, metrics, inputAccess, eventRange=None):
+
+	'''
+	Reads the inputFile and fills the tree, following the given era configuration.
+
+	ARGUMENTS:
+	---inputFile: MiniAOD ROOT file containing the events, as a local path, a URL or a logical file name (/store/...).
+	---tree: The tree to be written. This is to be declared before calling this function.
+	---branches: Branch buffers of the tree (BranchBuffers), created by lib.vbf_tree.defineBranches.
+				 Buffers are reset to their defaults at the start of each event, so only the quantities computed for the event are set here.
+	---config: Era configuration, see lib/eraConfig.py.
+	---matchers: Dict of TriggerMatcher objects for the HLT paths ('triggers') and MET filters ('filters').
+				 These are kept between files so that the path indices are only recomputed when the menu changes.
+	---args: Arguments parsed while calling this script.
+			 If args contain the flag short, the event loop will be terminated at event 100.
+			 If args contain the flag skimVetoes, events failing the lepton/photon or b-jet veto are not saved.
+	---numEvents: Cumulative number of events looped over. This is to keep track of total number of events looped over.
+	---numSavedEvents: Cumulative number of events that are saved to the tree. This is to keep track of total number of events saved.
+	---metrics: JobMetrics of the job (see lib/metrics.py), counting the events read, saved and rejected per cut.
+	---inputAccess: InputAccess opening the file from a local replica or one of the redirectors, with retries (see lib/remoteInput.py).
+	---eventRange: If given, only the events in this range of the file are read, as (first event, number of events). See lib/eventRanges.py.
+	'''
+
+	electrons, electronLabel = Handle('std::vector<pat::Electron>'), 'slimmedElectrons'
+	muons, muonLabel = Handle('std::vector<pat::Muon>'), 'slimmedMuons'
+	taus, tauLabel = Handle('std::vector<pat::Tau>'), 'slimmedTaus'
+	photons, photonLabel = Handle('std::vector<pat::Photon>'), 'slimmedPhotons'
+	jets, jetLabel = Handle('std::vector<pat::Jet>'), 'slimmedJets'
+	mets, metLabel = Handle('std::vector<pat::MET>'), 'slimmedMETs'
+	genParticles, genParticlesLabel = Handle('std::vector<reco::GenParticle>'), 'prunedGenParticles'
+
+	triggerBits, triggerBitLabel = Handle('edm::TriggerResults'), ('TriggerResults','','HLT')
+	filterBits, filterLabel = Handle('edm::TriggerResults'), ('TriggerResults', '', config['filterProcess'])
+
+	l1Jets, l1JetLabel  = Handle("BXVector<l1t::Jet>"), "caloStage2Digis:Jet"
+	l1EtSums, l1EtSumLabel  = Handle("BXVector<l1t::EtSum>"), "caloStage2Digis:EtSum"
+
+	isTightJet = config['jetID']
+
+	l1Unpacker = L1Unpacker(config['L1JetPtFloor'], config['L1MaxJets'])
+
+	triggerMatcher = matchers['triggers']
+	filterMatcher = matchers['filters']
+
+	metrics.startFile(inputFile)
+
+	#The file is kept open while the events are read, so that the connection to the server it was opened from is reused.
+	#If reading the events fails (e.g. the server went away), the file is opened again, possibly from another source,
+	#and the loop resumes from the event being processed: the events before it are already saved in the tree
+
+	firstEvent, numRangeEvents = eventRange or (0, None)
+	lastEvent = None if numRangeEvents is None else firstEvent + numRangeEvents
+
+	nextEvent, numRead, readFailures = firstEvent, 0, 0
+
+	while True:
+
+		url, rootFile = inputAccess.open(inputFile, metrics)
+
+		metrics.setSource(url)
+
+		try:
+
+			events = Events(url)
+
+			print('Took the input file successfully')
+
+			for numEvent, event in iterateEvents(events, nextEvent, None if lastEvent is None else lastEvent - nextEvent):
+
+				if args.shortTest:
+
+					if numRead == 100: break
+
+				numRead += 1
+
+				#Event to resume from if the reads fail, until the event is saved
+
+				nextEvent = numEvent
+
+				metrics.event()
+
+				event.getByLabel(electronLabel, electrons)
+				event.getByLabel(muonLabel, muons)
+				event.getByLabel(tauLabel, taus)
+				event.getByLabel(photonLabel, photons)
+				event.getByLabel(jetLabel, jets)
+				event.getByLabel(metLabel, mets)
+
+				event.getByLabel(triggerBitLabel, triggerBits)
+				event.getByLabel(filterLabel, filterBits)
+				event.getByLabel(l1JetLabel, l1Jets)
+				event.getByLabel(l1EtSumLabel, l1EtSums)
+
+				branches.reset()
+
+				#Event identifiers
+
+				eventId = event.eventAuxiliary()
+
+				branches['run'][0] = eventId.run()
+				branches['luminosityBlock'][0] = eventId.luminosityBlock()
+				branches['event'][0] = eventId.event()
+
+				#Storing kinemaic values of interest
+
+				mets_ = mets.product()
+
+				branches['met'][0] = mets_[0].pt()
+				branches['met_phi'][0] = mets_[0].phi()
+				branches['met_eta'][0] = mets_[0].eta()
+
+				if branches['met'][0] < config['metCut']:
+
+					metrics.reject('metCut')
+
+					continue
+
+				######################
+				#Implementing tight jet ID of the era
+				######################
+
+				jets_ = jets.product()
+
+				AK4_tightJets = []
+
+				for jet in jets_:
+
+					if isTightJet(jet):
+
+						AK4_tightJets.append(jet)
+
+				branches['nJet'][0] = len(AK4_tightJets)
+
+				if branches['nJet'][0] < 2: #Discard the events with number of jets smaller than 2
+
+					metrics.reject('nJet')
+
+					continue
+
+				branches['mjj'][0] = invMassTwoJets(AK4_tightJets)
+
+				jet_pt, jet_energy = branches['jet_pt'], branches['jet_energy']
+				jet_eta, jet_phi = branches['jet_eta'], branches['jet_phi']
+
+				for i, jet in enumerate(AK4_tightJets):
+
+					jet_pt[i] = jet.pt()
+					jet_energy[i] = jet.energy()
+					jet_eta[i] = jet.eta()
+					jet_phi[i] = jet.phi()
+
+				branches['absEtaDiff_leadingTwoJets'][0] = abs(jet_eta[0] - jet_eta[1])
+
+				#Minimum delta_phi between the four leading tight jets and MET, as computed offline (see lib/angularVariables.py)
+
+				nJet = branches['nJet'][0]
+
+				branches['minPhi_jetMET'][0] = minDeltaPhiJetMET(jet_pt[:nJet], jet_phi[:nJet], branches['met_phi'][0])
+
+				if jet_pt[0] < config['leadingJetPtCut']:
+
+					metrics.reject('leadingJetPt')
+
+					continue
+
+				###################
+				#Loose leptons/photons and b-tagging
+				#Veto decisions are stored rather than applied,
+				#so that they can be varied without rerunning over MiniAOD
+				###################
+
+				fillObjects(branches, 'nElectron', 'electron', selectLooseElectrons(electrons.product(), config['electronID']))
+				fillObjects(branches, 'nMuon', 'muon', selectLooseMuons(muons.product()))
+				fillObjects(branches, 'nTau', 'tau', selectLooseTaus(taus.product()))
+				fillObjects(branches, 'nPhoton', 'photon', selectLoosePhotons(photons.product(), config['photonID']))
+
+				branches['containsElectron'][0] = int(branches['nElectron'][0] > 0)
+				branches['containsMuon'][0] = int(branches['nMuon'][0] > 0)
+				branches['containsTau'][0] = int(branches['nTau'][0] > 0)
+				branches['containsLepton'][0] = int(branches['nElectron'][0] + branches['nMuon'][0] + branches['nTau'][0] > 0)
+				branches['containsPhoton'][0] = int(branches['nPhoton'][0] > 0)
+
+				jet_btag = bTagValues(AK4_tightJets, config['bTagDiscriminator'])
+
+				branches['jet_btag_CSVv2'][:len(jet_btag)] = jet_btag
+				branches['contains_bJet'][0] = int(any(value > config['bTagWP'] for value in jet_btag))
+
+				if args.skimVetoes:
+
+					if branches['containsLepton'][0] or branches['containsPhoton'][0]: #Lepton/photon veto
+
+						metrics.reject('leptonPhotonVeto')
+
+						continue
+
+					if branches['contains_bJet'][0]: #b-jet veto
+
+						metrics.reject('bJetVeto')
+
+						continue
+
+				if config['genSummary'] or config['storeGenParticles']:
+
+					event.getByLabel(genParticlesLabel, genParticles)
+
+					genParticles_ = genParticles.product()
+
+					if config['genSummary']: fillGenSummary(genParticles_, branches)
+
+					if config['storeGenParticles']: fillGenParticles(genParticles_, branches)
+
+				##########################
+
+				triggerBits_ = triggerBits.product()
+
+				triggerMatcher.update(event.object().triggerNames(triggerBits_))
+				triggerMatcher.fill(triggerBits_, branches)
+
+				#Filling L1 level information (BX=0 only)
+				l1Unpacker.fillMET(l1EtSums.product(), branches)
+				l1Unpacker.fillJets(l1Jets.product(), branches)
+
+				########################
+
+				#Cleaning filters
+
+				filters_ = filterBits.product()
+
+				filterMatcher.update(event.object().triggerNames(filters_))
+				filterMatcher.fill(filters_, branches)
+
+				tree.Fill()
+
+				numSavedEvents += 1
+
+				nextEvent = numEvent + 1
+
+				metrics.count('eventsSaved')
+
+			break
+
+		except Exception as error:
+
+			rootFile.Close()
+
+			if not isReadError(error): raise
+
+			readFailures += 1
+
+			if not inputAccess.readFailed(url, error, readFailures, metrics): raise
+
+	rootFile.Close()
+
+	print('Cumulative number of events looped over: {}'.format(numEvents))
+	print('Cumulative number of events saved      : {}'.format(numSavedEvents))
+
+	return numSavedEvents
+
+def writeInput(inputFile, tree, cache, branches, config, matchers, args, numEvents, numSavedEvents, metrics, inputAccess, eventRange=None):
+
+	'''
+	Writes the events of one input file (or range of events of the file), directly into the tree if there is no fragment cache.
+	Otherwise, the events are written into the fragment of the input file (see lib/fragmentCache.py),
+	or the fragment is taken from the cache if it was written already with the same configuration.
+	Returns the cumulative number of events saved, and the path of the fragment (None without cache).
+	See writeTree for the arguments.
+	'''
+
+	if cache is None:
+
+		return writeTree(inputFile, tree, branches, config, matchers, args, numEvents, numSavedEvents, metrics, inputAccess, eventRange), None
+
+	path, info = cache.lookup(inputFile, eventRange)
+
+	if path:
+
+		print('INFO: Fragment of {} taken from the cache: {}'.format(inputFile, path))
+
+		metrics.count('cachedFiles')
+
+		return numSavedEvents + info['numSavedEvents'], path
+
+	fragmentFile = cache.create(inputFile, eventRange)
+
+	fragmentTree = ROOT.TTree('eventTree', 'eventTree')
+
+	branches.declare(fragmentTree)
+
+	newNumSavedEvents = writeTree(inputFile, fragmentTree, branches, config, matchers, args, numEvents, numSavedEvents, metrics, inputAccess, eventRange)
+
+	fragmentFile.cd()
+	fragmentTree.Write()
+
+	path = cache.commit(fragmentFile, inputFile, eventRange, numSavedEvents = newNumSavedEvents - numSavedEvents)
+
+	return newNumSavedEvents, path
+
+def main(year=None):
+
+	'''
+	Main function of the writer.
+	If year is given, it is used as the default for the --year option.
+	'''
+
+	parser = argparse.ArgumentParser()
+	parser.add_argument('-y', '--year', help = 'The data taking year of the MiniAOD files (2017 or 2018)', type = int, default = year or 2017)
+	parser.add_argument('-t', '--test', help = 'Only go over the first two files for testing', action = 'store_true')
+	parser.add_argument('-s', '--shortTest', help = 'Only go over the first 100 events in the first two files for testing', action = 'store_true')
+	parser.add_argument('-l', '--local', help = 'Run over the local files', action = 'store_true')
+	parser.add_argument('-b', '--background', help = 'Run over the background files', action = 'store_true')
+	parser.add_argument('--skimVetoes', help = 'Do not save the events failing the lepton/photon and b-jet vetoes (the veto decisions are stored in the tree otherwise)', action = 'store_true')
+	parser.add_argument('-c', '--counter', help = '''Determines which files on the input txt file to be run over.
+													 counter=0: File will run over files 1-5 in the given txt file
+													 counter=1: File will run over files 6-10 in the given txt file
+													 and so on.''', type = int, default = 0)
+	parser.add_argument('-f', '--fileIdx', help= '''Determines which txt file to be run over.
+											     file=0: File will run over the first .txt file in the backgroundFiles dir
+												 file=1: File will run over the second .txt file in the backgroundFiles dir
+												 and so on.''', type = int)
+	parser.add_argument('--firstEvent', help = 'Index of the first event read in each input file', type = int, default = 0)
+	parser.add_argument('--numEvents', help = 'Number of events read in each input file, from --firstEvent. By default, until the end of the file', type = int)
+	parser.add_argument('--plan', help = 'Plan of the shards of a background sample, see lib/eventRanges.py and callWriteTree.py --eventsPerShard')
+	parser.add_argument('--shard', help = 'Index of the shard of the plan to be run over', type = int)
+	parser.add_argument('--retries', help = 'Number of times the opening of an input file is retried over all the sources (by default, as in lib/eraConfig.py)', type = int)
+	parser.add_argument('--localReplica', help = 'Directories with local copies of the input files (same /store/... paths), read before the redirectors', nargs = '*', default = [])
+	parser.add_argument('--fragmentCache', help = 'Directory of the cache of the per-file fragments (see lib/fragmentCache.py)', default = os.path.join('inputs', 'fragments'))
+	parser.add_argument('--noFragmentCache', help = 'Write the events directly into the output, without the fragment cache', action = 'store_true')
+	parser.add_argument('--metricsInterval', help = 'Time between two progress records in the metrics file of the job (logFiles/metrics/<output>.jsonl), in seconds', type = float, default = 30.)
+
+	args = parser.parse_args()
+
+	config = getEraConfig(args.year)
+
+	if (args.local and not config['localDir']) or (args.background and not config['backgroundDir']):
+
+		raise ValueError('Local/background files are not configured for year {}!'.format(args.year))
+
+	# Get the index for the first file
+	counter = args.counter
+	file_idx = 5*counter
+
+	# Get which txt file in the background dir is to be considered
+	txtFileIdx = args.fileIdx
+
+	# Range of events read in each input file, or shard of a sample split into ranges of events (see lib/eventRanges.py)
+
+	fileRange = (args.firstEvent, args.numEvents) if (args.firstEvent or args.numEvents is not None) else None
+
+	rangeSuffix = '' if fileRange is None else '_events{}-{}'.format(args.firstEvent, args.firstEvent + args.numEvents - 1 if args.numEvents is not None else 'end')
+
+	if args.plan:
+
+		if args.shard is None:
+
+			raise ValueError('The index of the shard (--shard) must be given with --plan!')
+
+		plan = loadPlan(args.plan)
+
+		shard = plan['shards'][args.shard]
+
+	backgroundFilesDir = config['backgroundDir']
+
+	#Create a new ROOT file
+
+	if args.test:
+
+		output = ROOT.TFile('inputs/{}_test.root'.format(config['outputPrefix']), 'RECREATE')
+
+	elif args.shortTest and not args.background:
+
+		output = ROOT.TFile('inputs/{}_shortTest.root'.format(config['outputPrefix']), 'RECREATE')
+
+	elif args.shortTest and args.background:
+
+		txtFileName_splitted = sorted(os.listdir(backgroundFilesDir))[1].split('_')[1:-1]
+		ROOT_fileName = '_'.join(txtFileName_splitted) + '_shortTest' + '.root'
+		ROOT_filePath = os.path.join('inputs', ROOT_fileName)
+
+		output = ROOT.TFile(ROOT_filePath, 'RECREATE')
+
+	elif args.plan:
+
+		sample = plan['sample']
+		ROOT_fileName = sample + '_shard{}'.format(args.shard) + '.root'
+		ROOT_filePath = os.path.join('inputs', ROOT_fileName)
+
+		output = ROOT.TFile(ROOT_filePath, 'RECREATE')
+
+	elif args.background:
+
+		txtFileName_splitted = sorted(os.listdir(backgroundFilesDir))[txtFileIdx].split('_')[2:-1]
+		sample = '_'.join(txtFileName_splitted)
+		ROOT_fileName = sample + '_files{}-{}'.format(file_idx, file_idx+4) + rangeSuffix + '.root'
+		ROOT_filePath = os.path.join('inputs', ROOT_fileName)
+
+		output = ROOT.TFile(ROOT_filePath, 'RECREATE')
+
+	else:
+
+		output = ROOT.TFile('inputs/{}.root'.format(config['outputPrefix']), 'RECREATE')
+
+	#Progress metrics of the job, named after its output file (see lib/metrics.py)
+
+	metrics = JobMetrics(os.path.splitext(os.path.basename(output.GetName()))[0], args.metricsInterval)
+
+	#Remote reads with retries, failover and read-ahead (see lib/remoteInput.py)
+
+	inputAccess = getInputAccess(config, args.localReplica, **({'retries' : args.retries} if args.retries is not None else {}))
+
+	#Create a new ROOT TTree
+	eventTree = ROOT.TTree('eventTree', 'eventTree')
+
+	#Initialize the variables and create branches
+	branches = defineBranches(config)
+	declare_branches(eventTree, branches)
+
+	#Per-file fragments, reused by the reruns with the same configuration (not for the tests, which only read part of the files)
+
+	if args.noFragmentCache or args.test or args.shortTest:
+
+		cache = None
+
+	else:
+
+		cache = FragmentCache(args.fragmentCache, configHash(config, branches.schema, {'skimVetoes' : args.skimVetoes}))
+
+	fragments = []
+
+	#Trigger and filter matchers, shared by all the input files
+	matchers = {
+		'triggers' : TriggerMatcher(config['triggers'], 'HLT'),
+		'filters'  : TriggerMatcher(config['filters'], 'MET filter'),
+	}
+
+	t1 = time.time()
+
+	# Track the total number of events looped over
+	# and total saved number of events
+
+	numEvents = 0
+	numSavedEvents = 0
+
+	if args.local:
+
+		MCFilesDir = config['localDir']
+
+		for numFile, fileName in enumerate(os.listdir(MCFilesDir)):
+
+			t2 = time.time()
+
+			if args.test or args.shortTest:
+
+				if numFile == 3: break
+
+			file_path = os.path.join(MCFilesDir, fileName)
+
+			print('Working on file {0:<5d} t = {1:.2f}'.format(numFile+1, t2-t1))
+
+			print('Filename: {}'.format(file_path))
+
+			numSavedEvents, fragment = writeInput(file_path, eventTree, cache, branches, config, matchers, args, numEvents, numSavedEvents, metrics, inputAccess, fileRange)
+
+			fragments.append(fragment)
+
+			#With the fragment cache, the events are in the fragments until the end of the job, which already keep the progress
+
+			if cache is None and numFile%10 == 0:
+
+				output.cd() #Go to the file directory
+
+				#Save the output root file
+				output.Write()
+
+	elif args.plan:
+
+		print('*'*20)
+		print('INFO: Will run over shard {} of {} ({} shards)'.format(args.shard, args.plan, len(plan['shards'])))
+		print('*'*20)
+
+		inputFiles = []
+
+		for numFile, eventRange in enumerate(shard):
+
+			t2 = time.time()
+
+			if args.test or args.shortTest:
+
+				if numFile == 2: break
+
+			numEvents += eventRange['numEvents']
+			inputFiles.append(eventRange['file'])
+
+			print('Working on file {0:<5d} t = {1:.2f}'.format(numFile+1, t2-t1))
+
+			print('Filename: {}, events {}-{}'.format(eventRange['file'], eventRange['first'], eventRange['first'] + eventRange['numEvents'] - 1))
+
+			numSavedEvents, fragment = writeInput(eventRange['file'], eventTree, cache, branches, config, matchers, args, numEvents, numSavedEvents, metrics, inputAccess, (eventRange['first'], eventRange['numEvents']))
+
+			fragments.append(fragment)
+
+	elif args.background:
+
+		txtFile = sorted(os.listdir(backgroundFilesDir))[txtFileIdx]
+
+		txtFile_path = os.path.join(backgroundFilesDir, txtFile)
+
+		print('*'*20)
+		print('INFO: Will consider txt file {}'.format(txtFile))
+		print('INFO: Will run over files with idx between {}-{}'.format(file_idx, file_idx+4))
+		print('*'*20)
+
+		with open(txtFile_path, 'r') as f:
+
+			fileEntries = f.readlines()[file_idx:file_idx+5]
+
+		inputFiles = []
+
+		for numFile, fileEntry in enumerate(fileEntries):
+
+			t2 = time.time()
+
+			splittedFileEntry = fileEntry.split('  ')
+
+			fileName = splittedFileEntry[0]
+
+			if args.test or args.shortTest:
+
+				if numFile == 2: break
+
+			if fileRange is None:
+
+				numEvents += int(splittedFileEntry[1])
+
+			else:
+
+				numEvents += max(0, min(int(splittedFileEntry[1]) - args.firstEvent, args.numEvents if args.numEvents is not None else int(splittedFileEntry[1])))
+			inputFiles.append(splittedFileEntry[0])
+
+			print('Working on file {0:<5d} t = {1:.2f}'.format(numFile+1, t2-t1))
+
+			print('Filename: {}'.format(fileName))
+
+			numSavedEvents, fragment = writeInput(fileName, eventTree, cache, branches, config, matchers, args, numEvents, numSavedEvents, metrics, inputAccess, fileRange)
+
+			fragments.append(fragment)
+
+			print('Cumulative number of events looped over: {}'.format(numEvents))
+
+	else:
+
+		with open(config['inputList'], 'r') as f:
+
+			fileNames = f.readlines()
+
+		for numFile, filename in enumerate(fileNames):
+
+			t2 = time.time()
+
+			if args.test or args.shortTest:
+
+				if numFile == 1: break
+
+			print('Working on file {0:<5d} t = {1:.2f}'.format(numFile+1, t2-t1))
+
+			print('Filename: {}'.format(filename))
+
+			numSavedEvents, fragment = writeInput(filename.strip(), eventTree, cache, branches, config, matchers, args, numEvents, numSavedEvents, metrics, inputAccess, fileRange)
+
+			fragments.append(fragment)
+
+			#With the fragment cache, the events are in the fragments until the end of the job, which already keep the progress
+
+			if cache is None and numFile%10 == 0:
+
+				output.cd() #Go to the file directory
+
+				#Save the output root file
+				output.Write()
+
+	#Assemble the output from the fragments
+
+	if cache is not None:
+
+		assembleFragments(fragments, eventTree)
+
+	#Save the output root file
+	output.cd()
+	output.Write()
+
+	print('*'*20)
+	print('RESULTS')
+	print('Total number of events looped over: {}'.format(numEvents))
+	print('Total number of events saved:       {}'.format(numSavedEvents))
+
+	for key, matcher in matchers.items():
+
+		if matcher.unmatched:
+
+			print('Unmatched {} patterns in the last menu: {}'.format(matcher.label, ', '.join(matcher.unmatched)))
+
+	print('*'*20)
+
+	numChunkEntries = eventTree.GetEntries()
+
+	output.Close()
+
+	metrics.finish()
+
+	#Register the new chunk in the manifest of the sample,
+	#so that the readers chain it with the chunks produced by the other jobs
+
+	if args.plan and not (args.test or args.shortTest):
+
+		chunk = makeChunk(ROOT_filePath,
+						  year = config['year'],
+						  inputList = plan['inputList'],
+						  plan = args.plan,
+						  shard = args.shard,
+						  eventRanges = shard,
+						  inputFiles = inputFiles,
+						  numEvents = numEvents,
+						  numSavedEvents = numChunkEntries,
+						  command = ' '.join(sys.argv))
+
+		addChunk(manifestPath(sample), chunk)
+
+		print('Chunk {} added to {}'.format(ROOT_fileName, manifestPath(sample)))
+
+	elif args.background and not (args.test or args.shortTest):
+
+		chunk = makeChunk(ROOT_filePath,
+						  year = config['year'],
+						  inputList = txtFile_path,
+						  inputRange = [file_idx, file_idx+len(inputFiles)-1],
+						  eventRange = list(fileRange) if fileRange else None,
+						  inputFiles = inputFiles,
+						  numEvents = numEvents,
+						  numSavedEvents = numChunkEntries,
+						  command = ' '.join(sys.argv))
+
+		addChunk(manifestPath(sample), chunk)
+
+		print('Chunk {} added to {}'.format(ROOT_fileName, manifestPath(sample)))
+
+if __name__ == '__main__':
+
+	main()